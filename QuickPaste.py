@@ -1,5 +1,5 @@
-import sys, os, json, ctypes, logging, copy
-from PyQt5 import QtWidgets, QtGui, QtCore
+import sys, os, json, ctypes, logging, copy, re, threading, random, time, datetime, getpass, contextlib
+from PyQt5 import QtWidgets, QtGui, QtCore, QtNetwork
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QFontMetrics
 from PyQt5.QtCore import QByteArray
@@ -8,19 +8,53 @@ from PyQt5.QtWidgets import QSystemTrayIcon, QAction, QMenu
 import win32clipboard
 import win32con
 from functools import partial
+from collections import OrderedDict
 import tempfile
 import sip
+import qp_input
+import qp_store
+import qp_sync
+import qp_ipc
+import qp_macro
+import qp_template
+import qp_generators
+import qp_edit
+import qp_abbrev
+import qp_transfer
+import qp_diag
+import qp_profiles
+from qp_html import minify_html, build_cf_html, html_to_plain
 
 APPDATA_PATH = os.path.join(os.environ["APPDATA"], "QuickPaste")
 os.makedirs(APPDATA_PATH, exist_ok=True)
 CONFIG_FILE = os.path.join(APPDATA_PATH, "config.json")
 WINDOW_CONFIG = os.path.join(APPDATA_PATH, "window_config.json")
 SDE_FILE = os.path.join(APPDATA_PATH, "sde.json")
+SETTINGS_FILE = os.path.join(APPDATA_PATH, "settings.json")
+SYNC_STATE_FILE = os.path.join(APPDATA_PATH, "sync_state.json")
+COUNTERS_FILE = os.path.join(APPDATA_PATH, "counters.json")
 LOG_FILE = os.path.join(APPDATA_PATH, "qp.log")
+DIAG_FILE = os.path.join(APPDATA_PATH, "diagnostics.log")
 logging.basicConfig(filename=LOG_FILE, filemode="a", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", encoding="utf-8")
+
+def acquire_single_instance():
+    """Nur beim Start als Programm: läuft schon eine Instanz, wird sie nach vorne geholt und dieser Prozess beendet."""
+    lock = qp_ipc.acquire_instance_lock(APPDATA_PATH)
+    if lock is None:
+        try:
+            qp_ipc.send_command("show", timeout=1.0)
+        except OSError as e:
+            logging.warning(f"⚠ Laufende Instanz nicht erreichbar: {e}")
+        logging.info("QuickPaste läuft bereits, zweiter Start beendet")
+        sys.exit(0)
+    return lock
+
+# qp_stress.py/qp_bench.py importieren das Modul: dann weder Sperre noch IPC-Kanal
+_instance_lock = acquire_single_instance() if __name__ == "__main__" else None
 BASE_DIR = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
 ICON_PATH = os.path.join(BASE_DIR, "assets", "H.ico")
 DEFAULT_FONT_SIZE = 5 
+CONFIG_VERSION = qp_store.CONFIG_VERSION
 
 class QuickPasteState:
     """Centralized application state management"""
@@ -32,16 +66,13 @@ class QuickPasteState:
         self.profile_buttons = {}
         self.profile_lineedits = {}
         self.edit_mode = False
-        self.text_entries = []
-        self.title_entries = []
-        self.hotkey_entries = []
         self.tray = None
+        self.tray_profile_actions = OrderedDict()
         self.data = None
         self.active_profile = None
         self.profile_entries = {}
         self.profile_selector = None
         self.profile_delete_button = None
-        self.last_ui_data = None
         self.registered_hotkey_ids = []
         self.id_to_index = {}
         self.hotkey_filter_instance = None
@@ -50,6 +81,16 @@ class QuickPasteState:
         self.normal_minimum_width = None
         self.zoom_level = 1.0  
         self.base_font_size = 5  
+        self.settings = {}
+        self.persisted_profiles = {}
+        self.pending_config_reload = None
+        self.macro_runner = None
+        self.macro_timings = {}
+        self.edit_batch = None
+        self.selected_rows = set()
+        self.bulk_buttons = []
+        self.undo_button = None
+        self.redo_button = None
 
 app_state = QuickPasteState()
 
@@ -85,8 +126,14 @@ class ComboBoxItemProxy:
         self._pending_text = None
 
 class ProfileComboBox(QtWidgets.QComboBox):
-    """ComboBox mit intern gerendertem Pfeil-Glyph."""
+    """ComboBox mit intern gerendertem Pfeil-Glyph; mit popup_handler öffnet sie statt der Liste den Profilwechsler."""
     GLYPH = "▼" 
+    popup_handler = None
+    def showPopup(self):
+        if self.popup_handler is not None:
+            self.popup_handler()
+            return
+        super().showPopup()
     def paintEvent(self, event):
         super().paintEvent(event)
         option = QtWidgets.QStyleOptionComboBox()
@@ -129,22 +176,35 @@ class DebouncedSaver:
     def schedule_save(self, data):
         if self.timer.isActive():
             self.timer.stop()
-        try:
-            self.pending_data = {
-                "profiles": {k: v.copy() for k, v in data.get("profiles", {}).items()},
-                "active_profile": data.get("active_profile")
-            }
-        except Exception:
-            self.pending_data = copy.deepcopy(data) 
+        self.pending_data = qp_store.config_for_save(data, app_state.data.get("recent_profiles", []))
+        self.pending_data["version"] = CONFIG_VERSION
+        app_state.persisted_profiles = snapshot_profiles(self.pending_data["profiles"])
+        self.timer.start()
+    def schedule_state_save(self):
+        """Nur aktives Profil/Recent-Liste geändert: Profile bleiben auf dem gespeicherten Stand, nichts wird kopiert."""
+        if self.pending_data is None:
+            self.pending_data = {"profiles": app_state.persisted_profiles, "version": CONFIG_VERSION}
+        self.pending_data["active_profile"] = app_state.data["active_profile"]
+        self.pending_data["recent_profiles"] = list(app_state.data.get("recent_profiles", []))
         self.timer.start()
 
     def _save(self):
         if self.pending_data is not None:
             try:
-                save_data_atomic(self.pending_data, CONFIG_FILE)
+                save_data_atomic(pack_config(self.pending_data), CONFIG_FILE)
             finally:
                 self.pending_data = None
 
+_own_write_signatures = {}
+
+def file_signature(path):
+    """(mtime_ns, size) einer Datei oder None, wenn sie fehlt."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 def save_data_atomic(data, filename):
     """Atomic file write to prevent corruption"""
     dirpath = os.path.dirname(filename)
@@ -152,13 +212,21 @@ def save_data_atomic(data, filename):
     try:
         fd, tmp = tempfile.mkstemp(dir=dirpath, prefix=".tmp_", suffix=".json")
         with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+            json.dump(data, f, indent=4, default=qp_store.json_default)
         os.replace(tmp, filename) 
+        _own_write_signatures[os.path.abspath(filename)] = file_signature(filename)
     except Exception as e:
         if tmp:
             try: os.unlink(tmp)
             except Exception: pass
         raise e
+def pack_config(data):
+    """Legt mehrfach vorkommende Snippet-Texte einmalig unter 'blobs' ab."""
+    profiles, blobs = qp_store.pack_shared_texts(data.get("profiles", {}))
+    packed = {**data, "profiles": profiles}
+    if blobs:
+        packed["blobs"] = blobs
+    return packed
 debounced_saver = DebouncedSaver(600)
 
 #region window position 
@@ -243,30 +311,227 @@ def detect_optimal_zoom():
 
 #region data
 
+DEFAULT_SETTINGS = {
+    "direct_typing_max_chars": 40,
+    "direct_typing_apps": [],
+    "direct_typing_chunk_events": 64,
+    "direct_typing_chunk_delay_ms": 5,
+    "paste_delay_ms": 200,
+    "paste_rules": [],
+    "compress_texts": "",
+    "text_cache_items": 64,
+    "sde_pack": True,
+    "sde_pack_dir": "",
+    "reload_poll_ms": 0,
+    "sync_source": "",
+    "sync_interval_s": 900,
+    "macro_step_gap_ms": 20,
+    "generator_dir": "",
+    "generator_timeout_ms": 1500,
+    "generator_ttl_s": 60,
+    "generator_workers": 1,
+    "undo_memory_kb": 2048,
+    "undo_max_steps": 200,
+    "paste_queue_max": 8,
+    "paste_coalesce_ms": 0,
+    "paste_settle_ms": 100,
+    "abbreviations_enabled": True,
+    "stall_threshold_ms": 2000,
+    "diag_interval_s": 0,
+    "tray_recent_profiles": 8,
+    "view_cache_profiles": 4,
+    "view_cache_mb": 48,
+    "view_prebuild": True,
+    "low_memory_after_s": 0}
+
+def load_settings():
+    """Lädt settings.json; unbekannte Schlüssel oder falsche Typen werden ignoriert."""
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    try:
+        with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+    except FileNotFoundError:
+        return settings
+    except json.JSONDecodeError as e:
+        logging.warning(f"⚠ settings.json ungültig, verwende Standardwerte: {e}")
+        return settings
+    if not isinstance(loaded, dict):
+        return settings
+    for key, default in DEFAULT_SETTINGS.items():
+        value = loaded.get(key)
+        if value is None:
+            continue
+        if isinstance(default, bool) != isinstance(value, bool) or not isinstance(value, type(default)):
+            logging.warning(f"⚠ settings.json: '{key}' hat falschen Typ, ignoriert.")
+            continue
+        settings[key] = value
+    return settings
+
+def read_sde_source():
+    """sde.json roh lesen; None, wenn die Datei fehlt."""
+    try:
+        with open(SDE_FILE, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
 def load_sde_profile():
+    """
+    SDE-Profil beim Start laden. Mit sde_pack wird sde.json nur noch als Quelle
+    gehasht: passt ein Pack zum Hash, wird es per mmap eingeblendet, sonst neu
+    übersetzt. Nur hier gibt es Platzhalter für fehlende/kaputte Dateien.
+    """
+    raw = read_sde_source()
+    if raw is not None:
+        pack = open_sde_pack_for(raw)
+        if pack is not None:
+            return pack.as_profile()
     try:
-        with open(SDE_FILE, "r", encoding="utf-8") as f:
-            sde = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        logging.warning("⚠ Konnte sde.json nicht laden. Setze Standard‑SDE.")
-        sde = {}
-    if not sde.get("titles") and not sde.get("texts") and not sde.get("hotkeys"):
-        sde = {
-            "titles": ["Standard Titel 1", "Standard Titel 2", "Standard Titel 3"],
-            "texts":  ["Standard Text 1",  "Standard Text 2",  "Standard Text 3"],
-            "hotkeys":["ctrl+shift+1",    "ctrl+shift+2",    "ctrl+shift+3"]}
+        sde = parse_sde_json(raw)
+    except (FileNotFoundError, UnicodeDecodeError, ValueError) as e:
+        logging.warning(f"⚠ Konnte sde.json nicht laden ({e}). Setze Standard‑SDE.")
+        # Platzhalter nie unter dem Hash der kaputten Datei als Pack ablegen
+        return build_sde_profile(None, default_sde())
+    return build_sde_profile(raw, sde)
+
+def open_sde_pack_for(raw):
+    if not app_state.settings.get("sde_pack", True):
+        return None
+    digest = qp_store.sde_source_digest(raw)
+    for pack_dir in sde_pack_dirs():
+        pack = qp_store.open_sde_pack(qp_store.sde_pack_path(pack_dir, digest), digest)
+        if pack is not None:
+            return pack
+    return None
+
+def sde_pack_dirs():
+    """
+    Wo Packs gesucht werden: sde_pack_dir bzw. das von Administratoren per
+    compile-sde befüllte ProgramData-Verzeichnis (alle Sitzungen mappen dort
+    dasselbe Pack), danach das eigene APPDATA. open_sde_pack glaubt nur Packs
+    des eigenen Kontos oder von Administratoren.
+    """
+    shared = app_state.settings.get("sde_pack_dir") or qp_store.default_sde_pack_dir()
+    return list(dict.fromkeys((shared, APPDATA_PATH)))
+
+def sde_pack_file(digest):
+    """Ziel für selbst übersetzte Packs: sde_pack_dir, falls gesetzt und frei, sonst APPDATA."""
+    configured = app_state.settings.get("sde_pack_dir")
+    if configured:
+        path = qp_store.sde_pack_path(configured, digest)
+        if not os.path.exists(path):
+            return path
+    return qp_store.sde_pack_path(APPDATA_PATH, digest)
+
+def build_sde_profile(raw, sde):
+    """
+    Aus geparstem sde (zu den Quelldaten raw) das SDE-Profil bauen: passendes
+    Pack einblenden oder übersetzen, sonst Texte in den Pool. raw=None: kein Pack.
+    """
+    if raw is None or not app_state.settings.get("sde_pack", True):
+        sde["texts"] = [text_pool.intern(t) for t in sde["texts"]]
+        return sde
+    pack = open_sde_pack_for(raw)
+    if pack is not None:
+        return pack.as_profile()
+    digest = qp_store.sde_source_digest(raw)
+    pack_path = sde_pack_file(digest)
+    try:
+        qp_store.compile_sde_pack(sde, digest, pack_path)
+        qp_store.remove_stale_sde_packs(os.path.dirname(pack_path), pack_path)
+        return qp_store.SdePack(pack_path).as_profile()
+    except Exception as e:
+        logging.warning(f"⚠ SDE-Pack konnte nicht erstellt werden, nutze sde.json direkt: {e}")
+    sde["texts"] = [text_pool.intern(t) for t in sde["texts"]]
     return sde
 
+def default_sde():
+    return {
+        "titles": ["Standard Titel 1", "Standard Titel 2", "Standard Titel 3"],
+        "texts":  ["Standard Text 1",  "Standard Text 2",  "Standard Text 3"],
+        "hotkeys":["ctrl+shift+1",    "ctrl+shift+2",    "ctrl+shift+3"]}
+
+def parse_sde_json(raw):
+    """Strikt: fehlende, kaputte oder leere sde.json wirft (Reload behält dann das alte SDE)."""
+    if raw is None:
+        raise FileNotFoundError(SDE_FILE)
+    sde = json.loads(raw.decode("utf-8"))
+    if not isinstance(sde, dict):
+        raise ValueError("sde.json ist kein Objekt")
+    for field in qp_store.SDE_FIELDS:
+        values = sde.setdefault(field, [])
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            raise ValueError(f"'{field}' muss eine Liste von Strings sein")
+    if not sde["titles"] and not sde["texts"] and not sde["hotkeys"]:
+        raise ValueError("sde.json enthält keine Einträge")
+    sde["texts"] = [minify_html(t) for t in sde["texts"]]
+    return sde
+
+def make_text_codec(settings):
+    """Codec für komprimierte Snippet-Texte oder None (Klartext-Modus)."""
+    method = (settings.get("compress_texts") or "").strip().lower()
+    if not method:
+        return None
+    try:
+        return qp_store.TextCodec(method, cache_items=settings.get("text_cache_items", 64))
+    except ValueError as e:
+        logging.warning(f"⚠ compress_texts ignoriert: {e}")
+        return None
+
+def wrap_stored_texts(items):
+    return qp_store.wrap_texts(items, text_codec, text_pool)
+
+def wrap_profile_texts(profiles, lazy=False):
+    """
+    Bringt die Texte aller übergebenen Profile in die eingestellte Speicherform;
+    lazy=True erst beim ersten Zugriff auf das jeweilige Profil (Programmstart).
+    """
+    for vals in profiles.values():
+        if lazy:
+            vals["texts"] = qp_store.LazyTexts(vals.get("texts", []), wrap_stored_texts)
+        else:
+            vals["texts"] = wrap_stored_texts(vals.get("texts", []))
+    return profiles
+
+def prune_text_pool():
+    """Entfernt nicht mehr referenzierte Texte und abgeleitete Daten aus dem Pool."""
+    live_texts, live_blobs = [], []
+    for vals in app_state.data.get("profiles", {}).values():
+        texts = vals.get("texts", [])
+        if isinstance(texts, qp_store.LazyTexts):
+            if not texts.materialized:
+                continue   # noch nichts im Pool
+            texts = texts.texts()
+        if isinstance(texts, qp_store.CompressedTexts):
+            live_blobs.extend(texts.blobs())
+        else:
+            live_texts.extend(texts)
+    text_pool.prune(live_texts)
+    text_pool.prune_blobs(live_blobs)
+
+def snapshot_profiles(profiles):
+    """Kopie der Profil-Listen (ohne SDE) als Stand 'wie auf Platte'; Texte selbst werden geteilt."""
+    return {
+        name: {key: (value.copy() if hasattr(value, "copy") else value) for key, value in vals.items()}
+        for name, vals in profiles.items() if name != "SDE"}
+
+def persisted_profile(name):
+    """Profil so, wie es zuletzt geladen/gespeichert wurde (ohne Plattenzugriff) oder None."""
+    stored = app_state.persisted_profiles.get(name)
+    if stored is None:
+        return None
+    return snapshot_profiles({name: stored})[name]
+
 def load_data():
     try:
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
             loaded = json.load(f)
-        if not isinstance(loaded.get("profiles"), dict):
-            loaded["profiles"] = {}
-        for prof, vals in loaded["profiles"].items():
-            vals.setdefault("titles", [])
-            vals.setdefault("texts",  [])
-            vals.setdefault("hotkeys", [])
+        if qp_store.normalize_config(loaded):
+            try:
+                save_data_atomic(loaded, CONFIG_FILE)
+            except Exception as e:
+                logging.warning(f"⚠ Migrierte config.json konnte nicht gespeichert werden: {e}")
+        wrap_profile_texts(loaded["profiles"], lazy=True)
         loaded["profiles"]["SDE"] = load_sde_profile()
         ap = loaded.get("active_profile")
         if ap not in loaded["profiles"]:
@@ -291,22 +556,38 @@ def load_data():
                     "hotkeys": [f"ctrl+shift+{i}"   for i in range(1,6)]},
                 "SDE": load_sde_profile()},
             "active_profile": "Profil 1"}
+app_state.settings = load_settings()
+text_codec = make_text_codec(app_state.settings)
+text_pool = qp_store.TextPool()
+edit_history = qp_edit.History(
+    max_bytes=max(64, app_state.settings["undo_memory_kb"]) * 1024,
+    max_steps=max(1, app_state.settings["undo_max_steps"]))
 app_state.data = load_data()
 app_state.active_profile = app_state.data.get("active_profile", list(app_state.data["profiles"].keys())[0])
+app_state.persisted_profiles = snapshot_profiles(app_state.data["profiles"])
+profile_index = qp_profiles.ProfileIndex(recent=app_state.data.get("recent_profiles"))
+app_state.data["recent_profiles"] = profile_index.recent
 
 #endregion 
 
 #region profiles
 
 def _normalize_rich_text(value):
-    """Normalize rich-text HTML for reliable comparisons."""
-    doc = QtGui.QTextDocument()
-    doc.setHtml(value or "")
-    return doc.toHtml()
+    """Normalize rich-text HTML for reliable comparisons (same form as stored texts)."""
+    return minify_html(value or "")
 def _normalize_title(value):
     return (value or "").strip()
 def _normalize_hotkey(value):
     return (value or "").strip().lower()
+def _texts_differ(texts, stored):
+    """Vergleicht Texte; teure HTML-Normalisierung nur für Einträge, die nicht identisch sind."""
+    if len(texts) != len(stored):
+        return True
+    for new, old in zip(texts, stored):
+        if new != old and _normalize_rich_text(new) != _normalize_rich_text(old):
+            return True
+    return False
+
 def has_field_changes(profile_to_check=None):
     if profile_to_check is None:
         profile_to_check = app_state.active_profile
@@ -325,41 +606,17 @@ def has_field_changes(profile_to_check=None):
             if new_name != _normalize_title(old_name):
                 rename_changed = True
                 break
-    titles, texts, hks = [], [], []
-    for i in range(entries_layout.count()):
-        item = entries_layout.itemAt(i)
-        if item is None:
-            continue
-        row = item.widget()
-        if app_state.edit_mode and isinstance(row, QtWidgets.QWidget):
-            line_edits = row.findChildren(QtWidgets.QLineEdit)
-            text_edits = row.findChildren(QtWidgets.QTextEdit)
-            if len(line_edits) >= 2 and len(text_edits) >= 1:
-                titles.append(line_edits[0].text())
-                texts.append(text_edits[0].toHtml())
-                hks.append(line_edits[1].text())
-    normalized_titles = [_normalize_title(t) for t in titles]
-    normalized_texts = [_normalize_rich_text(t) for t in texts]
-    normalized_hotkeys = [_normalize_hotkey(h) for h in hks]
-    reference_profile = None
-    if isinstance(app_state.last_ui_data, dict):
-        reference_profile = app_state.last_ui_data.get(profile_to_check)
-    if reference_profile is None:
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                persisted = json.load(f)
-            reference_profile = persisted.get("profiles", {}).get(profile_to_check)
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
+    commit_active_editor()
+    current = profiles[profile_to_check]
+    reference_profile = persisted_profile(profile_to_check)
     if reference_profile is None:
         reference_profile = {}
     stored_titles = [_normalize_title(t) for t in reference_profile.get("titles", [])]
-    stored_texts = [_normalize_rich_text(t) for t in reference_profile.get("texts", [])]
     stored_hotkeys = [_normalize_hotkey(h) for h in reference_profile.get("hotkeys", [])]
     fields_changed = (
-        normalized_titles != stored_titles
-        or normalized_texts != stored_texts
-        or normalized_hotkeys != stored_hotkeys)
+        [_normalize_title(t) for t in current.get("titles", [])] != stored_titles
+        or [_normalize_hotkey(h) for h in current.get("hotkeys", [])] != stored_hotkeys
+        or _texts_differ(current.get("texts", []), reference_profile.get("texts", [])))
     changed = rename_changed or fields_changed
     if not changed:
         app_state.unsaved_changes = False
@@ -409,13 +666,8 @@ def apply_profile_renames(show_errors=True):
             continue
         target = proposed.get(old_name, old_name)
         new_profiles[target] = prof_data
-    if len(new_profiles) > 11:
-        if show_errors:
-            show_critical_message("Limit erreicht", "Maximal 10 Profile erlaubt!")
-        return None
-    sde_profile = None
-    if "SDE" in app_state.data["profiles"]:
-        sde_profile = load_sde_profile()
+    sde_profile = app_state.data["profiles"].get("SDE")
+    if sde_profile is not None:
         new_profiles["SDE"] = sde_profile
     if app_state.active_profile in proposed:
         app_state.active_profile = proposed[app_state.active_profile]
@@ -423,6 +675,8 @@ def apply_profile_renames(show_errors=True):
         app_state.active_profile = next((k for k in new_profiles.keys() if k != "SDE"), "SDE")
     app_state.data["profiles"] = new_profiles
     app_state.data["active_profile"] = app_state.active_profile
+    edit_history.rename_profiles(proposed)
+    profile_index.rename(proposed)
     return True
 
 def _remember_profile_name_edit(text):
@@ -446,11 +700,11 @@ def update_profile_buttons():
     combo = getattr(app_state, "profile_selector", None)
     if combo is None:
         return
-    target_index = -1
-    for idx in range(combo.count()):
-        if combo.itemData(idx) == app_state.active_profile:
-            target_index = idx
-            break
+    if combo.popup_handler is not None:
+        # Wechsler-Modus: die Combo zeigt nur das aktive Profil
+        combo.setItemText(0, app_state.active_profile)
+        combo.setItemData(0, app_state.active_profile)
+    target_index = combo.findData(app_state.active_profile)
     if target_index >= 0 and combo.currentIndex() != target_index:
         with QtCore.QSignalBlocker(combo):
             combo.setCurrentIndex(target_index)
@@ -493,43 +747,48 @@ def switch_profile(profile_name):
         if resp == QtWidgets.QMessageBox.Yes:
             save_data(stay_in_edit_mode=True)
         else:
-            try:
-                with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                    file_data = json.load(f)
-                if app_state.active_profile in file_data.get("profiles", {}):
-                    app_state.data["profiles"][app_state.active_profile] = file_data["profiles"][app_state.active_profile].copy()
-            except (FileNotFoundError, json.JSONDecodeError, KeyError):
-                pass
+            editor_pool.release(commit=False)
+            if not edit_history.rollback(app_state.data["profiles"]):
+                persisted = persisted_profile(app_state.active_profile)
+                if persisted is not None:
+                    app_state.data["profiles"][app_state.active_profile] = persisted
+                edit_history.clear()
     if profile_name not in app_state.data["profiles"]:
         show_critical_message("Fehler", f"Profil '{profile_name}' existiert nicht!")
         return
+    editor_pool.release(commit=False)
+    app_state.selected_rows.clear()
+    previous = app_state.active_profile
     app_state.active_profile = profile_name
     app_state.data["active_profile"] = profile_name
-    profiles_to_save = {k: v for k, v in app_state.data["profiles"].items() if k != "SDE"}
-    debounced_saver.schedule_save({"profiles": profiles_to_save, "active_profile": profile_name})
+    profile_index.touch(profile_name)
+    debounced_saver.schedule_state_save()
     update_profile_buttons()
-    if was_visible:
+    if was_visible and not app_state.edit_mode:
+        # Toolbar bleibt, nur die Eintragsseite wechselt
+        show_profile_view()
+    elif was_visible:
         update_ui()
     register_hotkeys()
-    refresh_tray()
+    refresh_tray_active(previous)
     if not was_visible:
         win.hide()
 
 def add_new_profile():
-    non_sde_count = sum(1 for p in app_state.data["profiles"].keys() if p != "SDE")
-    if non_sde_count >= 10:
-        show_critical_message("Limit erreicht", "Maximal 10 eigene Profile (ohne SDE) erlaubt!")
-        return
+    editor_pool.release()
     base, cnt = "Profil", 1
     while f"{base} {cnt}" in app_state.data["profiles"]:
         cnt += 1
     name = f"{base} {cnt}"
     app_state.data["profiles"][name] = {
         "titles":  [f"Titel {i+1}" for i in range(3)],
-        "texts":   [f"Text {i+1}"  for i in range(3)],
+        "texts":   qp_store.wrap_texts([f"Text {i+1}" for i in range(3)], text_codec, text_pool),
         "hotkeys": [f"ctrl+shift+{i+1}" for i in range(3)]}
+    app_state.selected_rows.clear()
+    record_step(qp_edit.Op("add_profile", name, (len(app_state.data["profiles"]) - 1, app_state.data["profiles"][name])), "Profil hinzufügen")
     app_state.active_profile = name
     app_state.data["active_profile"] = name
+    profile_index.touch(name)
     update_ui()
 
 def delete_profile(profile_name):
@@ -544,6 +803,10 @@ def delete_profile(profile_name):
         f"Soll Profil '{profile_name}' wirklich gelöscht werden?")
     if resp != QtWidgets.QMessageBox.Yes:
         return
+    editor_pool.release()
+    app_state.selected_rows.clear()
+    position = list(app_state.data["profiles"]).index(profile_name)
+    record_step(qp_edit.Op("remove_profile", profile_name, (position, app_state.data["profiles"][profile_name])), "Profil löschen", save=True)
     del app_state.data["profiles"][profile_name]
     if app_state.active_profile == profile_name:
         app_state.active_profile = next(iter(app_state.data["profiles"]))
@@ -551,6 +814,102 @@ def delete_profile(profile_name):
     update_ui()
     save_data()
 
+def indexed_profile_names():
+    """Reihenfolge im Wechsler: eigene Profile, dann SDE."""
+    names = [name for name in app_state.data["profiles"] if name != "SDE"]
+    if "SDE" in app_state.data["profiles"]:
+        names.append("SDE")
+    return names
+
+class ProfileSwitcher(QtWidgets.QFrame):
+    """Popup mit Suchfeld; zeigt höchstens LIMIT Treffer aus profile_index, Enter/Klick wählt."""
+    LIMIT = 50
+    VISIBLE_ROWS = 12
+    def __init__(self, anchor, on_pick, skip=(), empty_text="Keine Treffer"):
+        super().__init__(win, QtCore.Qt.Popup)
+        self.setObjectName("qpProfileSwitcher")
+        self.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        self.on_pick = on_pick
+        self.skip = set(skip)
+        self.empty_text = empty_text
+        fg = "white" if app_state.dark_mode else "black"
+        bg = "#2e2e2e" if app_state.dark_mode else "#eeeeee"
+        ebg = "#3c3c3c" if app_state.dark_mode else "white"
+        border = "#555" if app_state.dark_mode else "#ccc"
+        self.setStyleSheet(f"""
+            QFrame#qpProfileSwitcher {{background:{bg}; border: 1px solid {border};}}
+            QLineEdit, QListWidget {{background:{ebg}; color:{fg}; border: 1px solid {border}; border-radius: 4px; padding: 3px;}}
+            QListWidget::item:selected {{background:#4a90e2; color:white;}}
+            QLabel {{color:{fg}; background:transparent;}}""")
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.setSpacing(4)
+        self.search = QtWidgets.QLineEdit()
+        self.search.setPlaceholderText("Profil suchen…")
+        self.search.setClearButtonEnabled(True)
+        self.search.installEventFilter(self)
+        self.list = QtWidgets.QListWidget()
+        self.list.setUniformItemSizes(True)
+        self.list.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.list.itemClicked.connect(self._pick)
+        self.hint = QtWidgets.QLabel()
+        layout.addWidget(self.search)
+        layout.addWidget(self.list)
+        layout.addWidget(self.hint)
+        self.search.textChanged.connect(self.refill)
+        self.refill("")
+        row_height = self.list.sizeHintForRow(0) if self.list.count() else self.search.sizeHint().height()
+        self.list.setFixedHeight(row_height * self.VISIBLE_ROWS + 2 * self.list.frameWidth())
+        self.setFixedWidth(max(anchor.width(), int(260 * app_state.zoom_level)))
+        if anchor is win:
+            self.move(win.mapToGlobal(QtCore.QPoint(8, 8)))
+        else:
+            self.move(anchor.mapToGlobal(QtCore.QPoint(0, anchor.height())))
+    def refill(self, query):
+        names, total = profile_index.search(query, self.LIMIT, self.skip)
+        self.list.clear()
+        for name in names:
+            item = QtWidgets.QListWidgetItem(f"✓ {name}" if name == app_state.active_profile else name)
+            item.setData(QtCore.Qt.UserRole, name)
+            self.list.addItem(item)
+        if names:
+            self.list.setCurrentRow(0)
+        if not total:
+            self.hint.setText(self.empty_text)
+        elif total > len(names):
+            self.hint.setText(f"{len(names)} von {total} – Suche verfeinern")
+        self.hint.setVisible(not total or total > len(names))
+    def eventFilter(self, obj, event):
+        if obj is self.search and event.type() == QtCore.QEvent.KeyPress:
+            key = event.key()
+            if key in (QtCore.Qt.Key_Up, QtCore.Qt.Key_Down, QtCore.Qt.Key_PageUp, QtCore.Qt.Key_PageDown):
+                QtWidgets.QApplication.sendEvent(self.list, event)
+                return True
+            if key in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+                item = self.list.currentItem()
+                if item is not None:
+                    self._pick(item)
+                return True
+        return super().eventFilter(obj, event)
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.search.setFocus()
+    def _pick(self, item):
+        on_pick, self.on_pick = self.on_pick, None
+        name = item.data(QtCore.Qt.UserRole)
+        self.close()
+        if on_pick is not None:
+            on_pick(name)
+
+def open_profile_switcher(anchor=None, on_pick=None, skip=(), empty_text="Keine Treffer"):
+    """Profilwechsler unter anchor (Standard: Profilauswahl der Toolbar); on_pick(name) statt Profilwechsel."""
+    profile_index.sync(indexed_profile_names())
+    if anchor is None:
+        anchor = app_state.profile_selector or win
+    switcher = ProfileSwitcher(anchor, on_pick or switch_profile, skip, empty_text)
+    switcher.show()
+    return switcher
+
 #endregion 
 
 #region insert text / hotkeys
@@ -595,15 +954,120 @@ def process_events_for(duration_ms):
     QtCore.QTimer.singleShot(duration_ms, loop.quit)
     loop.exec_()
 
-def set_clipboard_html(html_content, plain_text_content):
+def plain_text_of(html_text):
+    """Plaintext eines Snippets, pro Inhalts-Hash nur einmal berechnet."""
+    return text_pool.derived(html_text, "plain", html_to_plain)
+
+_counters = None
+
+def next_counter(name):
+    """Nächster Stand eines {{counter:name}}-Zählers; gespeichert in counters.json."""
+    global _counters
+    if _counters is None:
+        try:
+            with open(COUNTERS_FILE, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            _counters = {k: v for k, v in loaded.items() if isinstance(v, int)} if isinstance(loaded, dict) else {}
+        except (FileNotFoundError, ValueError):
+            _counters = {}
+    _counters[name] = _counters.get(name, 0) + 1
+    QtCore.QTimer.singleShot(0, _save_counters)
+    return _counters[name]
+
+def _save_counters():
+    try:
+        save_data_atomic(_counters, COUNTERS_FILE)
+    except Exception as e:
+        logging.warning(f"⚠ counters.json nicht gespeichert: {e}")
+
+def _clipboard_text():
+    try:
+        return QtWidgets.QApplication.clipboard().text()
+    except Exception:
+        return ""
+
+def template_of(html_text):
+    """Kompiliertes Template eines Snippets (einmal pro Textinhalt) oder None."""
+    if not html_text or "{{" not in html_text:
+        return None
+    return text_pool.derived(html_text, "template", lambda t: qp_template.compile_snippet(t, plain_text_of(t)))
+
+def render_snippet(html_text, generated=None):
+    """
+    (Klartext, CF_HTML-Bytes oder None) – Platzhalter werden zum Einfügezeitpunkt ausgewertet.
+    Ohne generated werden gen-Felder aus dem Cache bzw. mit ihrem Ersatztext gefüllt.
+    """
+    compiled = template_of(html_text)
+    if compiled is None:
+        return plain_text_of(html_text), None
+    if generated is None and compiled.gen_fields:
+        generated = cached_generated(compiled.gen_fields)
+    values = qp_template.resolve_fields(
+        compiled.fields, datetime.datetime.now(), getpass.getuser(), _clipboard_text, next_counter, generated)
+    return compiled.plain.render(values), compiled.cf_html.render(values)
+
+class _GeneratorBridge(QtCore.QObject):
+    call = QtCore.pyqtSignal(object)
+
+_generator_bridge = None
+_generator_host = None
+
+def generator_host():
+    """Prozess-Pool für {{gen:...}}-Felder, beim ersten Bedarf angelegt."""
+    global _generator_host, _generator_bridge
+    if _generator_host is None:
+        settings = app_state.settings
+        _generator_bridge = _GeneratorBridge()
+        _generator_bridge.call.connect(lambda fn: fn())
+        _generator_host = qp_generators.GeneratorHost(
+            settings.get("generator_dir") or os.path.join(APPDATA_PATH, "generators"),
+            call_soon=_generator_bridge.call.emit,
+            schedule=lambda ms, fn: QtCore.QTimer.singleShot(ms, fn),
+            workers=settings.get("generator_workers", 1),
+            timeout_ms=settings.get("generator_timeout_ms", 1500),
+            ttl_s=settings.get("generator_ttl_s", 60))
+        app.aboutToQuit.connect(_generator_host.shutdown)
+    return _generator_host
+
+def _gen_calls(gen_fields):
+    calls = {}
+    for field in gen_fields:
+        try:
+            calls[field] = qp_generators.parse_call(field.arg)
+        except ValueError as e:
+            logging.warning(f"⚠ {{{{gen:{field.arg}}}}}: {e}")
+    return calls
+
+def cached_generated(gen_fields):
+    """gen-Werte ohne zu warten: Cache, sonst Ersatztext."""
+    host = generator_host()
+    generated = {}
+    for field, call in _gen_calls(gen_fields).items():
+        value = host.cached(call)
+        generated[field] = call.default if value is None else value
+    return generated
+
+def request_generated(gen_fields, on_ready):
+    """Berechnet gen-Felder im Pool und ruft on_ready({Field: Text}) im GUI-Thread auf."""
+    calls = _gen_calls(gen_fields)
+    def done(values):
+        on_ready({field: values.get(call, call.default) for field, call in calls.items()})
+    generator_host().resolve(list(dict.fromkeys(calls.values())), done)
+
+def set_clipboard_html(html_content, plain_text_content, html_bytes=None):
     """
     Legt HTML + Plaintext korrekt in die Windows-Zwischenablage:
     - Plaintext als CF_UNICODETEXT (Umlaute/Emoji sicher)
     - HTML als CF_HTML mit korrekten Byte-Offsets (CRLF, UTF-8)
+    Mit html_content=None wird nur Plaintext gesetzt (kein CF_HTML-Encoding).
+    html_bytes: bereits fertige CF_HTML-Bytes (z.B. gerendertes Template).
     """
     max_retries = 3
     retry_delay = 0.02
-    cf_html = win32clipboard.RegisterClipboardFormat("HTML Format")
+    with_html = html_content is not None
+    cf_html = win32clipboard.RegisterClipboardFormat("HTML Format") if with_html else None
+    if with_html and html_bytes is None:
+        html_bytes = text_pool.derived(html_content, "cf_html", build_cf_html)
     for attempt in range(max_retries):
         try:
             with ClipboardManager() as clipboard:
@@ -612,40 +1076,11 @@ def set_clipboard_html(html_content, plain_text_content):
                     return False
                 clipboard.empty()
                 clipboard.set_text(plain_text_content or "", win32con.CF_UNICODETEXT)
-                fragment = html_content or ""
-                html_body = (
-                    "<!DOCTYPE html><html><body>"
-                    "<!--StartFragment-->"
-                    + fragment +
-                    "<!--EndFragment-->"
-                    "</body></html>")
-                header_tmpl = (
-                    "Version:0.9\r\n"
-                    "StartHTML:{start_html:010d}\r\n"
-                    "EndHTML:{end_html:010d}\r\n"
-                    "StartFragment:{start_frag:010d}\r\n"
-                    "EndFragment:{end_frag:010d}\r\n")
-                placeholder = header_tmpl.format(
-                    start_html=0, end_html=0, start_frag=0, end_frag=0
-                ).encode("utf-8")
-                body_bytes = html_body.encode("utf-8")
-                start_html = len(placeholder)
-                end_html   = start_html + len(body_bytes)
-                sf_in_body = body_bytes.find(b"<!--StartFragment-->") + len(b"<!--StartFragment-->")
-                ef_in_body = body_bytes.find(b"<!--EndFragment-->")
-                start_frag = start_html + sf_in_body
-                end_frag   = start_html + ef_in_body
-                header_bytes = header_tmpl.format(
-                    start_html=start_html,
-                    end_html=end_html,
-                    start_frag=start_frag,
-                    end_frag=end_frag
-                ).encode("utf-8")
-                full_bytes = header_bytes + body_bytes
-                clipboard.set_data(cf_html, full_bytes)
+                if with_html:
+                    clipboard.set_data(cf_html, html_bytes)
             with ClipboardManager() as verify_clipboard:
                 if verify_clipboard.is_open():
-                    html_ok = win32clipboard.IsClipboardFormatAvailable(cf_html)
+                    html_ok = win32clipboard.IsClipboardFormatAvailable(cf_html) if with_html else True
                     txt_ok  = win32clipboard.IsClipboardFormatAvailable(win32con.CF_UNICODETEXT)
                     if html_ok and txt_ok:
                         logging.info(f"Clipboard set (attempt {attempt+1}).")
@@ -668,17 +1103,14 @@ def release_all_modifier_keys(callback=None, delay_before_callback_ms=50):
     ohne die 'keyboard'-Bibliothek zu verwenden.
     """
     try:
-        user32 = ctypes.windll.user32
-        KEYEVENTF_KEYUP = 0x0002
-        modifiers = (0x11, 0x10, 0x12, 0x5B, 0x5C)
+        events = qp_input.modifier_release_events()
         iterations = 3
         interval_ms = 10
         def run_iteration(iteration):
-            for vk in modifiers:
-                try:
-                    user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
-                except Exception:
-                    pass
+            try:
+                input_backend.send(events)
+            except Exception:
+                pass
             if iteration + 1 < iterations:
                 QtCore.QTimer.singleShot(interval_ms, lambda: run_iteration(iteration + 1))
             elif callback is not None:
@@ -689,52 +1121,129 @@ def release_all_modifier_keys(callback=None, delay_before_callback_ms=50):
         if callback is not None:
             QtCore.QTimer.singleShot(max(0, int(delay_before_callback_ms)), callback)
 
-def insert_text(index):
-    def _send_ctrl_v():
-        user32 = ctypes.windll.user32
-        user32.keybd_event(0x11, 0, 0, 0)
-        user32.keybd_event(0x56, 0, 0, 0)
-        user32.keybd_event(0x56, 0, 2, 0)
-        user32.keybd_event(0x11, 0, 2, 0)
-    def schedule_ctrl_v():
+input_backend = qp_input.default_backend()
+foreground_tracker = qp_input.ForegroundTracker()
+_paste_rules_cache = None
+
+def get_paste_rules():
+    """Kompilierte Regeltabelle (paste_rules + direct_typing_apps), einmal pro Settings-Stand."""
+    global _paste_rules_cache
+    settings = app_state.settings
+    if _paste_rules_cache is not None and _paste_rules_cache[0] is settings:
+        return _paste_rules_cache[1], _paste_rules_cache[2]
+    paste_delay = max(0, settings.get("paste_delay_ms", 200))
+    raw_rules = list(settings.get("paste_rules", []))
+    raw_rules += [
+        {"process": a, "strategy": qp_input.STRATEGY_TYPE}
+        for a in settings.get("direct_typing_apps", []) if isinstance(a, str) and a.strip()]
+    rules = qp_input.compile_paste_rules(raw_rules, paste_delay)
+    default = qp_input.PasteRule("", "", qp_input.STRATEGY_AUTO, paste_delay, 50)
+    _paste_rules_cache = (settings, rules, default)
+    return rules, default
+
+def resolve_paste_rule():
+    rules, default = get_paste_rules()
+    if not rules:
+        return default
+    return qp_input.match_paste_rule(foreground_tracker.current(), rules, default)
+
+def should_type_directly(html_text, plain_text):
+    """Kurze Texte ohne Formatierung werden getippt statt eingefügt."""
+    return qp_input.should_type_directly(html_text, plain_text, app_state.settings.get("direct_typing_max_chars", 0))
+
+def type_text_direct(plain_text, on_done=None):
+    """Tippt den Text per Unicode-SendInput, ein SendInput-Array pro Block."""
+    settings = app_state.settings
+    chunks = list(qp_input.unicode_chunks(plain_text, settings.get("direct_typing_chunk_events", 64)))
+    delay_ms = max(0, settings.get("direct_typing_chunk_delay_ms", 5))
+    def finish():
+        QtCore.QTimer.singleShot(50, release_all_modifier_keys)
+        if on_done is not None:
+            on_done()
+    def send_chunk(pos):
+        if pos >= len(chunks):
+            finish()
+            return
+        try:
+            input_backend.send(chunks[pos])
+        except Exception as e:
+            logging.exception(f"Direkteingabe abgebrochen bei Block {pos+1}/{len(chunks)}: {e}")
+            finish()
+            return
+        QtCore.QTimer.singleShot(delay_ms, lambda: send_chunk(pos + 1))
+    release_all_modifier_keys(callback=lambda: send_chunk(0), delay_before_callback_ms=0)
+
+paste_queue = qp_input.PasteQueue(
+    schedule=lambda ms, fn: QtCore.QTimer.singleShot(max(0, int(ms)), fn),
+    max_depth=app_state.settings.get("paste_queue_max", 8),
+    coalesce_ms=app_state.settings.get("paste_coalesce_ms", 0),
+    settle_ms=app_state.settings.get("paste_settle_ms", 100))
+
+def enqueue_paste(index, profile=None):
+    """Einfügen per Hotkey/IPC: läuft über paste_queue, damit schnelle Tastendrücke sich nicht überholen."""
+    profile = profile or app_state.active_profile
+    return paste_queue.submit((profile, index), lambda done: insert_text(index, profile, on_done=done))
+
+def insert_text(index, profile=None, *, generated=None, on_done=None):
+    """Fügt einen Eintrag ein; on_done() kommt, wenn die Tasten gesendet und losgelassen sind."""
+    profile = profile or app_state.active_profile
+    finish = on_done or (lambda: None)
+    rule = resolve_paste_rule()
+    if rule.strategy == qp_input.STRATEGY_SHIFT_INSERT:
+        paste_keys = qp_input.key_combo((qp_input.VK_SHIFT,), qp_input.VK_INSERT)
+    else:
+        paste_keys = qp_input.key_combo((qp_input.VK_CONTROL,), qp_input.VK_V)
+    def schedule_paste_keys():
         def perform_paste():
             try:
-                _send_ctrl_v()
+                input_backend.send(paste_keys)
             finally:
-                QtCore.QTimer.singleShot(50, release_all_modifier_keys)
+                QtCore.QTimer.singleShot(rule.release_delay_ms,
+                    lambda: release_all_modifier_keys(callback=finish, delay_before_callback_ms=0))
             logging.info(f"Successfully inserted text for index {index}")
         release_all_modifier_keys(callback=perform_paste, delay_before_callback_ms=0)
     try:
-        txt = app_state.data["profiles"][app_state.active_profile]["texts"][index]
+        txt = app_state.data["profiles"][profile]["texts"][index]
         logging.info(f"Inserting text for index {index}: {txt[:50]}...")
-    except IndexError:
+    except (IndexError, KeyError):
         logging.exception(
-            f"Kein Text vorhanden für Hotkey-Index {index} im Profil '{app_state.active_profile}'")
+            f"Kein Text vorhanden für Hotkey-Index {index} im Profil '{profile}'")
+        finish()
         return
     try:
+        compiled = template_of(txt)
+        if generated is None and compiled is not None and compiled.gen_fields:
+            request_generated(compiled.gen_fields, lambda values: insert_text(index, profile, generated=values, on_done=on_done))
+            return
+        plain_text, html_bytes = render_snippet(txt, generated)
+        strategy = rule.strategy
+        if strategy == qp_input.STRATEGY_AUTO:
+            strategy = qp_input.STRATEGY_TYPE if should_type_directly(txt, plain_text) else qp_input.STRATEGY_HTML
+        if strategy == qp_input.STRATEGY_TYPE:
+            type_text_direct(plain_text, on_done=finish)
+            logging.info(f"Typed text directly for index {index} ({len(plain_text)} chars)")
+            return
         release_all_modifier_keys()
-        doc = QtGui.QTextDocument()
-        doc.setHtml(txt)
-        plain_text = doc.toPlainText()
-        success = set_clipboard_html(txt, plain_text)
+        html_payload = txt if strategy == qp_input.STRATEGY_HTML else None
+        success = set_clipboard_html(html_payload, plain_text, html_bytes if html_payload is not None else None)
         if not success:
             logging.warning("Windows clipboard failed, falling back to pyperclip")
             pyperclip.copy(plain_text)
             logging.info(f"Fallback: Set plain text to clipboard: {plain_text[:30]}...")
-        QtCore.QTimer.singleShot(200, schedule_ctrl_v)
+        QtCore.QTimer.singleShot(rule.paste_delay_ms, schedule_paste_keys)
     except Exception as e:
         logging.exception(f"Error in insert_text for index {index}: {e}")
         try:
-            doc = QtGui.QTextDocument()
-            doc.setHtml(txt)
-            plain_text = doc.toPlainText()
+            plain_text = plain_text_of(txt)
             pyperclip.copy(plain_text)
             logging.info(f"Final fallback: Set plain text to clipboard: {plain_text[:30]}...")
             release_all_modifier_keys()
-            QtCore.QTimer.singleShot(200, schedule_ctrl_v)
+            QtCore.QTimer.singleShot(rule.paste_delay_ms, schedule_paste_keys)
         except Exception as fallback_error:
             logging.exception(f"All clipboard methods failed for index {index}: {fallback_error}")
-def copy_text_to_clipboard(index):
+            finish()
+
+def copy_text_to_clipboard(index, *, generated=None):
     try:
         txt = app_state.data["profiles"][app_state.active_profile]["texts"][index]
     except IndexError:
@@ -742,10 +1251,12 @@ def copy_text_to_clipboard(index):
             f"Kein Text vorhanden für Index {index} im Profil '{app_state.active_profile}'")
         return
     try:
-        doc = QtGui.QTextDocument()
-        doc.setHtml(txt)
-        plain_text = doc.toPlainText()
-        success = set_clipboard_html(txt, plain_text)
+        compiled = template_of(txt)
+        if generated is None and compiled is not None and compiled.gen_fields:
+            request_generated(compiled.gen_fields, lambda values: copy_text_to_clipboard(index, generated=values))
+            return
+        plain_text, html_bytes = render_snippet(txt, generated)
+        success = set_clipboard_html(txt, plain_text, html_bytes)
         if not success:
             logging.warning("Windows clipboard failed, falling back to pyperclip")
             pyperclip.copy(plain_text)
@@ -753,9 +1264,7 @@ def copy_text_to_clipboard(index):
     except Exception as e:
         logging.exception(f"Error copying text for index {index}: {e}")
         try:
-            doc = QtGui.QTextDocument()
-            doc.setHtml(txt)
-            plain_text = doc.toPlainText()
+            plain_text = plain_text_of(txt)
             pyperclip.copy(plain_text)
             logging.info(f"Final fallback: Copied plain text to clipboard: {plain_text[:30]}...")
         except Exception as fallback_error:
@@ -818,13 +1327,15 @@ def register_hotkeys():
         except Exception:
             return None
     cleanup_hotkeys()
-    erlaubte_zeichen = set("1234567890befhmpqvxz§'^")
+    erlaubte_zeichen = set(HOTKEY_CHARS)
     belegte = set()
     fehler = False
     hotkeys = app_state.data["profiles"].setdefault(app_state.active_profile, {}).setdefault("hotkeys", [])
+    bindings = [(f"Eintrag {i+1}", raw, i) for i, raw in enumerate(hotkeys)]
+    bindings += [(f"Makro '{m.title}'", m.hotkey, ("macro", m)) for m in compiled_macros(app_state.active_profile)]
     next_id = 1
-    for i, hot in enumerate(hotkeys):
-        hot = (hot or "").strip().lower()
+    for label, raw, target in bindings:
+        hot = (raw or "").strip().lower()
         if not hot:
             continue
         parts = hot.split("+")
@@ -835,18 +1346,18 @@ def register_hotkeys():
             or parts[2] not in erlaubte_zeichen):
             show_critical_message(
                 "Fehler",
-                f"Ungültiger Hotkey \"{hotkeys[i]}\" für Eintrag {i+1}.\n"
+                f"Ungültiger Hotkey \"{raw}\" für {label}.\n"
                 f"Erlaubte Zeichen: {''.join(sorted(erlaubte_zeichen))}\n"
                 f"Format: ctrl+shift+[zeichen]")
             fehler = True
             continue
         if hot in belegte:
-            show_critical_message("Fehler", f"Hotkey \"{hotkeys[i]}\" wird bereits verwendet!")
+            show_critical_message("Fehler", f"Hotkey \"{raw}\" wird bereits verwendet!")
             fehler = True
             continue
         belegte.add(hot)
-        if i >= len(app_state.data["profiles"][app_state.active_profile]["texts"]):
-            logging.warning(f"⚠ Hotkey '{hot}' zeigt auf Eintrag {i+1}, aber dieser existiert nicht.")
+        if isinstance(target, int) and target >= len(app_state.data["profiles"][app_state.active_profile]["texts"]):
+            logging.warning(f"⚠ Hotkey '{hot}' zeigt auf Eintrag {target+1}, aber dieser existiert nicht.")
             continue
         ch = parts[2]
         vk = _vk_from_char(ch)
@@ -859,7 +1370,7 @@ def register_hotkeys():
             logging.error(f"RegisterHotKey fehlgeschlagen für {hot} (id={next_id})")
             fehler = True
             continue
-        app_state.id_to_index[next_id] = i
+        app_state.id_to_index[next_id] = target
         app_state.registered_hotkey_ids.append(next_id)
         next_id += 1
     logging.info(f"Registered {len(app_state.registered_hotkey_ids)} hotkeys for profile '{app_state.active_profile}'")
@@ -881,24 +1392,190 @@ def register_hotkeys():
                         try:
                             hotkey_id = int(msg.wParam)
                             idx = app_state.id_to_index.get(hotkey_id)
-                            if idx is not None:
-                                insert_text(idx)
+                            if hotkey_id == MACRO_CANCEL_HOTKEY_ID:
+                                cancel_macro()
+                            elif isinstance(idx, tuple):
+                                enqueue_macro(idx[1])
+                            elif idx is not None:
+                                enqueue_paste(idx)
                         except Exception as e:
                             logging.exception(f"Fehler im WM_HOTKEY-Handler: {e}")
                 return False, 0
         app_state.hotkey_filter_instance = _HotkeyFilter()
         app.installNativeEventFilter(app_state.hotkey_filter_instance)
         app.aboutToQuit.connect(cleanup_hotkeys)
+    update_abbreviations()
     return fehler
 
 #endregion
 
+#region macros
+
+MACRO_CANCEL_HOTKEY_ID = 0xBF00
+VK_ESCAPE = 0x1B
+
+def compiled_macros(profile_name):
+    """Gültige Makros eines Profils; fehlerhafte werden protokolliert und übersprungen."""
+    vals = app_state.data["profiles"].get(profile_name, {})
+    macros = []
+    for raw in vals.get("macros", []) or []:
+        try:
+            macros.append(qp_macro.compile_macro(raw, vals.get("titles", [])))
+        except ValueError as e:
+            logging.warning(f"⚠ Makro in Profil '{profile_name}' ignoriert: {e}")
+    return macros
+
+class _MacroExecutor:
+    """Führt Makro-Schritte über den normalen Einfüge-Pfad aus (Regeln, Zwischenablage, SendInput)."""
+    def __init__(self, profile_name):
+        self.texts = app_state.data["profiles"][profile_name]["texts"]
+        self.rule = resolve_paste_rule()
+    def prepare(self, step):
+        if step.kind != "snippet":
+            return step.value
+        txt = self.texts[step.value]
+        plain, html_bytes = render_snippet(txt)
+        strategy = self.rule.strategy
+        if strategy == qp_input.STRATEGY_AUTO:
+            strategy = qp_input.STRATEGY_TYPE if should_type_directly(txt, plain) else qp_input.STRATEGY_HTML
+        if strategy == qp_input.STRATEGY_HTML and html_bytes is None:
+            html_bytes = text_pool.derived(txt, "cf_html", build_cf_html)
+        return (txt, plain, strategy, html_bytes)
+    def run(self, step, payload, done):
+        if step.kind == "key":
+            input_backend.send(payload)
+            done()
+            return
+        txt, plain, strategy, html_bytes = payload
+        if strategy == qp_input.STRATEGY_TYPE:
+            type_text_direct(plain, on_done=done)
+            return
+        with_html = strategy == qp_input.STRATEGY_HTML
+        if not set_clipboard_html(txt if with_html else None, plain, html_bytes if with_html else None):
+            pyperclip.copy(plain)
+        if strategy == qp_input.STRATEGY_SHIFT_INSERT:
+            keys = qp_input.key_combo((qp_input.VK_SHIFT,), qp_input.VK_INSERT)
+        else:
+            keys = qp_input.key_combo((qp_input.VK_CONTROL,), qp_input.VK_V)
+        def paste():
+            try:
+                input_backend.send(keys)
+            except Exception as e:
+                logging.warning(f"⚠ Makro: Einfügen fehlgeschlagen: {e}")
+            finally:
+                QtCore.QTimer.singleShot(self.rule.release_delay_ms, done)
+        QtCore.QTimer.singleShot(self.rule.paste_delay_ms, paste)
+
+def _set_macro_cancel_hotkey(active):
+    if sys.platform != "win32":
+        return
+    user32 = ctypes.windll.user32
+    if active:
+        if not user32.RegisterHotKey(None, MACRO_CANCEL_HOTKEY_ID, 0, VK_ESCAPE):
+            logging.warning("⚠ Esc als Makro-Abbruch nicht registrierbar")
+    else:
+        user32.UnregisterHotKey(None, MACRO_CANCEL_HOTKEY_ID)
+
+def enqueue_macro(macro):
+    """Makros laufen als ein Job der paste_queue; Abbruch per Esc oder nach macro_timeout_ms."""
+    timeout_ms = qp_macro.macro_timeout_ms(macro, app_state.settings.get("macro_step_gap_ms", 20))
+    return paste_queue.submit(("macro", macro.title),
+        lambda done: run_macro(macro, on_done=done, timeout_ms=timeout_ms), timeout_ms=timeout_ms)
+
+def run_macro(macro, on_done=None, timeout_ms=None):
+    if app_state.macro_runner is not None:
+        logging.info(f"Makro '{macro.title}' ignoriert, '{app_state.macro_runner.macro.title}' läuft noch")
+        if on_done is not None:
+            on_done()
+        return
+    profile_name = app_state.active_profile
+    def finished(runner):
+        _macro_finished(runner)
+        if on_done is not None:
+            on_done()
+    runner = qp_macro.MacroRunner(
+        macro, _MacroExecutor(profile_name),
+        schedule=lambda ms, fn: QtCore.QTimer.singleShot(max(0, int(ms)), fn),
+        step_gap_ms=app_state.settings.get("macro_step_gap_ms", 20),
+        on_finished=finished)
+    app_state.macro_runner = runner
+    _set_macro_cancel_hotkey(True)
+    if timeout_ms:
+        QtCore.QTimer.singleShot(timeout_ms, lambda: _macro_timed_out(runner, timeout_ms))
+    release_all_modifier_keys(callback=runner.start, delay_before_callback_ms=0)
+
+def _macro_timed_out(runner, timeout_ms):
+    if not runner.finished:
+        logging.warning(f"⚠ Makro '{runner.macro.title}' nach {timeout_ms} ms abgebrochen")
+        runner.cancel()
+
+def cancel_macro():
+    if app_state.macro_runner is not None:
+        logging.info(f"Makro '{app_state.macro_runner.macro.title}' per Esc abgebrochen")
+        app_state.macro_runner.cancel()
+        paste_queue.clear()
+
+def _macro_finished(runner):
+    app_state.macro_runner = None
+    _set_macro_cancel_hotkey(False)
+    release_all_modifier_keys()
+    app_state.macro_timings[runner.macro.title] = list(runner.timings)
+    steps = ", ".join(f"{pos+1}:{kind} {ms}ms" for pos, kind, ms in runner.timings)
+    state = "abgebrochen" if runner.cancelled else "fertig"
+    logging.info(f"Makro '{runner.macro.title}' {state} nach {runner.total_ms} ms ({steps})")
+
+#endregion
+
+#region abbreviations
+
+def compiled_abbreviations(profile_name):
+    """{Kürzel: Index} eines Profils; ungültige Kürzel werden protokolliert und übersprungen."""
+    vals = app_state.data["profiles"].get(profile_name, {})
+    try:
+        abbreviations, warnings = qp_abbrev.compile_abbreviations(vals.get("abbreviations") or {}, vals.get("titles", []))
+    except ValueError as e:
+        logging.warning(f"⚠ Kürzel in Profil '{profile_name}' ignoriert: {e}")
+        return {}
+    for warning in warnings:
+        logging.warning(f"⚠ Profil '{profile_name}': {warning}")
+    return abbreviations
+
+def expand_abbreviation(match):
+    """Löscht das getippte Kürzel per Backspace und fügt den Eintrag über die paste_queue ein."""
+    if app_state.edit_mode or app.activeWindow() is not None:
+        return
+    profile, index = app_state.active_profile, match.target
+    def start(done):
+        input_backend.send(qp_input.key_taps(qp_input.VK_BACK, len(match.abbrev)))
+        insert_text(index, profile, on_done=done)
+    enqueued = paste_queue.submit(("abbrev", profile, index), start)
+    if enqueued:
+        logging.info(f"Kürzel '{match.abbrev}' -> Eintrag {index+1}")
+
+class _AbbrevBridge(QtCore.QObject):
+    """Bringt Treffer aus dem Hook-Thread in den GUI-Thread."""
+    matched = QtCore.pyqtSignal(object)
+
+_abbrev_bridge = _AbbrevBridge()
+_abbrev_bridge.matched.connect(expand_abbreviation, QtCore.Qt.QueuedConnection)
+abbreviation_hook = qp_abbrev.KeyboardHook(_abbrev_bridge.matched.emit)
+
+def update_abbreviations():
+    """Automat für das aktive Profil neu bauen; ohne Kürzel läuft kein Hook."""
+    abbreviations = compiled_abbreviations(app_state.active_profile) if app_state.settings.get("abbreviations_enabled", True) else {}
+    abbreviation_hook.set_matcher(qp_abbrev.AbbrevMatcher(abbreviations))
+
+#endregion
+
 #region Tray
 
 def create_tray_icon():
     try:
         if app_state.tray:
             try:
+                old_menu = app_state.tray.contextMenu()
+                if old_menu is not None:
+                    old_menu.deleteLater()
                 app_state.tray.hide()
                 app_state.tray.setParent(None)
                 app_state.tray.deleteLater()
@@ -918,20 +1595,7 @@ def create_tray_icon():
             icon = win.style().standardIcon(QtWidgets.QStyle.SP_ComputerIcon)
         app_state.tray = QSystemTrayIcon(icon, win)
         app_state.tray.setToolTip(f"Aktives Profil: {app_state.active_profile}")
-        menu = QMenu()
-        for prof in app_state.data["profiles"]:
-            label = f"✓ {prof}" if prof == app_state.active_profile else f"  {prof}"
-            act = QAction(label, win)
-            act.triggered.connect(partial(switch_profile, prof))
-            menu.addAction(act)
-        menu.addSeparator()
-        act_show = QAction("Öffnen", win)
-        act_show.triggered.connect(lambda: (win.show(), win.raise_(), win.activateWindow()))
-        menu.addAction(act_show)
-        act_quit = QAction("Beenden", win)
-        act_quit.triggered.connect(lambda: (save_window_position(), app.quit()))
-        menu.addAction(act_quit)
-        app_state.tray.setContextMenu(menu)
+        app_state.tray.setContextMenu(build_tray_menu())
         app_state.tray.activated.connect(
             lambda reason: (win.show(), win.raise_(), win.activateWindow()) 
             if reason == QSystemTrayIcon.Trigger else None)
@@ -943,15 +1607,89 @@ def create_tray_icon():
         app_state.tray = None
         return False
 
+def build_tray_menu():
+    """Menü samt Aktionen hängt an win; die Aktionen gehören dem Menü und verschwinden mit ihm."""
+    menu = QMenu(win)
+    profiles = app_state.data["profiles"]
+    limit = max(1, app_state.settings["tray_recent_profiles"])
+    if len(profiles) <= limit:
+        shown = list(profiles)
+    else:
+        # aktives Profil, zuletzt benutzte, Rest auffüllen; alles andere über den Wechsler
+        shown = [app_state.active_profile] + profile_index.recent_names(profiles, limit - 1, skip={app_state.active_profile})
+        for prof in profiles:
+            if len(shown) >= limit:
+                break
+            if prof not in shown:
+                shown.append(prof)
+    app_state.tray_profile_actions = OrderedDict()
+    for prof in shown:
+        menu.addAction(_tray_profile_action(menu, prof))
+    if len(shown) < len(profiles):
+        act_pick = QAction(f"Profil wählen… ({len(profiles)})", menu)
+        act_pick.triggered.connect(lambda: (show_main_window(), open_profile_switcher()))
+        menu.addAction(act_pick)
+    menu.addSeparator()
+    act_show = QAction("Öffnen", menu)
+    act_show.triggered.connect(lambda: (win.show(), win.raise_(), win.activateWindow()))
+    menu.addAction(act_show)
+    act_quit = QAction("Beenden", menu)
+    act_quit.triggered.connect(lambda: (save_window_position(), app.quit()))
+    menu.addAction(act_quit)
+    return menu
+
+def _tray_profile_action(menu, prof):
+    label = f"✓ {prof}" if prof == app_state.active_profile else f"  {prof}"
+    act = QAction(label, menu)
+    act.triggered.connect(partial(switch_profile, prof))
+    app_state.tray_profile_actions[prof] = act
+    return act
+
+def refresh_tray_active(previous):
+    """
+    Nach einem Profilwechsel nur die Einträge des alten und des neuen Profils
+    anpassen. Mit mehr Profilen als tray_recent_profiles rückt das neue nach
+    oben (wie in build_tray_menu) und der älteste Eintrag fällt weg.
+    """
+    actions = app_state.tray_profile_actions
+    menu = app_state.tray.contextMenu() if app_state.tray is not None else None
+    profiles = app_state.data["profiles"]
+    current = app_state.active_profile
+    limit = max(1, app_state.settings["tray_recent_profiles"])
+    if menu is None or not actions or (len(profiles) <= limit and current not in actions):
+        refresh_tray()
+        return
+    app_state.tray.setToolTip(f"Aktives Profil: {current}")
+    if previous in actions:
+        actions[previous].setText(f"  {previous}")
+    act = actions.get(current)
+    if act is not None:
+        act.setText(f"✓ {current}")
+    if len(profiles) <= limit:
+        return
+    first = next(iter(actions.values()))
+    if act is None:
+        act = _tray_profile_action(menu, current)
+        menu.insertAction(first, act)
+    elif act is not first:
+        menu.removeAction(act)
+        menu.insertAction(first, act)
+    actions.move_to_end(current, last=False)
+    while len(actions) > limit:
+        _, dropped = actions.popitem()
+        menu.removeAction(dropped)
+        dropped.deleteLater()
+
 def refresh_tray():
-    if app_state.tray is not None:
-        try:
-            app_state.tray.hide()
-            app_state.tray.deleteLater()
-        except Exception as e:
-            logging.warning(f"Failed to cleanup tray: {e}")
-        app_state.tray = None
-    create_tray_icon()
+    """Tooltip und Menü neu; das Tray-Icon selbst bleibt bestehen."""
+    if app_state.tray is None:
+        create_tray_icon()
+        return
+    app_state.tray.setToolTip(f"Aktives Profil: {app_state.active_profile}")
+    old_menu = app_state.tray.contextMenu()
+    app_state.tray.setContextMenu(build_tray_menu())
+    if old_menu is not None:
+        old_menu.deleteLater()
 
 def minimize_to_tray():
     win.hide()
@@ -1033,79 +1771,263 @@ class DragDropWidget(QtWidgets.QWidget):
             self.setStyleSheet(self.original_style)
             self.is_highlighted = False
 
-def add_new_entry():
-    if "titles" not in app_state.data["profiles"][app_state.active_profile]:
-        app_state.data["profiles"][app_state.active_profile]["titles"] = []
-    if "texts" not in app_state.data["profiles"][app_state.active_profile]:
-        app_state.data["profiles"][app_state.active_profile]["texts"] = []
-    if "hotkeys" not in app_state.data["profiles"][app_state.active_profile]:
-        app_state.data["profiles"][app_state.active_profile]["hotkeys"] = []
-    erlaubte_zeichen = "1234567890befhmpqvxz§'^"
-    belegte_hotkeys = set(app_state.data["profiles"][app_state.active_profile]["hotkeys"])
-    neuer_hotkey = ""
-    for zeichen in erlaubte_zeichen:
-        test_hotkey = f"ctrl+shift+{zeichen}"
-        if test_hotkey not in belegte_hotkeys:
-            neuer_hotkey = test_hotkey
-            break
-    if not neuer_hotkey:
-        neuer_hotkey = "ctrl+shift+"
-    titles_list = app_state.data["profiles"][app_state.active_profile].setdefault("titles", [])
-    existing_lower = {t.strip().lower() for t in titles_list}
-    base = "Neuer Eintrag"
-    candidate = base
-    n = 2
-    while candidate.strip().lower() in existing_lower:
-        candidate = f"{base} {n}"
-        n += 1
-    app_state.data["profiles"][app_state.active_profile]["titles"].append(candidate)
-    app_state.data["profiles"][app_state.active_profile]["texts"].append("Neuer Text")
-    app_state.data["profiles"][app_state.active_profile]["hotkeys"].append(neuer_hotkey)
+class EditBatch:
+    """Sammelt strukturelle Änderungen; Abschluss über batch_edit()."""
+    __slots__ = ("save", "changed", "selection", "hotkeys_before", "profiles_before")
+    def __init__(self, save):
+        self.save = save
+        self.changed = False
+        self.selection = None
+        self.hotkeys_before = _hotkey_signature(app_state.data["profiles"].get(app_state.active_profile))
+        self.profiles_before = list(app_state.data["profiles"])
+    def record(self, op):
+        """Änderung ist bereits ausgeführt; hier nur für Rückgängig vormerken."""
+        edit_history.record(op)
+        self.changed = True
+
+@contextlib.contextmanager
+def batch_edit(save=True, label=""):
+    """
+    Eine Transaktion auf app_state.data: beliebig viele Einfüge-/Lösch-/
+    Verschiebeschritte, danach genau ein update_ui, höchstens ein
+    register_hotkeys (nur bei geänderten Hotkeys) und bei save=True genau ein
+    schedule_save. Alle Operationen bilden einen Rückgängig-Schritt.
+    Verschachtelte Aufrufe laufen in der äusseren Transaktion.
+    """
+    outer = app_state.edit_batch
+    if outer is not None:
+        outer.save = outer.save or save
+        yield outer
+        return
+    editor_pool.release()
+    batch = EditBatch(save)
+    app_state.edit_batch = batch
+    edit_history.begin(label, save)
+    try:
+        yield batch
+    finally:
+        edit_history.end(save=batch.save)
+        app_state.edit_batch = None
+        if batch.changed:
+            _finish_batch(batch)
+
+def _finish_batch(batch):
+    profiles = app_state.data["profiles"]
+    if app_state.active_profile not in profiles:
+        app_state.active_profile = next((k for k in profiles if k != "SDE"), next(iter(profiles)))
+        app_state.data["active_profile"] = app_state.active_profile
+    app_state.selected_rows = set(batch.selection or ())
     update_ui()
+    if _hotkey_signature(profiles.get(app_state.active_profile)) != batch.hotkeys_before:
+        register_hotkeys()
+    if batch.save:
+        profiles_to_save = {k: v for k, v in profiles.items() if k != "SDE"}
+        debounced_saver.schedule_save({"profiles": profiles_to_save, "active_profile": app_state.data["active_profile"]})
+        edit_history.mark_saved()
+        reset_unsaved_changes()
+    if batch.save or list(profiles) != batch.profiles_before:
+        refresh_tray()
+
+def editable_profile(name=None):
+    """Profil mit veränderbaren titles/texts/hotkeys-Listen."""
+    profile = app_state.data["profiles"][name or app_state.active_profile]
+    for key in qp_edit.KEYS:
+        items = profile.setdefault(key, [])
+        if isinstance(items, qp_store.PackedStrings):
+            profile[key] = list(items)
+    return profile
+
+def add_new_entry():
+    with batch_edit(save=False, label="Eintrag hinzufügen") as batch:
+        profile = editable_profile()
+        belegte_hotkeys = set(profile["hotkeys"])
+        neuer_hotkey = next((f"ctrl+shift+{z}" for z in HOTKEY_CHARS if f"ctrl+shift+{z}" not in belegte_hotkeys), "ctrl+shift+")
+        existing_lower = {t.strip().lower() for t in profile["titles"]}
+        row = (len(profile["titles"]), qp_edit.unique_title("Neuer Eintrag", existing_lower), "Neuer Text", neuer_hotkey)
+        qp_edit.insert_rows(profile, [row])
+        batch.record(qp_edit.Op("insert", app_state.active_profile, [row]))
 
 def delete_entry(index):
-    if "titles" not in app_state.data["profiles"][app_state.active_profile]:
-        app_state.data["profiles"][app_state.active_profile]["titles"] = []
-    if "texts" not in app_state.data["profiles"][app_state.active_profile]:
-        app_state.data["profiles"][app_state.active_profile]["texts"] = []
-    if "hotkeys" not in app_state.data["profiles"][app_state.active_profile]:
-        app_state.data["profiles"][app_state.active_profile]["hotkeys"] = []
-    if index < 0 or index >= len(app_state.data["profiles"][app_state.active_profile]["titles"]):
-        show_critical_message("Fehler", "Ungültiger Eintrag zum Löschen ausgewählt!")
-        return
-    del app_state.data["profiles"][app_state.active_profile]["titles"][index]
-    del app_state.data["profiles"][app_state.active_profile]["texts"][index]
-    del app_state.data["profiles"][app_state.active_profile]["hotkeys"][index]
-    update_ui() 
-    register_hotkeys() 
+    with batch_edit(save=False, label="Eintrag löschen") as batch:
+        profile = editable_profile()
+        if index < 0 or index >= len(profile["titles"]):
+            show_critical_message("Fehler", "Ungültiger Eintrag zum Löschen ausgewählt!")
+            return
+        batch.record(qp_edit.Op("delete", app_state.active_profile, qp_edit.delete_rows(profile, [index])))
 
 def move_entry_to(old_index, new_index):
     """Vollständige Entry-Verschiebung mit allen drei Arrays"""
-    profile = app_state.data["profiles"][app_state.active_profile]
-    titles = profile.get("titles", [])
-    texts = profile.get("texts", [])
-    hotkeys = profile.get("hotkeys", [])
-    if old_index < 0 or old_index >= len(titles):
+    with batch_edit(save=False, label="Eintrag verschieben") as batch:
+        order = qp_edit.move_row(editable_profile(), old_index, new_index)
+        if order is not None:
+            batch.record(qp_edit.Op("permute", app_state.active_profile, order))
+
+def record_step(op, label, save=False):
+    """Einzelne, bereits ausgeführte Änderung als eigenen Rückgängig-Schritt vormerken."""
+    edit_history.begin(label, save)
+    edit_history.record(op)
+    edit_history.end()
+
+def undo_edit():
+    _replay_history(edit_history.undo, "Rückgängig")
+
+def redo_edit():
+    _replay_history(edit_history.redo, "Wiederholt")
+
+def _replay_history(replay, verb):
+    """Spielt einen Rückgängig-/Wiederholen-Schritt als eine Transaktion ab."""
+    if not app_state.edit_mode:
+        return
+    with batch_edit(save=False) as batch:
+        step = replay(app_state.data["profiles"])
+        if step is None:
+            return
+        batch.changed = True
+        batch.save = step.save
+        touched = next((op.profile for op in reversed(step.ops) if op.profile in app_state.data["profiles"]), None)
+        if touched is not None and touched != "SDE":
+            app_state.active_profile = touched
+            app_state.data["active_profile"] = touched
+    win.statusBar().showMessage(f"{verb}: {step.label or 'Bearbeitung'}", 2000)
+
+def update_history_actions():
+    for button, enabled in ((app_state.undo_button, edit_history.can_undo()), (app_state.redo_button, edit_history.can_redo())):
+        if button is not None and not sip.isdeleted(button):
+            button.setEnabled(enabled)
+
+def selected_indices():
+    count = len(app_state.data["profiles"][app_state.active_profile].get("titles", []))
+    return sorted(i for i in app_state.selected_rows if 0 <= i < count)
+
+def set_row_selected(index, selected):
+    if selected:
+        app_state.selected_rows.add(index)
+    else:
+        app_state.selected_rows.discard(index)
+    update_bulk_actions()
+
+def select_all_rows(selected):
+    count = len(app_state.data["profiles"][app_state.active_profile].get("titles", []))
+    app_state.selected_rows = set(range(count)) if selected else set()
+    for i in range(entries_layout.count()):
+        row = entries_layout.itemAt(i).widget()
+        if isinstance(row, EntryRow):
+            with QtCore.QSignalBlocker(row.select_box):
+                row.select_box.setChecked(selected)
+    update_bulk_actions()
+
+def update_bulk_actions():
+    has_selection = bool(app_state.selected_rows)
+    for button in app_state.bulk_buttons:
+        if not sip.isdeleted(button):
+            button.setEnabled(has_selection)
+
+def bulk_move(offset):
+    with batch_edit(label="Auswahl verschieben") as batch:
+        order, batch.selection = qp_edit.move_rows(editable_profile(), selected_indices(), offset)
+        if order is not None:
+            batch.record(qp_edit.Op("permute", app_state.active_profile, order))
+
+def bulk_delete():
+    indices = selected_indices()
+    if not indices:
         return
-    if new_index < 0 or new_index >= len(titles):
+    resp = show_question_message("Einträge löschen", f"Sollen {len(indices)} ausgewählte Einträge wirklich gelöscht werden?")
+    if resp != QtWidgets.QMessageBox.Yes:
         return
-    if old_index < len(titles):
-        title = titles.pop(old_index)
-        titles.insert(new_index, title)
-    if old_index < len(texts):
-        text = texts.pop(old_index)
-        texts.insert(new_index, text)
-    if old_index < len(hotkeys):
-        hotkey = hotkeys.pop(old_index)
-        hotkeys.insert(new_index, hotkey)
-    max_len = max(len(titles), len(texts), len(hotkeys))
-    while len(titles) < max_len:
-        titles.append(f"Titel {len(titles)+1}")
-    while len(texts) < max_len:
-        texts.append(f"Text {len(texts)+1}")
-    while len(hotkeys) < max_len:
-        hotkeys.append(f"ctrl+shift+{len(hotkeys)+1}")
-    update_ui()
+    with batch_edit(label="Auswahl löschen") as batch:
+        batch.record(qp_edit.Op("delete", app_state.active_profile, qp_edit.delete_rows(editable_profile(), indices)))
+
+def bulk_duplicate():
+    with batch_edit(label="Auswahl duplizieren") as batch:
+        new_rows = qp_edit.duplicate_rows(editable_profile(), selected_indices())
+        batch.selection = [row[0] for row in new_rows]
+        if new_rows:
+            batch.record(qp_edit.Op("insert", app_state.active_profile, new_rows))
+
+def bulk_copy_to_profile(target):
+    indices = selected_indices()
+    if not indices or target == app_state.active_profile or target not in app_state.data["profiles"]:
+        return
+    with batch_edit(label="In Profil kopieren") as batch:
+        new_rows = qp_edit.copy_rows(editable_profile(), editable_profile(target), indices)
+        batch.selection = indices
+        if new_rows:
+            batch.record(qp_edit.Op("insert", target, new_rows))
+    win.statusBar().showMessage(f"{len(new_rows)} Einträge nach '{target}' kopiert", 3000)
+
+def show_copy_to_profile_menu(button):
+    open_profile_switcher(button, bulk_copy_to_profile, skip={"SDE", app_state.active_profile},
+        empty_text="Kein anderes Profil vorhanden")
+
+#endregion
+
+#region import/export
+
+def _new_import_profile(name):
+    return {"titles": [], "texts": qp_store.wrap_texts([], text_codec, text_pool), "hotkeys": []}
+
+def import_snippets(folder=False):
+    """CSV/JSONL-Datei oder HTML-Ordner ins aktive Profil (bzw. die Profile aus der Datei) übernehmen."""
+    if folder:
+        path = QtWidgets.QFileDialog.getExistingDirectory(win, "HTML-Ordner importieren")
+    else:
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            win, "Snippets importieren", "", "Snippet-Bibliothek (*.csv *.jsonl *.ndjson);;Alle Dateien (*)")
+    if not path:
+        return
+    problems = []
+    with batch_edit(label="Import") as batch:
+        editable_profile()
+        importer = qp_transfer.Importer(app_state.data["profiles"], new_profile=_new_import_profile, record=batch.record)
+        try:
+            stats = importer.run(qp_transfer.read_records(path, "html" if folder else None, app_state.active_profile, problems))
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            importer.flush()
+            logging.error(f"Import aus {path} abgebrochen: {e}")
+            show_critical_message("Import fehlgeschlagen", f"{e}\n\nBis dahin gelesene Einträge wurden übernommen.")
+            return
+    problems += importer.problems
+    for problem in problems[:qp_transfer.MAX_REPORTED_PROBLEMS]:
+        logging.warning(f"⚠ Import: {problem}")
+    summary = (f"{stats['added']} Einträge übernommen, {stats['replaced']} ersetzt, {stats['skipped']} übersprungen.\n"
+               f"{stats['renamed']} umbenannt, {stats['hotkeys_cleared']} Hotkeys entfernt, {stats['profiles_created']} Profile angelegt.")
+    if problems:
+        summary += f"\n\n{len(problems)} Hinweise, z.B.:\n" + "\n".join(problems[:5])
+    show_information_message("Import abgeschlossen", summary)
+
+def export_snippets(fmt):
+    """Aktives Profil als CSV, JSON Lines oder HTML-Ordner speichern."""
+    commit_active_editor()
+    name = app_state.active_profile
+    if fmt == "html":
+        parent = QtWidgets.QFileDialog.getExistingDirectory(win, f"Profil '{name}' in Ordner exportieren")
+        if not parent:
+            return
+        # eigener, neuer Unterordner: write_html_folder schreibt nur in leere Ziele
+        used = {entry.lower() for entry in os.listdir(parent)}
+        path = os.path.join(parent, qp_transfer.safe_filename(f"{name} Export", used))
+    else:
+        filters = {"csv": "CSV (*.csv)", "jsonl": "JSON Lines (*.jsonl)"}
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(win, f"Profil '{name}' exportieren", f"{name}.{fmt}", filters[fmt])
+    if not path:
+        return
+    try:
+        count = qp_transfer.write_records(path, qp_transfer.export_records(app_state.data["profiles"], [name]), fmt)
+    except (OSError, ValueError) as e:
+        logging.error(f"Export nach {path} fehlgeschlagen: {e}")
+        show_critical_message("Export fehlgeschlagen", str(e))
+        return
+    win.statusBar().showMessage(f"{count} Einträge nach {path} exportiert", 3000)
+
+def show_transfer_menu(button):
+    menu = QMenu(button)
+    menu.addAction("Importieren: CSV/JSONL…", lambda: import_snippets())
+    menu.addAction("Importieren: HTML-Ordner…", lambda: import_snippets(folder=True))
+    menu.addSeparator()
+    for fmt, label in (("csv", "CSV…"), ("jsonl", "JSON Lines…"), ("html", "HTML-Ordner…")):
+        menu.addAction(f"Profil exportieren: {label}", partial(export_snippets, fmt))
+    menu.exec_(button.mapToGlobal(QtCore.QPoint(0, button.height())))
 
 #endregion
 
@@ -1121,28 +2043,31 @@ def toggle_edit_mode():
             if resp == QtWidgets.QMessageBox.Yes:
                 save_data()
             else:
-                if app_state.last_ui_data is not None:
-                    try:
-                        restored_profiles = copy.deepcopy(app_state.last_ui_data)
-                    except Exception:
-                        restored_profiles = None
-                    if restored_profiles is not None:
-                        app_state.data["profiles"] = restored_profiles
-                        active_profile = app_state.data.get("active_profile")
-                        if active_profile not in restored_profiles:
-                            fallback = None
-                            if app_state.active_profile in restored_profiles:
-                                fallback = app_state.active_profile
-                            if fallback is None:
-                                fallback = next((name for name in restored_profiles.keys() if name != "SDE"), None)
-                            if fallback is None and restored_profiles:
-                                fallback = next(iter(restored_profiles.keys()))
-                            if fallback is not None:
-                                app_state.active_profile = fallback
-                                app_state.data["active_profile"] = fallback
-                        else:
-                            app_state.active_profile = active_profile
-                        restored_from_snapshot = True
+                editor_pool.release(commit=False)
+                restored_profiles = app_state.data["profiles"]
+                if not edit_history.rollback(restored_profiles):
+                    # Verlauf reicht nicht bis zum gespeicherten Stand zurück
+                    sde_profile = restored_profiles.get("SDE")
+                    restored_profiles = snapshot_profiles(app_state.persisted_profiles)
+                    if sde_profile is not None:
+                        restored_profiles["SDE"] = sde_profile
+                    app_state.data["profiles"] = restored_profiles
+                    edit_history.clear()
+                active_profile = app_state.data.get("active_profile")
+                if active_profile not in restored_profiles:
+                    fallback = None
+                    if app_state.active_profile in restored_profiles:
+                        fallback = app_state.active_profile
+                    if fallback is None:
+                        fallback = next((name for name in restored_profiles.keys() if name != "SDE"), None)
+                    if fallback is None and restored_profiles:
+                        fallback = next(iter(restored_profiles.keys()))
+                    if fallback is not None:
+                        app_state.active_profile = fallback
+                        app_state.data["active_profile"] = fallback
+                else:
+                    app_state.active_profile = active_profile
+                restored_from_snapshot = True
                 reset_unsaved_changes()
         else:
             reset_unsaved_changes()
@@ -1151,17 +2076,16 @@ def toggle_edit_mode():
         if restored_from_snapshot:
             register_hotkeys()
             refresh_tray()
-        app_state.last_ui_data = None
+        apply_pending_config_reload()
         return
     is_sde_only = len(app_state.data["profiles"]) == 1 and "SDE" in app_state.data["profiles"]
     if app_state.active_profile == "SDE" and not is_sde_only:
         show_information_message("Nicht editierbar", "Das SDE-Profil kann nicht bearbeitet werden.")
         return
-    try:
-        app_state.last_ui_data = copy.deepcopy(app_state.data.get("profiles", {}))
-    except Exception as e:
-        logging.warning(f"Failed to create UI snapshot: {e}")
-        app_state.last_ui_data = None
+    active = app_state.data["profiles"].get(app_state.active_profile, {})
+    for key in ("titles", "texts", "hotkeys"):
+        if isinstance(active.get(key), qp_store.PackedStrings):
+            active[key] = list(active[key])
     app_state.unsaved_changes = False
     app_state.edit_mode = True
     update_ui()
@@ -1177,8 +2101,10 @@ def save_data(stay_in_edit_mode=False):
             if rename_result is None:
                 return
             app_state.data["active_profile"] = app_state.active_profile
+        commit_active_editor()
         if app_state.active_profile != "SDE":
-            titles_new = [(e.text() or "").strip() for e in app_state.title_entries]
+            profile = app_state.data["profiles"][app_state.active_profile]
+            titles_new = [(t or "").strip() for t in profile["titles"]]
             if any(not t for t in titles_new):
                 show_critical_message("Fehler", "Es gibt leere Titel. Bitte fülle alle Titel aus.")
                 return
@@ -1186,18 +2112,17 @@ def save_data(stay_in_edit_mode=False):
             if len(low) != len(set(low)):
                 show_critical_message("Fehler", "Es gibt doppelte Titel im Profil. Bitte eindeutige Titel vergeben.")
                 return
-            texts_new = [e.toHtml() if hasattr(e, 'toHtml') else e.text() for e in app_state.text_entries]
-            hotkeys_new = [e.text() for e in app_state.hotkey_entries]
-            app_state.data["profiles"][app_state.active_profile]["titles"]  = titles_new
-            app_state.data["profiles"][app_state.active_profile]["texts"]   = texts_new
-            app_state.data["profiles"][app_state.active_profile]["hotkeys"] = hotkeys_new
+            profile["titles"] = titles_new
+            profile["texts"] = qp_store.wrap_texts(profile["texts"], text_codec, text_pool)
+            profile["hotkeys"] = list(profile["hotkeys"])
+            prune_text_pool()
         profiles_to_save = {k: v for k, v in app_state.data["profiles"].items() if k != "SDE"}
         debounced_saver.schedule_save({"profiles": profiles_to_save, "active_profile": app_state.data["active_profile"]})
+        if app_state.pending_config_reload is not None:
+            logging.info("Externe config.json-Änderung durch lokales Speichern überschrieben")
+            app_state.pending_config_reload = None
         fehlerhafte_hotkeys = register_hotkeys()
-        try:
-            app_state.last_ui_data = copy.deepcopy(app_state.data.get("profiles", {}))
-        except Exception:
-            app_state.last_ui_data = None
+        edit_history.mark_saved()
         reset_unsaved_changes()
         update_ui()
         if not fehlerhafte_hotkeys and not stay_in_edit_mode:
@@ -1250,11 +2175,9 @@ def apply_auto_dpi_scaling():
 
 def calculate_button_text(html_text, button_width):
     """Berechnet dynamisch den Text für Button-Breite"""
-    doc = QtGui.QTextDocument()
     plain_text = ""
     try:
-        doc.setHtml(html_text)
-        plain_text = doc.toPlainText().replace('\n', ' ').strip()
+        plain_text = plain_text_of(html_text).replace('\n', ' ').strip()
         if not plain_text:
             return "(Leer)"
         font = QFont()
@@ -1306,15 +2229,20 @@ def create_text_button(i, texts, hks, ebg, fg):
                 display_text = calculate_button_text(text_html, width)
                 if text_btn.text() != display_text:
                     text_btn.setText(display_text)
+    # je ein Timer pro Button, bei jedem Resize neu gestartet (nicht pro Event ein neuer)
+    text_timers = []
+    for ms in (0, 100):
+        t = QtCore.QTimer(text_btn)
+        t.setSingleShot(True)
+        t.setInterval(ms)
+        t.timeout.connect(update_button_text)
+        text_timers.append(t)
     original_resize = text_btn.resizeEvent
     def on_resize(event):
         if original_resize:
             original_resize(event)
-        for ms in (0, 100): 
-            t = QtCore.QTimer(text_btn)
-            t.setSingleShot(True)
-            t.timeout.connect(update_button_text)
-            t.start(ms)
+        for t in text_timers:
+            t.start()
     text_btn.resizeEvent = on_resize
     text_btn.clicked.connect(partial(copy_text_to_clipboard, i))
     text_btn._update_text = update_button_text
@@ -1369,13 +2297,20 @@ entries_layout = QtWidgets.QVBoxLayout(container)
 entries_layout.setAlignment(QtCore.Qt.AlignTop)
 entries_layout.setSpacing(6)
 entries_layout.setContentsMargins(8, 8, 8, 8)
-scroll_area.setWidget(container)
+# Seite 0: Bearbeitungsmodus; weitere Seiten: fertige Profilansichten (ProfileViewCache)
+entry_stack = QtWidgets.QStackedWidget()
+entry_stack.addWidget(container)
+scroll_area.setWidget(entry_stack)
 bottom_bar_container = QtWidgets.QWidget()
 bottom_bar_layout = QtWidgets.QHBoxLayout(bottom_bar_container)
 bottom_bar_layout.setContentsMargins(8, 8, 8, 8)
 bottom_bar_layout.setSpacing(8)
 bottom_bar_container.setVisible(False)
 main_layout.addWidget(bottom_bar_container)
+for sequence, action in ((QtGui.QKeySequence.Undo, undo_edit), (QtGui.QKeySequence.Redo, redo_edit)):
+    # Eingabefelder behalten ihr eigenes Strg+Z, solange sie den Fokus haben
+    QtWidgets.QShortcut(QtGui.QKeySequence(sequence), win, activated=action)
+QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+P"), win, activated=lambda: open_profile_switcher())
 
 #endregion
 
@@ -1485,16 +2420,477 @@ def insert_hyperlink_at_cursor(text_widget):
             cursor.setCharFormat(normal_format)
             text_widget.setTextCursor(cursor)
 
+HOTKEY_CHARS = qp_edit.HOTKEY_CHARS
+
+def edit_rows_stylesheet(bg, fg, ebg, bbg):
+    """Ein Stylesheet für alle Zeilen im Bearbeitungsmodus statt eines pro Widget."""
+    border = '#555' if app_state.dark_mode else '#ccc'
+    return f"""
+        QWidget {{background:{bg};}}
+        QLabel#qpDragHandle {{color: {fg}; background: {bbg}; padding: 2px 4px;border: 1px solid {border};border-radius: 4px;}}
+        QLabel#qpTitlePreview, QLineEdit#qpTitleEdit, QLabel#qpHotkeyPreview, QLineEdit#qpHotkeyEdit {{background:{ebg}; color:{fg}; border: 1px solid {border}; border-radius: 6px; padding: 8px;}}
+        QLabel#qpTextPreview {{background:{ebg}; color:{fg}; border: 1px solid {border}; padding: 4px;}}
+        QTextEdit#qpTextEdit {{background:{ebg}; color:{fg};}}
+        QPushButton#qpDeleteEntry {{background: {ebg};color: {fg};border: 1px solid {border};border-radius: 6px;padding: 8px;}}
+        QPushButton#qpDeleteEntry:hover {{background: {'#4a4a4a' if app_state.dark_mode else '#f0f0f0'};}}
+        QPushButton#qpDeleteEntry:pressed {{background: {'#3a3a3a' if app_state.dark_mode else '#e0e0e0'};}}
+        QCheckBox#qpSelectEntry {{color:{fg};}}"""
+
+def _preview_text(html_text):
+    plain = plain_text_of(html_text)
+    return " ".join(plain[:300].split())
+
+class EntryRow(DragDropWidget):
+    """
+    Zeile im Bearbeitungsmodus. Zeigt nur leichte Vorschau-Labels; die echten
+    Editoren kommen aus dem editor_pool, solange die Zeile den Fokus hat.
+    """
+    def __init__(self, index):
+        super().__init__(index)
+        self.setFocusPolicy(QtCore.Qt.TabFocus)
+        self.setAcceptDrops(True)
+        self.editors = None
+        self.layout_ = QtWidgets.QHBoxLayout(self)
+        self.layout_.setContentsMargins(8, 4, 8, 4)
+        self.layout_.setSpacing(12)
+        self.select_box = QtWidgets.QCheckBox()
+        self.select_box.setObjectName("qpSelectEntry")
+        self.select_box.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.select_box.setToolTip("Für Mehrfachbearbeitung auswählen")
+        self.select_box.setChecked(index in app_state.selected_rows)
+        self.select_box.toggled.connect(lambda checked: set_row_selected(self.drag_index, checked))
+        self.layout_.addWidget(self.select_box)
+        drag_handle = QtWidgets.QLabel("☰")
+        drag_handle.setObjectName("qpDragHandle")
+        drag_handle.setFixedSize(20, 28)
+        drag_handle.setAlignment(QtCore.Qt.AlignCenter)
+        drag_handle.setToolTip("Ziehen zum Verschieben")
+        drag_handle.mousePressEvent = lambda event: start_drag(event, self.drag_index, drag_handle)
+        self.layout_.addWidget(drag_handle)
+        self.title_preview = QtWidgets.QLabel()
+        self.title_preview.setObjectName("qpTitlePreview")
+        self.title_preview.setFixedWidth(120)
+        self.text_preview = QtWidgets.QLabel()
+        self.text_preview.setObjectName("qpTextPreview")
+        self.text_preview.setTextFormat(QtCore.Qt.PlainText)
+        self.text_preview.setMinimumHeight(60)
+        self.text_preview.setMaximumHeight(80)
+        self.text_preview.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop)
+        self.text_preview.setWordWrap(True)
+        self.text_preview.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Preferred)
+        self.hotkey_preview = QtWidgets.QLabel()
+        self.hotkey_preview.setObjectName("qpHotkeyPreview")
+        self.hotkey_preview.setMinimumWidth(120)
+        self.layout_.addWidget(self.title_preview)
+        self.layout_.addWidget(self.text_preview, 1)
+        self.layout_.addWidget(self.hotkey_preview)
+        delete_btn = QtWidgets.QPushButton("❌")
+        delete_btn.setObjectName("qpDeleteEntry")
+        delete_size = int(38 * app_state.zoom_level)
+        delete_btn.setFixedSize(delete_size, delete_size)
+        delete_btn.setToolTip("Eintrag löschen")
+        delete_btn.clicked.connect(lambda _: delete_entry(self.drag_index))
+        self.layout_.addWidget(delete_btn)
+        self.refresh_preview()
+    def values(self):
+        profile = app_state.data["profiles"][app_state.active_profile]
+        i = self.drag_index
+        return profile["titles"][i], profile["texts"][i], profile["hotkeys"][i]
+    def refresh_preview(self):
+        try:
+            title, text, hotkey = self.values()
+        except (IndexError, KeyError):
+            return
+        self.title_preview.setText(title)
+        self.text_preview.setText(_preview_text(text))
+        self.hotkey_preview.setText(hotkey)
+    def previews(self):
+        return (self.title_preview, self.text_preview, self.hotkey_preview)
+    def mousePressEvent(self, event):
+        target = self.childAt(event.pos())
+        editor_pool.attach(self, focus=target)
+        super().mousePressEvent(event)
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        if self.editors is None:
+            editor_pool.attach(self)
+
+class _EditorSet:
+    __slots__ = ("title", "text", "hotkey")
+    def __init__(self, parent):
+        self.title = QtWidgets.QLineEdit(parent)
+        self.title.setObjectName("qpTitleEdit")
+        self.title.setFixedWidth(120)
+        self.text = QtWidgets.QTextEdit(parent)
+        self.text.setObjectName("qpTextEdit")
+        self.text.setMaximumHeight(80)
+        self.text.setMinimumHeight(60)
+        self.text.setAcceptRichText(True)
+        self.text.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.text.customContextMenuRequested.connect(lambda pos: show_text_context_menu(pos, self.text))
+        self.hotkey = QtWidgets.QLineEdit(parent)
+        self.hotkey.setObjectName("qpHotkeyEdit")
+        self.hotkey.setMinimumWidth(120)
+        self.title.editingFinished.connect(commit_active_editor)
+        self.hotkey.editingFinished.connect(commit_active_editor)
+    def widgets(self):
+        return (self.title, self.text, self.hotkey)
+
+class EditorPool:
+    """
+    Hält wenige echte Editor-Sätze (QLineEdit/QTextEdit/QLineEdit) und hängt
+    jeweils einen an die fokussierte Zeile. Beim Verlassen der Zeile werden die
+    Werte in app_state.data übernommen und die Editoren zurückgegeben.
+    """
+    def __init__(self, limit=2):
+        self.limit = limit
+        self.free = []
+        self.active = None
+        self.parking = None
+        self.committing = False
+        app.focusChanged.connect(self._on_focus_changed)
+    def _park(self, editors):
+        if self.parking is None or sip.isdeleted(self.parking):
+            self.parking = QtWidgets.QWidget(container)
+            self.parking.hide()
+        for w in editors.widgets():
+            w.setParent(self.parking)
+    def _take(self):
+        if self.free:
+            return self.free.pop()
+        editors = _EditorSet(None)
+        self._park(editors)
+        return editors
+    def attach(self, row, focus=None):
+        if self.active is row:
+            return
+        self.release()
+        if sip.isdeleted(row):
+            return
+        editors = self._take()
+        title, text, hotkey = row.values()
+        editors.title.setText(title)
+        editors.hotkey.setText(hotkey)
+        with QtCore.QSignalBlocker(editors.text):
+            editors.text.setHtml(text)
+        editors.text.document().setModified(False)
+        for preview, editor in zip(row.previews(), editors.widgets()):
+            pos = row.layout_.indexOf(preview)
+            preview.hide()
+            row.layout_.insertWidget(pos, editor, 1 if editor is editors.text else 0)
+            editor.show()
+        QtWidgets.QWidget.setTabOrder(editors.title, editors.text)
+        QtWidgets.QWidget.setTabOrder(editors.text, editors.hotkey)
+        row.editors = editors
+        self.active = row
+        target = {row.text_preview: editors.text, row.hotkey_preview: editors.hotkey}.get(focus, editors.title)
+        target.setFocus(QtCore.Qt.OtherFocusReason)
+    def commit(self):
+        """Übernimmt die Editorwerte der aktiven Zeile in app_state.data (mit Prüfung)."""
+        row = self.active
+        if row is None or self.committing or sip.isdeleted(row):
+            return
+        self.committing = True
+        try:
+            editors = row.editors
+            idx = row.drag_index
+            profile = app_state.data["profiles"].get(app_state.active_profile)
+            if profile is None or idx >= len(profile.get("titles", [])):
+                return
+            old_title, _, old_hotkey = row.values()
+            new_title = (editors.title.text() or "").strip()
+            if new_title != old_title:
+                others = [t.strip().lower() for j, t in enumerate(profile["titles"]) if j != idx]
+                if not new_title:
+                    show_critical_message("Fehler", "Titel darf nicht leer sein!")
+                    editors.title.setText(old_title)
+                elif new_title.lower() in others:
+                    show_critical_message("Fehler", f"Titel '{new_title}' wird bereits verwendet!")
+                    editors.title.setText(old_title)
+                else:
+                    profile["titles"][idx] = new_title
+                    edit_history.record(qp_edit.Op("set", app_state.active_profile, (idx, "titles", old_title, new_title)))
+                    app_state.unsaved_changes = True
+            new_hotkey = editors.hotkey.text()
+            if new_hotkey != old_hotkey:
+                error = validate_hotkey(new_hotkey, idx, profile["hotkeys"])
+                if error:
+                    show_critical_message("Fehler", error)
+                    editors.hotkey.setText(old_hotkey)
+                else:
+                    profile["hotkeys"][idx] = new_hotkey
+                    edit_history.record(qp_edit.Op("set", app_state.active_profile, (idx, "hotkeys", old_hotkey, new_hotkey)))
+                    app_state.unsaved_changes = True
+            if editors.text.document().isModified():
+                old_text = profile["texts"][idx]
+                new_text = minify_html(editors.text.toHtml())
+                if new_text != old_text:
+                    profile["texts"][idx] = new_text
+                    template_of(new_text)
+                    edit_history.record(qp_edit.Op("set", app_state.active_profile, (idx, "texts", old_text, new_text)))
+                    app_state.unsaved_changes = True
+                editors.text.document().setModified(False)
+            update_history_actions()
+        finally:
+            self.committing = False
+    def release(self, commit=True):
+        row = self.active
+        if row is None:
+            return
+        if commit:
+            self.commit()
+        self.active = None
+        editors = row.editors
+        row.editors = None
+        if not sip.isdeleted(row):
+            for preview, editor in zip(row.previews(), editors.widgets()):
+                row.layout_.removeWidget(editor)
+                preview.show()
+            row.refresh_preview()
+        self._park(editors)
+        if len(self.free) < self.limit:
+            self.free.append(editors)
+        else:
+            for w in editors.widgets():
+                w.deleteLater()
+    def clear(self):
+        self.release()
+        for editors in self.free:
+            for w in editors.widgets():
+                w.deleteLater()
+        self.free.clear()
+    def _on_focus_changed(self, old, new):
+        row = self.active
+        if row is None or new is None or self.committing:
+            return
+        if sip.isdeleted(row):
+            self.active = None
+            return
+        if new.window() is not win or new is row or row.isAncestorOf(new):
+            return
+        self.release()
+
+def validate_hotkey(value, index, hotkeys):
+    """Fehlermeldung für einen ungültigen/doppelten Hotkey oder None."""
+    hotkey = (value or "").strip().lower()
+    if not hotkey:
+        return None
+    if qp_edit.normalize_hotkey(hotkey) is None:
+        return (f"Ungültiger Hotkey \"{value}\" für Eintrag {index+1}.\n"
+                f"Erlaubte Zeichen: {HOTKEY_CHARS}\n"
+                f"Format: ctrl+shift+[zeichen]")
+    if hotkey in [(h or "").strip().lower() for j, h in enumerate(hotkeys) if j != index]:
+        return f"Hotkey \"{value}\" wird bereits in diesem Profil verwendet!"
+    return None
+
+def commit_active_editor():
+    editor_pool.commit()
+
+editor_pool = EditorPool()
+
+def theme_colors():
+    """(bg, fg, ebg, bbg) für den aktuellen Modus."""
+    if app_state.dark_mode:
+        return "#2e2e2e", "white", "#3c3c3c", "#444"
+    return "#eeeeee", "black", "white", "#cccccc"
+
+class ProfileViewCache:
+    """
+    Fertig aufgebaute Eintragsansichten (ausserhalb des Bearbeitungsmodus) der
+    zuletzt gezeigten Profile als Seiten von entry_stack; der Wechsel auf ein
+    Profil im Cache blendet nur die Seite um. Eine Seite gilt, solange
+    Darstellung (Dunkel/Mini/Zoom) und Titel, Texte und Hotkeys des Profils
+    unverändert sind. Verdrängt wird LRU nach Anzahl und geschätztem Speicher.
+    """
+    ROW_BYTES = 48 * 1024   # gemessen (offscreen) ~50 KiB RSS je Zeile mit Labels, Button, Timern, Stylesheets
+    def __init__(self, stack, max_views=4, max_bytes=48 << 20):
+        self.stack = stack
+        self.max_views = max(1, max_views)
+        self.max_bytes = max(0, max_bytes)
+        self.views = OrderedDict()   # name -> (key, page, bytes)
+        self.stats = {"view_hits": 0, "view_misses": 0, "view_evictions": 0, "view_prebuilt": 0}
+    @staticmethod
+    def style_key():
+        return (app_state.dark_mode, app_state.mini_mode, app_state.zoom_level, app_state.base_font_size)
+    @classmethod
+    def key_for(cls, profile):
+        return (cls.style_key(),
+                qp_store.content_refs(profile["titles"]),
+                qp_store.content_refs(profile["texts"]),
+                qp_store.content_refs(profile["hotkeys"]))
+    def get(self, name, profile, touch=True):
+        entry = self.views.get(name)
+        if entry is not None and entry[0] != self.key_for(profile):
+            self.discard(name)
+            entry = None
+        if touch:
+            self.stats["view_hits" if entry is not None else "view_misses"] += 1
+            if entry is not None:
+                self.views.move_to_end(name)
+        return entry[1] if entry is not None else None
+    def put(self, name, profile, page, rows, prebuilt=False):
+        self.discard(name)
+        page.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Ignored)
+        self.stack.addWidget(page)
+        self.views[name] = (self.key_for(profile), page, rows * self.ROW_BYTES)
+        if prebuilt:
+            self.stats["view_prebuilt"] += 1
+            self._evict()
+    def discard(self, name):
+        entry = self.views.pop(name, None)
+        if entry is not None:
+            self.stack.removeWidget(entry[1])
+            entry[1].deleteLater()
+    def prune(self, profiles):
+        """Seiten gelöschter/umbenannter Profile und mit alter Darstellung verwerfen."""
+        style = self.style_key()
+        for name in [n for n, entry in self.views.items() if n not in profiles or entry[0][0] != style]:
+            self.discard(name)
+    def clear(self, keep_current=False):
+        current = self.stack.currentWidget() if keep_current else None
+        for name in [n for n, entry in self.views.items() if entry[1] is not current]:
+            self.discard(name)
+    def total_bytes(self):
+        return sum(entry[2] for entry in self.views.values())
+    def _evict(self):
+        current = self.stack.currentWidget()
+        while len(self.views) > self.max_views or (len(self.views) > 1 and self.total_bytes() > self.max_bytes):
+            victim = next((n for n, entry in self.views.items() if entry[1] is not current), None)
+            if victim is None:
+                break
+            self.discard(victim)
+            self.stats["view_evictions"] += 1
+    def show(self, page):
+        """page sichtbar machen; nur sie zählt für die Grösse des Stacks (versteckte Seiten: Ignored)."""
+        for i in range(self.stack.count()):
+            widget = self.stack.widget(i)
+            if widget is not page:
+                widget.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Ignored)
+        page.setSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred)
+        self.stack.setCurrentWidget(page)
+        self._evict()
+    def snapshot(self):
+        return {**self.stats, "views": len(self.views), "view_kb": self.total_bytes() // 1024}
+
+profile_views = ProfileViewCache(
+    entry_stack,
+    max_views=app_state.settings["view_cache_profiles"],
+    max_bytes=app_state.settings["view_cache_mb"] << 20)
+view_prebuild_timer = QtCore.QTimer(win)
+view_prebuild_timer.setSingleShot(True)
+view_prebuild_timer.setInterval(400)
+
+def build_profile_view(profile):
+    """Neue Seite mit den Einträgen von profile (ohne Bearbeitungsmodus) -> (seite, zeilen)."""
+    bg, fg, ebg, bbg = theme_colors()
+    page = QtWidgets.QWidget()
+    page.setStyleSheet(f"background:{bg};")
+    layout = QtWidgets.QVBoxLayout(page)
+    layout.setAlignment(QtCore.Qt.AlignTop)
+    margin = 4 if app_state.mini_mode else 8
+    layout.setContentsMargins(margin, margin, margin, margin)
+    layout.setSpacing(4 if app_state.mini_mode else 6)
+    titles, texts, hks = profile["titles"], profile["texts"], profile["hotkeys"]
+    max_t = 120
+    for i, title in enumerate(titles):
+        if app_state.mini_mode:
+            hotkey = hks[i] if i < len(hks) else ""
+            title_text = title or ""
+            mini_button = QtWidgets.QPushButton()
+            mini_hotkey_color = '#d0d0d0' if app_state.dark_mode else '#333333'
+            mini_button.setStyleSheet(f"""
+                QPushButton {{background: {ebg};border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;padding: 1px 4px;}}
+                QPushButton:hover {{background: {'#4a4a4a' if app_state.dark_mode else '#f0f0f0'};}}
+                QPushButton QLabel {{color: {fg};font-weight: bold;background: transparent;padding: 0;}}
+                QPushButton QLabel#miniHotkeyLabel {{font-weight: normal;padding-left: 4px;padding-right: 2px;font-size: 12px;color: {mini_hotkey_color};}}""")
+            mini_button.setFixedHeight(int(30 * app_state.zoom_level))
+            mini_button.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+            mini_layout = QtWidgets.QHBoxLayout()
+            mini_layout.setContentsMargins(2, 1, 2, 1)
+            mini_layout.setSpacing(2)
+            mini_button.setLayout(mini_layout)
+            title_label = QtWidgets.QLabel(title_text)
+            title_label.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
+            title_label.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
+            mini_layout.addWidget(title_label, 1)
+            if hotkey:
+                hotkey_label = QtWidgets.QLabel(hotkey)
+                hotkey_label.setObjectName("miniHotkeyLabel")
+                hotkey_label.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                hotkey_label.setSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+                hotkey_label.setMinimumWidth(0)
+                mini_layout.addWidget(hotkey_label)
+            tooltip_hotkey = hotkey or ""
+            if tooltip_hotkey:
+                mini_button.setToolTip(f"Klicken zum Kopieren ➡️ Hotkey: {tooltip_hotkey}")
+            else:
+                mini_button.setToolTip("Klicken zum Kopieren")
+            mini_button.clicked.connect(partial(copy_text_to_clipboard, i))
+            layout.addWidget(mini_button)
+            continue
+        row = QtWidgets.QWidget()
+        hl  = QtWidgets.QHBoxLayout(row)
+        hl.setContentsMargins(8, 4, 8, 4)
+        hl.setSpacing(12)
+        hl.setStretch(0, 0)
+        hl.setStretch(1, 1) 
+        hl.setStretch(2, 0) 
+        lt = QtWidgets.QLabel(title)
+        lt.setFixedWidth(max_t)
+        lt.setFixedHeight(40)
+        lt.setStyleSheet(f"""color: {fg}; background: {ebg}; font-weight: bold; padding: 10px 12px;border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;""")
+        lt.setAlignment(QtCore.Qt.AlignVCenter)
+        hl.addWidget(lt)
+        text_btn = create_text_button(i, texts, hks, ebg, fg)
+        hl.addWidget(text_btn, 1)
+        lh = QtWidgets.QLabel(hks[i])
+        lh.setFixedHeight(40)
+        lh.setStyleSheet(f"""color: {fg}; background: {ebg}; padding: 8px 16px;  min-width: 80px;  border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;font-family: 'Consolas', 'Monaco', monospace;""")
+        lh.setAlignment(QtCore.Qt.AlignCenter)
+        hl.addWidget(lh)
+        layout.addWidget(row)
+    return page, len(titles)
+
+def show_profile_view():
+    """Einträge des aktiven Profils zeigen: Seite aus dem Cache oder neu aufgebaut."""
+    name = app_state.active_profile
+    profile = app_state.data["profiles"][name]
+    profile_views.prune(app_state.data["profiles"])
+    page = profile_views.get(name, profile)
+    if page is None:
+        page, rows = build_profile_view(profile)
+        profile_views.put(name, profile, page, rows)
+    profile_views.show(page)
+    if app_state.settings["view_prebuild"] and profile_views.max_views > 1:
+        view_prebuild_timer.start()
+
+def prebuild_next_view():
+    """
+    Im Leerlauf eine Ansicht vorbauen: das zuletzt benutzte Profil, das noch
+    nicht im Cache liegt (nur so viele, wie neben dem aktiven Platz haben).
+    Pro Timer-Lauf eine Seite, damit die Oberfläche bedienbar bleibt.
+    """
+    if app_state.edit_mode or not win.isVisible():
+        return
+    profiles = app_state.data["profiles"]
+    candidates = profile_index.recent_names(profiles, profile_views.max_views - 1, skip={app_state.active_profile})
+    name = next((n for n in candidates if profile_views.get(n, profiles[n], touch=False) is None), None)
+    if name is None:
+        return
+    page, rows = build_profile_view(profiles[name])
+    profile_views.put(name, profiles[name], page, rows, prebuilt=True)
+    view_prebuild_timer.start()
+view_prebuild_timer.timeout.connect(prebuild_next_view)
+
 def update_ui():
-    app_state.title_entries = []
-    app_state.text_entries = []
-    app_state.hotkey_entries = []
     app_state.profile_entries = {}
-    bg    = "#2e2e2e" if app_state.dark_mode else "#eeeeee"
-    fg    = "white"   if app_state.dark_mode else "black"
-    ebg   = "#3c3c3c" if app_state.dark_mode else "white"
-    bbg   = "#444"    if app_state.dark_mode else "#cccccc"
-    win.setStyleSheet(f"background:{bg};")
+    bg, fg, ebg, bbg = theme_colors()
+    # veraltete Seiten vor den Stylesheets verwerfen, die sie sonst noch einmal durchlaufen
+    profile_views.prune(app_state.data["profiles"])
+    for widget in (win, entry_stack):
+        # setStyleSheet poliert alle Kinder neu, auch die versteckten Seiten im Cache
+        if widget.styleSheet() != f"background:{bg};":
+            widget.setStyleSheet(f"background:{bg};")
     toolbar.setStyleSheet(f"background:{bg}; border: none;")
     container.setStyleSheet(f"background:{bg};")
     win.statusBar().setStyleSheet(f"""
@@ -1529,20 +2925,71 @@ def update_ui():
             QPushButton:hover {{background: {button_hover_bg};}}""")
         add_button.clicked.connect(add_new_entry)
         bottom_bar_layout.addWidget(add_button)
+        bottom_bar_layout.addStretch(1)
+        tool_style = f"""
+            QPushButton {{background: {bbg};color: {fg};border: 1px solid {button_border_color};border-radius: 6px;padding: 8px 10px;min-height: 10px;}}
+            QPushButton:hover {{background: {button_hover_bg};}}
+            QPushButton:disabled {{color: {'#777' if app_state.dark_mode else '#999'};}}"""
+        app_state.undo_button = QtWidgets.QPushButton("↶")
+        app_state.undo_button.setToolTip("Rückgängig (Strg+Z)")
+        app_state.undo_button.clicked.connect(lambda _: undo_edit())
+        app_state.redo_button = QtWidgets.QPushButton("↷")
+        app_state.redo_button.setToolTip("Wiederholen (Strg+Y)")
+        app_state.redo_button.clicked.connect(lambda _: redo_edit())
+        for button in (app_state.undo_button, app_state.redo_button):
+            button.setMinimumHeight(button_min_height)
+            button.setStyleSheet(tool_style)
+            bottom_bar_layout.addWidget(button)
+        update_history_actions()
+        select_all = QtWidgets.QCheckBox("Alle")
+        select_all.setStyleSheet(f"color:{fg};")
+        select_all.setToolTip("Alle Einträge auswählen")
+        select_all.toggled.connect(select_all_rows)
+        bottom_bar_layout.addWidget(select_all)
+        app_state.bulk_buttons = []
+        for label, tooltip, action in (
+                ("⬆", "Auswahl nach oben", lambda: bulk_move(-1)),
+                ("⬇", "Auswahl nach unten", lambda: bulk_move(1)),
+                ("⧉", "Auswahl duplizieren", bulk_duplicate),
+                ("📋", "Auswahl in anderes Profil kopieren", None),
+                ("🗑", "Auswahl löschen", bulk_delete)):
+            button = QtWidgets.QPushButton(label)
+            button.setToolTip(tooltip)
+            button.setMinimumHeight(button_min_height)
+            button.setStyleSheet(tool_style)
+            if action is None:
+                button.clicked.connect(lambda _, b=button: show_copy_to_profile_menu(b))
+            else:
+                button.clicked.connect(lambda _, a=action: a())
+            bottom_bar_layout.addWidget(button)
+            app_state.bulk_buttons.append(button)
+        update_bulk_actions()
+        transfer_button = QtWidgets.QPushButton("⇅")
+        transfer_button.setToolTip("Importieren/Exportieren")
+        transfer_button.setMinimumHeight(button_min_height)
+        transfer_button.setStyleSheet(tool_style)
+        transfer_button.clicked.connect(lambda _, b=transfer_button: show_transfer_menu(b))
+        bottom_bar_layout.addWidget(transfer_button)
     else:
         bottom_bar_container.setVisible(False)
         bottom_bar_container.setEnabled(False)
+        app_state.bulk_buttons = []
+        app_state.undo_button = app_state.redo_button = None
+        app_state.selected_rows.clear()
+    # clear() nimmt die Aktionen nur heraus; die QWidgetActions von addWidget samt Widgets blieben Kinder der Toolbar
+    old_toolbar_actions = toolbar.actions()
     toolbar.clear()
+    for action in old_toolbar_actions:
+        action.deleteLater()
     app_state.profile_buttons = {}
     app_state.profile_selector = None
     app_state.profile_delete_button = None
-    profile_names = []
-    for profile_name in app_state.data["profiles"].keys():
-        if profile_name == "SDE":
-            continue
-        profile_names.append(profile_name)
-    if not app_state.edit_mode and "SDE" in app_state.data["profiles"]:
-        profile_names.append("SDE")
+    if app_state.edit_mode:
+        # Umbenennen braucht einen Eintrag je Profil
+        profile_names = [name for name in app_state.data["profiles"] if name != "SDE"]
+    else:
+        # sonst nur das aktive Profil; gewechselt wird über den Profilwechsler
+        profile_names = [app_state.active_profile]
     def scaled(value):
         return max(1, int(value * app_state.zoom_level))
     selector_spacing = scaled(1 if app_state.mini_mode else 3)
@@ -1591,6 +3038,9 @@ def update_ui():
         toolbar.addWidget(selector_container)
         for name in profile_names:
             combo.addItem(name, name)
+        if not app_state.edit_mode:
+            combo.popup_handler = open_profile_switcher
+            combo.setToolTip("Profil wechseln (Strg+P)")
         if app_state.edit_mode:
             line_edit = combo.lineEdit()
             if line_edit is not None:
@@ -1684,177 +3134,19 @@ def update_ui():
         QPushButton:hover {{background:#888;}}""")
     help_btn.clicked.connect(show_help_dialog)
     toolbar.addWidget(help_btn)
+    editor_pool.release()
     while entries_layout.count():
         w = entries_layout.takeAt(0).widget()
         if w: w.deleteLater()
-    prof_data = app_state.data["profiles"][app_state.active_profile]
-    titles, texts, hks = prof_data["titles"], prof_data["texts"], prof_data["hotkeys"]
-    max_t = 120
-    max_h = 120
-    for i, title in enumerate(titles):
-        if not app_state.edit_mode and app_state.mini_mode:
-            hotkey = hks[i] if i < len(hks) else ""
-            title_text = title or ""
-            mini_button = QtWidgets.QPushButton()
-            mini_hotkey_color = '#d0d0d0' if app_state.dark_mode else '#333333'
-            mini_button.setStyleSheet(f"""
-                QPushButton {{background: {ebg};border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;padding: 1px 4px;}}
-                QPushButton:hover {{background: {'#4a4a4a' if app_state.dark_mode else '#f0f0f0'};}}
-                QPushButton QLabel {{color: {fg};font-weight: bold;background: transparent;padding: 0;}}
-                QPushButton QLabel#miniHotkeyLabel {{font-weight: normal;padding-left: 4px;padding-right: 2px;font-size: 12px;color: {mini_hotkey_color};}}""")
-            mini_button.setFixedHeight(int(30 * app_state.zoom_level))
-            mini_button.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
-            mini_layout = QtWidgets.QHBoxLayout()
-            mini_layout.setContentsMargins(2, 1, 2, 1)
-            mini_layout.setSpacing(2)
-            mini_button.setLayout(mini_layout)
-            title_label = QtWidgets.QLabel(title_text)
-            title_label.setAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
-            title_label.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
-            mini_layout.addWidget(title_label, 1)
-            if hotkey:
-                hotkey_label = QtWidgets.QLabel(hotkey)
-                hotkey_label.setObjectName("miniHotkeyLabel")
-                hotkey_label.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
-                hotkey_label.setSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
-                hotkey_label.setMinimumWidth(0)
-                mini_layout.addWidget(hotkey_label)
-            tooltip_hotkey = hotkey or ""
-            if tooltip_hotkey:
-                mini_button.setToolTip(f"Klicken zum Kopieren ➡️ Hotkey: {tooltip_hotkey}")
-            else:
-                mini_button.setToolTip("Klicken zum Kopieren")
-            mini_button.clicked.connect(partial(copy_text_to_clipboard, i))
-            entries_layout.addWidget(mini_button)
-            continue
-        if app_state.edit_mode:
-            row = DragDropWidget(i)
-        else:
-            row = QtWidgets.QWidget()
-        hl  = QtWidgets.QHBoxLayout(row)
-        hl.setContentsMargins(8, 4, 8, 4)
-        hl.setSpacing(12)
-        hl.setStretch(0, 0)
-        hl.setStretch(1, 1) 
-        hl.setStretch(2, 0) 
-        if app_state.edit_mode:
-            drag_handle = QtWidgets.QLabel("☰")
-            drag_handle.setFixedSize(20, 28)
-            drag_handle.setStyleSheet(f"""color: {fg}; background: {bbg}; padding: 2px 4px;border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 4px;text-align: center;""")
-            drag_handle.setAlignment(QtCore.Qt.AlignCenter)
-            drag_handle.setToolTip("Ziehen zum Verschieben")
-            row.drag_index = i
-            drag_handle.drag_index = i
-            row.setAcceptDrops(True)
-            drag_handle.mousePressEvent = lambda event, idx=i: start_drag(event, idx, drag_handle)
-            hl.addWidget(drag_handle)
-        if app_state.edit_mode:
-            et = QtWidgets.QLineEdit(title)
-            et.setFixedWidth(max_t)
-            et.setStyleSheet(f"background:{ebg}; color:{fg}; border: 1px solid {'#555' if app_state.dark_mode else '#ccc'}; border-radius: 6px; padding: 8px;")
-            def validate_and_set_title(idx, widget):
-                new_title = (widget.text() or "").strip()
-                profile = app_state.data["profiles"].get(app_state.active_profile, {})
-                titles_list = profile.get("titles", [])
-                old = titles_list[idx] if idx < len(titles_list) else ""
-                if not new_title:
-                    show_critical_message("Fehler", "Titel darf nicht leer sein!")
-                    widget.setText(old)
-                    return
-                current_titles = [e.text().strip().lower() for j, e in enumerate(app_state.title_entries) if j != idx]
-                if new_title.lower() in current_titles:
-                    show_critical_message("Fehler", f"Titel '{new_title}' wird bereits verwendet!")
-                    widget.setText(old)
-                    return
-                if new_title == old:
-                    return
-                app_state.data["profiles"][app_state.active_profile]["titles"][idx] = new_title
-                app_state.unsaved_changes = True
-            et.editingFinished.connect(partial(validate_and_set_title, i, et))
-            hl.addWidget(et)
-            app_state.title_entries.append(et)
-        else:
-            lt = QtWidgets.QLabel(title)
-            lt.setFixedWidth(max_t)
-            lt.setFixedHeight(40)
-            lt.setStyleSheet(f"""color: {fg}; background: {ebg}; font-weight: bold; padding: 10px 12px;border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;""")
-            lt.setAlignment(QtCore.Qt.AlignVCenter)
-            hl.addWidget(lt)
-        if app_state.edit_mode:
-            ex = QtWidgets.QTextEdit(texts[i])
-            ex.setMaximumHeight(80)
-            ex.setMinimumHeight(60)
-            ex.setStyleSheet(f"background:{ebg}; color:{fg};")
-            ex.setAcceptRichText(True)
-            ex.setHtml(texts[i])
-            ex.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-            ex.customContextMenuRequested.connect(lambda pos, w=ex: show_text_context_menu(pos, w))
-            def update_text(widget, index):
-                new_html = widget.toHtml()
-                texts_list = app_state.data["profiles"][app_state.active_profile]["texts"]
-                old_html = texts_list[index] if index < len(texts_list) else None
-                if new_html == old_html:
-                    return
-                texts_list[index] = new_html
-                app_state.unsaved_changes = True
-            ex.textChanged.connect(partial(update_text, ex, i))
-            hl.addWidget(ex, 1)
-            app_state.text_entries.append(ex)
-        else:
-            text_btn = create_text_button(i, texts, hks, ebg, fg)
-            hl.addWidget(text_btn, 1)
-        if app_state.edit_mode:
-            eh = QtWidgets.QLineEdit(hks[i])
-            eh.setStyleSheet(f"background:{ebg}; color:{fg}; border: 1px solid {'#555' if app_state.dark_mode else '#ccc'}; border-radius: 6px; padding: 8px;")
-            def validate_and_set_hotkey(idx, widget):
-                hotkey = widget.text().strip().lower()
-                erlaubte_zeichen = "1234567890befhmpqvxz§'^"
-                if hotkey:
-                    parts = hotkey.split("+")
-                    if (len(parts) != 3 or 
-                        parts[0] != "ctrl" or 
-                        parts[1] != "shift" or 
-                        parts[2] not in erlaubte_zeichen):
-                        show_critical_message(
-                            "Fehler",
-                            f"Ungültiger Hotkey \"{widget.text()}\" für Eintrag {idx+1}.\n"
-                            f"Erlaubte Zeichen: {erlaubte_zeichen}\n"
-                            f"Format: ctrl+shift+[zeichen]")
-                        widget.setText(hks[idx])
-                        return
-                    current_hotkeys = [entry.text().strip().lower() for j, entry in enumerate(app_state.hotkey_entries) if j != idx]
-                    if hotkey in current_hotkeys:
-                        show_critical_message(
-                            "Fehler",
-                            f"Hotkey \"{widget.text()}\" wird bereits in diesem Profil verwendet!")
-                        widget.setText(hks[idx])
-                        return
-                current_list = app_state.data["profiles"][app_state.active_profile]["hotkeys"]
-                old_hotkey = current_list[idx] if idx < len(current_list) else ""
-                if widget.text() == old_hotkey:
-                    return
-                app_state.data["profiles"][app_state.active_profile]["hotkeys"][idx] = widget.text()
-                app_state.unsaved_changes = True
-            eh.editingFinished.connect(partial(validate_and_set_hotkey, idx=i, widget=eh))
-            hl.addWidget(eh)
-            app_state.hotkey_entries.append(eh)
-            delete_btn = QtWidgets.QPushButton("❌")
-            delete_size = int(38 * app_state.zoom_level)
-            delete_btn.setFixedSize(delete_size, delete_size)
-            delete_btn.setStyleSheet(f"""
-                QPushButton {{background: {ebg};color: {fg};border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;padding: 8px;}}
-                QPushButton:hover {{background: {'#4a4a4a' if app_state.dark_mode else '#f0f0f0'};}}
-                QPushButton:pressed {{background: {'#3a3a3a' if app_state.dark_mode else '#e0e0e0'};}}""")
-            delete_btn.clicked.connect(lambda _, j=i: delete_entry(j))
-            delete_btn.setToolTip("Eintrag löschen")
-            hl.addWidget(delete_btn)
-        else:
-            lh = QtWidgets.QLabel(hks[i])
-            lh.setFixedHeight(40)
-            lh.setStyleSheet(f"""color: {fg}; background: {ebg}; padding: 8px 16px;  min-width: 80px;  border: 1px solid {'#555' if app_state.dark_mode else '#ccc'};border-radius: 6px;font-family: 'Consolas', 'Monaco', monospace;""")
-            lh.setAlignment(QtCore.Qt.AlignCenter)
-            hl.addWidget(lh)
-        entries_layout.addWidget(row)
+    if app_state.edit_mode:
+        titles = app_state.data["profiles"][app_state.active_profile]["titles"]
+        container.setStyleSheet(edit_rows_stylesheet(bg, fg, ebg, bbg))
+        for i in range(len(titles)):
+            entries_layout.addWidget(EntryRow(i))
+        profile_views.show(container)
+        return
+    editor_pool.clear()
+    show_profile_view()
 
 #endregion
 
@@ -1865,7 +3157,8 @@ def show_help_dialog():
         "QuickPaste Hilfe\n\n"
         "• 🌙/🌞 Dunkelmodus: Wechselt zwischen hell/dunkel.\n"
         "• 🔧 Bearbeiten: Titel, Texte und Hotkeys anpassen.\n"
-        "• 🗕/🗖 Mini-Ansicht umschalten \n\n"
+        "• 🗕/🗖 Mini-Ansicht umschalten \n"
+        "• Strg+P oder Klick aufs Profil: Profil suchen und wechseln.\n\n"
         "• ➕ Profil: Neues Textprofil erstellen.\n"
         "• 🖊️ Im Bearbeitungsmodus zwischen Profilen wechseln.\n"
         "• ❌ Löschen: Profil entfernen.\n\n"
@@ -1980,11 +3273,533 @@ def toggle_mini_mode():
 
 #endregion
 
+#region diagnostics
+
+def start_stall_watchdog():
+    """Herzschlag per QTimer; bleibt er länger als stall_threshold_ms aus, schreibt qp_diag die Stacks aller Threads."""
+    threshold_ms = app_state.settings.get("stall_threshold_ms", 2000)
+    if threshold_ms <= 0:
+        return None
+    watchdog = qp_diag.StallWatchdog(DIAG_FILE, threshold_ms / 1000)
+    timer = QtCore.QTimer(win)
+    timer.timeout.connect(watchdog.beat)
+    timer.start(max(50, min(250, threshold_ms // 4)))
+    app.aboutToQuit.connect(watchdog.stop)
+    return watchdog.start()
+
+def count_qobjects():
+    """Lebende QObjects je Klasse unterhalb von win und allen Top-Level-Widgets."""
+    counts = {}
+    seen = set()
+    for root in [win, *app.topLevelWidgets()]:
+        if sip.isdeleted(root) or id(root) in seen:
+            continue
+        seen.add(id(root))
+        for obj in [root, *root.findChildren(QtCore.QObject)]:
+            name = obj.metaObject().className()
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+_leak_tracker = None
+
+def leak_tracker():
+    global _leak_tracker
+    if _leak_tracker is None:
+        tracing = app_state.settings.get("diag_interval_s", 0) > 0
+        _leak_tracker = qp_diag.LeakTracker(trace_frames=1 if tracing else 0)
+    return _leak_tracker
+
+def sample_objects():
+    for cls, before, after in leak_tracker().sample(count_qobjects()):
+        logging.warning(f"⚠ {cls}: Anzahl wächst stetig ({before} -> {after})")
+
+def start_leak_diagnostics():
+    """Diagnosemodus (diag_interval_s > 0): QObjects je Klasse und tracemalloc periodisch erfassen."""
+    interval_s = app_state.settings.get("diag_interval_s", 0)
+    if interval_s <= 0:
+        return None
+    timer = QtCore.QTimer(win)
+    timer.timeout.connect(sample_objects)
+    timer.start(max(5, interval_s) * 1000)
+    QtCore.QTimer.singleShot(0, sample_objects)
+    logging.info(f"Objekt-Diagnose aktiv, Messung alle {max(5, interval_s)} s")
+    return timer
+
+def dump_diagnostics():
+    """Aktuelle Messung plus Verlauf in die Diagnosedatei; liefert die Kurzfassung."""
+    sample_objects()
+    tracker = leak_tracker()
+    qp_diag.diag_log(DIAG_FILE).info(tracker.dump())
+    return tracker.summary()
+
+#endregion
+
+#region low memory
+
+class LowMemoryMode(QtCore.QObject):
+    """
+    Ist das Fenster low_memory_after_s lang versteckt (Tray), werden Toolbar,
+    Eintragsseiten und Bearbeitungszeilen abgebaut; Hotkeys, Kürzel und
+    Einfügen brauchen nur die Profildaten. show_main_window() bzw. das
+    nächste Anzeigen baut die Oberfläche per update_ui() wieder auf.
+    """
+    def __init__(self, after_s):
+        super().__init__(win)
+        self.released = False
+        self.stats = {"lowmem_releases": 0, "lowmem_rss_before_mb": 0.0, "lowmem_rss_after_mb": 0.0, "lowmem_rebuild_ms": 0.0}
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(max(1, after_s) * 1000)
+        self.timer.timeout.connect(self.release)
+        win.installEventFilter(self)
+    def eventFilter(self, obj, event):
+        if obj is win:
+            if event.type() == QtCore.QEvent.Hide:
+                self.timer.start()
+            elif event.type() == QtCore.QEvent.Show:
+                self.timer.stop()
+                self.restore()
+        return False
+    def release(self):
+        """Widgets abbauen; nicht im Bearbeitungsmodus, bei sichtbarem Fenster oder offenem Dialog."""
+        if self.released or win.isVisible():
+            return False
+        if app_state.edit_mode or app.activeModalWidget() or app.activePopupWidget():
+            self.timer.start()   # später noch einmal versuchen
+            return False
+        before = qp_diag.rss_bytes()
+        view_prebuild_timer.stop()
+        profile_views.clear()
+        old_toolbar_actions = toolbar.actions()
+        toolbar.clear()
+        for action in old_toolbar_actions:
+            action.deleteLater()
+        app_state.profile_selector = app_state.profile_delete_button = None
+        for layout in (entries_layout, bottom_bar_layout):
+            while layout.count():
+                widget = layout.takeAt(0).widget()
+                if widget is not None:
+                    widget.deleteLater()
+        app_state.bulk_buttons = []
+        app_state.undo_button = app_state.redo_button = None
+        editor_pool.clear()
+        # deleteLater() greift erst in der Ereignisschleife; hier sofort, damit die Messung stimmt
+        app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+        QtGui.QPixmapCache.clear()
+        qp_diag.trim_memory()
+        after = qp_diag.rss_bytes()
+        self.released = True
+        self.stats["lowmem_releases"] += 1
+        self.stats["lowmem_rss_before_mb"] = round(before / 1048576, 1)
+        self.stats["lowmem_rss_after_mb"] = round(after / 1048576, 1)
+        logging.info(f"Speichersparmodus: Oberfläche abgebaut, RSS {before / 1048576:.1f} → {after / 1048576:.1f} MB")
+        return True
+    def stop(self):
+        """Abschalten (IPC 'reload'); eine abgebaute Oberfläche wird wieder aufgebaut."""
+        self.timer.stop()
+        win.removeEventFilter(self)
+        self.restore()
+    def restore(self):
+        if not self.released:
+            return
+        self.released = False
+        t0 = time.perf_counter()
+        update_ui()
+        self.stats["lowmem_rebuild_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        logging.info(f"Speichersparmodus: Oberfläche in {self.stats['lowmem_rebuild_ms']:.0f} ms neu aufgebaut")
+    def snapshot(self):
+        return {**self.stats, "lowmem_released": int(self.released)}
+
+def start_low_memory_mode():
+    after_s = app_state.settings.get("low_memory_after_s", 0)
+    if after_s <= 0:
+        return None
+    return LowMemoryMode(after_s)
+
+#endregion
+
+#region file watcher
+
+class _ReloadBridge(QtCore.QObject):
+    """Bringt Ergebnisse des Reload-Threads zurück in den GUI-Thread."""
+    loaded = QtCore.pyqtSignal(str, object, object)
+
+class FileReloader:
+    """
+    Beobachtet config.json und sde.json (QFileSystemWatcher, optional zusätzlich
+    Polling über mtime/Grösse), parst geänderte Dateien in einem Worker-Thread,
+    validiert sie und tauscht das Ergebnis im GUI-Thread atomar ein.
+    Eigene Schreibvorgänge werden über ihre Datei-Signatur erkannt und ignoriert.
+    """
+    def __init__(self):
+        self.paths = {"config": CONFIG_FILE, "sde": SDE_FILE}
+        self.signatures = {kind: file_signature(path) for kind, path in self.paths.items()}
+        self.busy = set()
+        self.bridge = _ReloadBridge()
+        self.bridge.loaded.connect(self._on_loaded)
+        self.watcher = QtCore.QFileSystemWatcher()
+        self.watcher.fileChanged.connect(self._schedule_check)
+        self.watcher.directoryChanged.connect(self._schedule_check)
+        self.debounce = QtCore.QTimer()
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(300)
+        self.debounce.timeout.connect(self.check)
+        self.poll = QtCore.QTimer()
+        self.poll.timeout.connect(self.check)
+        self._watch_paths()
+        self.set_poll(app_state.settings.get("reload_poll_ms", 0))
+    def set_poll(self, poll_ms):
+        """Zusätzliches Polling (reload_poll_ms) starten, ändern oder abschalten."""
+        if poll_ms > 0:
+            if self.poll.interval() != max(250, poll_ms) or not self.poll.isActive():
+                self.poll.start(max(250, poll_ms))
+        else:
+            self.poll.stop()
+    def _watch_paths(self):
+        wanted = [APPDATA_PATH] + [p for p in self.paths.values() if os.path.exists(p)]
+        missing = [p for p in wanted if p not in self.watcher.files() + self.watcher.directories()]
+        if missing:
+            self.watcher.addPaths(missing)
+    def _schedule_check(self, _path=None):
+        self._watch_paths()
+        self.debounce.start()
+    def check(self, force=False):
+        """force=True lädt vorhandene Dateien auch ohne Änderung neu (IPC 'reload')."""
+        for kind, path in self.paths.items():
+            sig = file_signature(path)
+            if sig is None or (not force and sig == self.signatures.get(kind)):
+                continue
+            if not force and sig == _own_write_signatures.get(os.path.abspath(path)):
+                self.signatures[kind] = sig
+                continue
+            if kind in self.busy:
+                # Signatur erst beim Start des Workers merken, sonst geht diese Änderung verloren
+                self.debounce.start()
+                continue
+            self.signatures[kind] = sig
+            self.busy.add(kind)
+            threading.Thread(target=self._worker, args=(kind, path), daemon=True).start()
+    def _worker(self, kind, path):
+        try:
+            # Nur lesen und prüfen; Text-Pool und SDE-Packs fasst allein der GUI-Thread an
+            if kind == "sde":
+                raw = read_sde_source()
+                result = (raw, parse_sde_json(raw))
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                qp_store.validate_config(loaded)
+                qp_store.normalize_config(loaded)
+                result = (loaded["profiles"], loaded.get("active_profile"))
+            self.bridge.loaded.emit(kind, result, None)
+        except Exception as e:
+            self.bridge.loaded.emit(kind, None, e)
+    def _on_loaded(self, kind, result, error):
+        self.busy.discard(kind)
+        path = self.paths[kind]
+        if file_signature(path) != self.signatures.get(kind):
+            # Während des Ladens erneut geändert
+            self.debounce.start()
+        if error is not None:
+            logging.warning(f"⚠ Externe Änderung an {os.path.basename(path)} verworfen: {error}")
+            win.statusBar().showMessage(f"{os.path.basename(path)} ungültig, Änderung ignoriert", 4000)
+            return
+        if kind == "sde":
+            apply_reloaded_sde(build_sde_profile(*result))
+            return
+        result = (wrap_profile_texts(result[0]), result[1])
+        if app_state.edit_mode:
+            app_state.pending_config_reload = result
+            win.statusBar().showMessage("config.json wurde extern geändert – wird nach dem Bearbeiten übernommen", 4000)
+        else:
+            apply_reloaded_config(*result)
+
+def _hotkey_signature(profile):
+    if not profile:
+        return None
+    macros = copy.deepcopy(profile.get("macros"))
+    abbreviations = dict(profile.get("abbreviations") or {})
+    return (list(profile.get("hotkeys", [])), len(profile.get("texts", [])), macros, abbreviations,
+            list(profile.get("titles", [])) if macros or abbreviations else None)
+
+def _swap_profiles(new_profiles, active):
+    """Tauscht die Profile aus und frischt nur betroffene Teile (Hotkeys/Tray/UI) auf."""
+    old_profiles = app_state.data["profiles"]
+    old_active = app_state.active_profile
+    old_sig = _hotkey_signature(old_profiles.get(old_active))
+    if active not in new_profiles:
+        active = next((k for k in new_profiles if k != "SDE"), "SDE")
+    if any(new_profiles.get(k) is not old_profiles.get(k) for k in set(new_profiles) | set(old_profiles) if k != "SDE"):
+        # Verlauf bezieht sich auf die alten Listen
+        edit_history.clear()
+    app_state.data["profiles"] = new_profiles
+    app_state.data["active_profile"] = active
+    app_state.active_profile = active
+    if active != old_active or _hotkey_signature(new_profiles.get(active)) != old_sig:
+        register_hotkeys()
+    if list(new_profiles) != list(old_profiles) or active != old_active:
+        refresh_tray()
+    if win.isVisible():
+        update_ui()
+
+def apply_reloaded_config(profiles, file_active):
+    new_profiles = dict(profiles)
+    if "SDE" in app_state.data["profiles"]:
+        new_profiles["SDE"] = app_state.data["profiles"]["SDE"]
+    active = app_state.active_profile if app_state.active_profile in new_profiles else file_active
+    app_state.persisted_profiles = snapshot_profiles(new_profiles)
+    _swap_profiles(new_profiles, active)
+    prune_text_pool()
+    logging.info(f"config.json extern geändert, {len(profiles)} Profile neu geladen")
+
+def apply_reloaded_sde(sde):
+    new_profiles = dict(app_state.data["profiles"])
+    new_profiles["SDE"] = sde
+    _swap_profiles(new_profiles, app_state.active_profile)
+    logging.info("sde.json extern geändert, SDE-Profil neu geladen")
+
+def apply_pending_config_reload():
+    pending = app_state.pending_config_reload
+    app_state.pending_config_reload = None
+    if pending is not None:
+        apply_reloaded_config(*pending)
+
+#endregion
+
+#region IPC
+
+def show_main_window():
+    win.show()
+    win.raise_()
+    win.activateWindow()
+
+def find_entry_index(profile_name, title):
+    titles = app_state.data["profiles"].get(profile_name, {}).get("titles", [])
+    wanted = title.strip().lower()
+    return next((i for i, t in enumerate(titles) if (t or "").strip().lower() == wanted), None)
+
+# Diese Einstellungen stecken in beim Start gebauten Objekten (Codec, Prozess-Pool, Watchdog)
+RESTART_SETTINGS = ("compress_texts", "text_cache_items", "generator_dir", "generator_workers",
+                    "generator_timeout_ms", "generator_ttl_s", "stall_threshold_ms", "diag_interval_s")
+
+def apply_settings(settings):
+    """
+    Neu geladene Einstellungen übernehmen (IPC 'reload'). Einfüge-Regeln,
+    Direkttippen, Makros und SDE-Pack werden bei jeder Verwendung gelesen; der
+    Rest wird hier nachgezogen. Liefert die geänderten Schlüssel, die erst nach
+    einem Neustart wirken.
+    """
+    global library_sync, low_memory
+    old, app_state.settings = app_state.settings, settings
+    changed = {key for key, value in settings.items() if old.get(key) != value}
+    paste_queue.max_depth = max(1, settings["paste_queue_max"])
+    paste_queue.coalesce_ms = max(0, settings["paste_coalesce_ms"])
+    paste_queue.settle_ms = max(0, settings["paste_settle_ms"])
+    edit_history.set_limits(max(64, settings["undo_memory_kb"]) * 1024, max(1, settings["undo_max_steps"]))
+    profile_views.max_views = max(1, settings["view_cache_profiles"])
+    profile_views.max_bytes = max(0, settings["view_cache_mb"] << 20)
+    profile_views._evict()
+    file_reloader.set_poll(settings["reload_poll_ms"])
+    if "abbreviations_enabled" in changed:
+        update_abbreviations()
+    if "tray_recent_profiles" in changed:
+        refresh_tray()
+    if changed & {"sync_source", "sync_interval_s"}:
+        if library_sync is not None:
+            library_sync.stop()
+        library_sync = start_library_sync()
+    if "low_memory_after_s" in changed:
+        if low_memory is not None:
+            low_memory.stop()
+        low_memory = start_low_memory_mode()
+    restart = [key for key in RESTART_SETTINGS if key in changed]
+    if restart:
+        logging.info(f"Einstellungen neu geladen, wirksam erst nach Neustart: {', '.join(restart)}")
+    return restart
+
+def handle_ipc_command(line):
+    """Führt eine Befehlszeile aus und liefert die Antwortzeile."""
+    try:
+        verb, arg = qp_ipc.parse_command(line)
+    except ValueError as e:
+        return f"error {e}"
+    if verb == "show":
+        show_main_window()
+        return "ok"
+    if verb == "stats":
+        stats = paste_queue.snapshot()
+        stats.update(profile_views.snapshot())
+        if low_memory is not None:
+            stats.update(low_memory.snapshot())
+        if stall_watchdog is not None:
+            stats.update(stall_watchdog.snapshot())
+        return "ok " + " ".join(f"{k}={v}" for k, v in stats.items())
+    if verb == "diag":
+        summary = dump_diagnostics()
+        return "ok " + " ".join(f"{k}={v}" for k, v in summary.items()) + f" file={DIAG_FILE}"
+    if verb == "reload":
+        restart = apply_settings(load_settings())
+        file_reloader.check(force=True)
+        return "ok neustart=" + ",".join(restart) if restart else "ok"
+    if app_state.edit_mode:
+        return "error Bearbeitungsmodus aktiv"
+    if verb == "switch":
+        if arg not in app_state.data["profiles"]:
+            return f"error Profil '{arg}' existiert nicht"
+        switch_profile(arg)
+        return "ok"
+    profile_name, title = arg
+    if profile_name not in app_state.data["profiles"]:
+        return f"error Profil '{profile_name}' existiert nicht"
+    index = find_entry_index(profile_name, title)
+    if index is None:
+        return f"error Eintrag '{title}' nicht gefunden"
+    if not enqueue_paste(index, profile_name):
+        return "error Warteschlange voll"
+    return "ok"
+
+class IpcServer:
+    """Lokaler Steuerkanal (QLocalServer) für qp_ipc.py und Automatisierung."""
+    def __init__(self):
+        self.server = QtNetwork.QLocalServer()
+        self.server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+        name = qp_ipc.server_name()
+        if not self.server.listen(name):
+            QtNetwork.QLocalServer.removeServer(name)
+            if not self.server.listen(name):
+                logging.warning(f"⚠ IPC-Kanal '{name}' nicht verfügbar: {self.server.errorString()}")
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            sock.setProperty("qp_buffer", b"")
+            sock.readyRead.connect(partial(self._on_ready_read, sock))
+            sock.disconnected.connect(sock.deleteLater)
+    def _on_ready_read(self, sock):
+        buf = bytes(sock.property("qp_buffer") or b"") + bytes(sock.readAll())
+        if b"\n" not in buf and len(buf) < qp_ipc.MAX_LINE:
+            sock.setProperty("qp_buffer", buf)
+            return
+        line = buf.split(b"\n", 1)[0].decode("utf-8", "replace")
+        try:
+            reply = handle_ipc_command(line)
+        except Exception as e:
+            logging.exception(f"IPC-Befehl fehlgeschlagen: {line!r}")
+            reply = f"error {e}"
+        logging.info(f"IPC: {line!r} -> {reply}")
+        sock.write((reply + "\n").encode("utf-8"))
+        sock.flush()
+        sock.disconnectFromServer()
+
+#endregion
+
+#region library sync
+
+class _SyncBridge(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object, object)
+
+class LibrarySync:
+    """
+    Holt im Hintergrund Änderungen der zentralen Snippet-Bibliothek (sync_source).
+    Netzwerk/Datei-Zugriff läuft im Worker-Thread, der Abgleich selbst im GUI-Thread.
+    Start und Intervall sind zufällig gestreut, damit nicht alle Clients gleichzeitig fragen.
+    """
+    RETRY_MS = 60_000
+    def __init__(self, location, interval_s):
+        self.source = qp_sync.make_source(location)
+        self.interval_ms = max(60, interval_s) * 1000
+        self.state = qp_sync.load_state(SYNC_STATE_FILE)
+        if self.state.get("location") != location:
+            self.state = {"location": location, "etag": None, "version": None, "entries": {}}
+        self.running = False
+        self.stopped = False
+        self.bridge = _SyncBridge()
+        self.bridge.finished.connect(self._on_finished)
+        self.timer = QtCore.QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run)
+        self.timer.start(random.randint(5_000, min(self.interval_ms, 120_000)))
+    def _schedule_next(self, ms=None):
+        if ms is None:
+            ms = int(self.interval_ms * random.uniform(0.9, 1.1))
+        self.timer.start(ms)
+    def stop(self):
+        """Abschalten (IPC 'reload' mit neuer Quelle); ein laufender Abruf wird verworfen."""
+        self.stopped = True
+        self.timer.stop()
+    def run(self):
+        if self.running or self.stopped:
+            return
+        if app_state.edit_mode:
+            self._schedule_next(self.RETRY_MS)
+            return
+        self.running = True
+        state = copy.deepcopy(self.state)
+        threading.Thread(target=self._worker, args=(state,), daemon=True).start()
+    def _worker(self, state):
+        try:
+            self.bridge.finished.emit(qp_sync.fetch_updates(self.source, state), None)
+        except Exception as e:
+            self.bridge.finished.emit(None, e)
+    def _on_finished(self, update, error):
+        self.running = False
+        if self.stopped:
+            return
+        if error is not None:
+            logging.warning(f"⚠ Bibliotheks-Sync fehlgeschlagen: {error}")
+            self._schedule_next()
+            return
+        if update is None:
+            self._schedule_next()
+            return
+        if app_state.edit_mode:
+            self._schedule_next(self.RETRY_MS)
+            return
+        new_profiles = snapshot_profiles(app_state.data["profiles"])
+        result = qp_sync.merge_updates(new_profiles, self.state, update,
+            new_profile=lambda: {"titles": [], "texts": qp_store.wrap_texts([], text_codec, text_pool), "hotkeys": []})
+        if result["applied"]:
+            wrap_profile_texts({name: new_profiles[name] for name in result["changed_profiles"] if name in new_profiles})
+            if "SDE" in app_state.data["profiles"]:
+                new_profiles["SDE"] = app_state.data["profiles"]["SDE"]
+            _swap_profiles(new_profiles, app_state.active_profile)
+            profiles_to_save = {k: v for k, v in new_profiles.items() if k != "SDE"}
+            debounced_saver.schedule_save({"profiles": profiles_to_save, "active_profile": app_state.data["active_profile"]})
+            prune_text_pool()
+            win.statusBar().showMessage(f"Bibliothek synchronisiert: {result['applied']} Änderungen", 4000)
+        for conflict in result["conflicts"]:
+            logging.warning(f"⚠ Sync-Konflikt: '{conflict['title']}' ({conflict['profile']}) lokal geändert, lokale Version behalten")
+        try:
+            qp_sync.save_state(self.state, SYNC_STATE_FILE)
+        except OSError as e:
+            logging.warning(f"⚠ sync_state.json nicht gespeichert: {e}")
+        logging.info(f"Bibliotheks-Sync: {result['applied']} übernommen, {len(result['conflicts'])} Konflikte (Version {self.state.get('version')})")
+        self._schedule_next()
+
+def start_library_sync():
+    location = (app_state.settings.get("sync_source") or "").strip()
+    if not location:
+        return None
+    return LibrarySync(location, app_state.settings.get("sync_interval_s", 900))
+
+#endregion
+
 app.aboutToQuit.connect(lambda: (debounced_saver.timer.stop(), debounced_saver._save()))
+app.aboutToQuit.connect(abbreviation_hook.uninstall)
 load_window_position()
 update_ui()
 register_hotkeys()
 create_tray_icon()
+file_reloader = FileReloader()
+library_sync = start_library_sync()
+ipc_server = IpcServer() if _instance_lock is not None else None
+stall_watchdog = start_stall_watchdog()
+leak_diagnostics_timer = start_leak_diagnostics()
+low_memory = start_low_memory_mode()
+if os.path.isdir(app_state.settings.get("generator_dir") or os.path.join(APPDATA_PATH, "generators")):
+    QtCore.QTimer.singleShot(2000, lambda: generator_host().start())
 win.show()
 QtCore.QTimer.singleShot(0, apply_auto_dpi_scaling)
-sys.exit(app.exec_())
\ No newline at end of file
+if __name__ == "__main__":
+    # qp_stress.py importiert das Modul und treibt die Ereignisschleife selbst
+    sys.exit(app.exec_())
@@ -0,0 +1,240 @@
+"""
+Textbausteine per Kürzel (z.B. ';sig'), ohne Qt-Abhängigkeit.
+
+Profil-Eintrag in config.json:
+    "abbreviations": {";sig": "Signatur", ";adr": "Adresse"}
+
+Alle Kürzel eines Profils werden einmal zu einem Aho-Corasick-Automaten mit
+vollständiger Übergangstabelle kompiliert; pro Tastendruck ist das eine
+Dict-Abfrage. Ein Kürzel löst aus, sobald sein letztes Zeichen getippt ist und
+davor kein Buchstabe/keine Ziffer steht.
+"""
+import sys, ctypes, logging, threading
+from collections import namedtuple, deque
+
+Match = namedtuple("Match", "abbrev target")
+MAX_ABBREV_LEN = 32
+
+def compile_abbreviations(raw, titles):
+    """
+    {kürzel: titel} -> ({kürzel: index}, [warnungen]). Ungültige Einträge und
+    Kürzel, die nie auslösen können (ein kürzeres ist ihr Anfang), werden
+    übersprungen; ValueError nur, wenn raw kein Objekt ist.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("'abbreviations' ist kein Objekt")
+    lookup = {(t or "").strip().lower(): pos for pos, t in enumerate(titles)}
+    result, warnings = {}, []
+    for abbrev, title in raw.items():
+        if not isinstance(abbrev, str) or not isinstance(title, str):
+            warnings.append(f"Kürzel {abbrev!r}: Kürzel und Titel müssen Texte sein")
+        elif not abbrev or len(abbrev) > MAX_ABBREV_LEN or any(c.isspace() for c in abbrev):
+            warnings.append(f"Kürzel {abbrev!r}: 1-{MAX_ABBREV_LEN} Zeichen ohne Leerzeichen")
+        elif title.strip().lower() not in lookup:
+            warnings.append(f"Kürzel {abbrev!r}: Snippet '{title}' nicht gefunden")
+        else:
+            result[abbrev] = lookup[title.strip().lower()]
+    for abbrev in sorted(result, key=len):
+        shorter = next((abbrev[:n] for n in range(1, len(abbrev)) if abbrev[:n] in result), None)
+        if shorter is not None:
+            warnings.append(f"Kürzel {abbrev!r}: löst nie aus, weil {shorter!r} vorher greift")
+            del result[abbrev]
+    return result, warnings
+
+class AbbrevMatcher:
+    """
+    Aho-Corasick-DFA über Zeichen. feed(ch) liefert ein Match, wenn an dieser
+    Stelle ein Kürzel endet, vor dem kein Buchstabe/keine Ziffer steht (bei
+    mehreren das längste), sonst None.
+    backspace() geht einen Zustand zurück, reset() an den Anfang.
+    """
+    __slots__ = ("delta", "output", "state", "_history", "_prev_chars")
+    def __init__(self, abbreviations):
+        goto, output, fail = [{}], [()], [0]
+        for abbrev, target in abbreviations.items():
+            state = 0
+            for ch in abbrev:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    output.append(())
+                    fail.append(0)
+                state = nxt
+            output[state] = (Match(abbrev, target),)
+        alphabet = {ch for edges in goto for ch in edges}
+        # Breitensuche: Fehlerlinks und vollständige Übergänge (delta)
+        delta = [dict() for _ in goto]
+        queue = deque()
+        for ch in alphabet:
+            nxt = goto[0].get(ch, 0)
+            delta[0][ch] = nxt
+            if nxt:
+                queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            # alle hier endenden Kürzel, längstes zuerst (über die Fehlerkette)
+            output[state] = output[state] + output[fail[state]]
+            for ch in alphabet:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    delta[state][ch] = delta[fail[state]][ch]
+                else:
+                    fail[nxt] = delta[fail[state]][ch]
+                    delta[state][ch] = nxt
+                    queue.append(nxt)
+        # Übergänge zur Wurzel weglassen, feed() nimmt dafür get(ch, 0)
+        self.delta = [{ch: s for ch, s in edges.items() if s} for edges in delta]
+        self.output = output
+        self.state = 0
+        self._history = deque(maxlen=MAX_ABBREV_LEN + 1)
+        self._prev_chars = deque(maxlen=MAX_ABBREV_LEN + 1)
+    def __bool__(self):
+        return len(self.delta) > 1
+    def feed(self, ch):
+        self._history.append(self.state)
+        self._prev_chars.append(ch)
+        self.state = self.delta[self.state].get(ch, 0)
+        for match in self.output[self.state]:
+            before = len(match.abbrev) + 1
+            if len(self._prev_chars) >= before and self._prev_chars[-before].isalnum():
+                continue
+            self.reset()
+            return match
+        return None
+    def backspace(self):
+        self.state = self._history.pop() if self._history else 0
+        if self._prev_chars:
+            self._prev_chars.pop()
+    def reset(self):
+        self.state = 0
+        self._history.clear()
+        self._prev_chars.clear()
+
+#region keyboard hook
+
+WH_KEYBOARD_LL = 13
+WM_KEYDOWN, WM_SYSKEYDOWN = 0x0100, 0x0104
+WM_QUIT = 0x0012
+LLKHF_INJECTED = 0x10
+VK_BACK = 0x08
+_RESET_KEYS = {0x09, 0x0D, 0x1B, 0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2E}
+_MODIFIER_KEYS = {0x10, 0x11, 0x12, 0xA0, 0xA1, 0xA2, 0xA3, 0xA4, 0xA5, 0x14}
+VK_SHIFT, VK_CONTROL, VK_MENU, VK_CAPITAL = 0x10, 0x11, 0x12, 0x14
+
+class KeyboardHook:
+    """
+    WH_KEYBOARD_LL-Hook (nur Windows), der getippte Zeichen in einen
+    AbbrevMatcher speist. Hook und Nachrichtenschleife laufen in einem eigenen
+    Thread, damit eine beschäftigte Oberfläche keine Tastendrücke aufhält.
+    Eingespeiste Ereignisse (SendInput, auch die eigenen Backspaces und Ctrl+V)
+    werden ignoriert. on_match(match) wird im Hook-Thread aufgerufen und muss
+    die eigentliche Arbeit an den GUI-Thread übergeben.
+    """
+    def __init__(self, on_match):
+        self.on_match = on_match
+        self.matcher = None
+        self._thread = None
+        self._thread_id = None
+        self._buf = None
+        self._keys = None
+        self._foreground = None
+    def set_matcher(self, matcher):
+        """Neuer Automat; ohne Kürzel wird der Hook ganz entfernt."""
+        self.matcher = matcher if matcher else None
+        if self.matcher is None:
+            self.uninstall()
+        else:
+            self.install()
+    def install(self):
+        if self._thread is not None or sys.platform != "win32":
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="qp-abbrev-hook", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._thread_id is None:
+            self._thread.join()
+            self._thread = None
+    def uninstall(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        thread.join(1.0)
+        self._thread_id = None
+    def _run(self, ready):
+        """Hook-Thread: Hook setzen, Nachrichten pumpen bis WM_QUIT, Hook entfernen."""
+        from ctypes import wintypes
+        user32, kernel32 = ctypes.windll.user32, ctypes.windll.kernel32
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [("vkCode", wintypes.DWORD), ("scanCode", wintypes.DWORD), ("flags", wintypes.DWORD),
+                        ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_void_p)]
+        self._struct = KBDLLHOOKSTRUCT
+        HOOKPROC = ctypes.WINFUNCTYPE(ctypes.c_ssize_t, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        user32.CallNextHookEx.restype = ctypes.c_ssize_t
+        user32.CallNextHookEx.argtypes = (ctypes.c_void_p, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        user32.SetWindowsHookExW.restype = ctypes.c_void_p
+        user32.SetWindowsHookExW.argtypes = (ctypes.c_int, HOOKPROC, ctypes.c_void_p, wintypes.DWORD)
+        self._buf = ctypes.create_unicode_buffer(8)
+        self._keys = (ctypes.c_ubyte * 256)()
+        proc = HOOKPROC(self._callback)
+        msg = wintypes.MSG()
+        # Nachrichtenschlange anlegen, bevor uninstall() WM_QUIT schicken kann
+        user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, 0)
+        handle = user32.SetWindowsHookExW(WH_KEYBOARD_LL, proc, None, 0)
+        if not handle:
+            logging.warning(f"⚠ Tastatur-Hook für Kürzel nicht installierbar (Fehler {ctypes.GetLastError()})")
+            ready.set()
+            return
+        self._thread_id = kernel32.GetCurrentThreadId()
+        ready.set()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            user32.UnhookWindowsHookEx(ctypes.c_void_p(handle))
+    def _callback(self, code, wparam, lparam):
+        user32 = ctypes.windll.user32
+        if code >= 0 and wparam in (WM_KEYDOWN, WM_SYSKEYDOWN) and self.matcher is not None:
+            try:
+                info = ctypes.cast(lparam, ctypes.POINTER(self._struct)).contents
+                if not info.flags & LLKHF_INJECTED:
+                    self._key(user32, info.vkCode, info.scanCode)
+            except Exception as e:
+                logging.warning(f"⚠ Kürzel-Hook: {e}")
+        return user32.CallNextHookEx(None, code, wparam, lparam)
+    def _key(self, user32, vk, scan):
+        matcher = self.matcher
+        if vk in _MODIFIER_KEYS:
+            return
+        foreground = user32.GetForegroundWindow()
+        if foreground != self._foreground:
+            self._foreground = foreground
+            matcher.reset()
+        if vk == VK_BACK:
+            matcher.backspace()
+            return
+        down = lambda key: bool(user32.GetAsyncKeyState(key) & 0x8000)
+        ctrl, alt = down(VK_CONTROL), down(VK_MENU)
+        # Ctrl/Alt/Win allein sind Tastenkürzel; Ctrl+Alt ist AltGr (@, \, ...)
+        if vk in _RESET_KEYS or ctrl != alt or down(0x5B) or down(0x5C):
+            matcher.reset()
+            return
+        self._keys[VK_SHIFT] = 0x80 if down(VK_SHIFT) else 0
+        self._keys[VK_CONTROL] = self._keys[VK_MENU] = 0x80 if ctrl else 0
+        self._keys[VK_CAPITAL] = user32.GetKeyState(VK_CAPITAL) & 0x01
+        layout = user32.GetKeyboardLayout(user32.GetWindowThreadProcessId(foreground, None))
+        # Flag 0x4: Tastaturzustand (Tottasten) der Zielanwendung nicht verändern
+        count = user32.ToUnicodeEx(vk, scan, self._keys, self._buf, len(self._buf), 0x4, layout)
+        if count != 1:
+            if count < 0 or count > 1:
+                matcher.reset()
+            return
+        match = matcher.feed(self._buf.value[0])
+        if match is not None:
+            self.on_match(match)
+
+#endregion
@@ -0,0 +1,211 @@
+"""
+Benchmarks für QuickPaste-Komponenten, die ohne Qt laufen.
+
+    python qp_bench.py storage --snippets 10000
+    python qp_bench.py abbrev --abbrevs 500
+    python qp_bench.py plain --snippets 2000
+"""
+import sys, os, json, time, random, argparse, subprocess, tempfile, gc
+import qp_store
+import qp_abbrev
+import qp_transfer
+from qp_diag import rss_bytes
+from qp_html import html_to_plain, minify_html
+
+_WORDS = (
+    "Guten Tag Sehr geehrte Damen und Herren vielen Dank für Ihre Anfrage "
+    "wir bestätigen den Eingang Ihrer Unterlagen bitte beachten Sie dass "
+    "die Bearbeitung einige Tage dauern kann Freundliche Grüsse Ticket "
+    "Rechnung Vertrag Kundennummer Termin Rückfrage Beilage Formular").split()
+
+def synthetic_snippet(rng, size):
+    paragraphs = []
+    length = 0
+    while length < size:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 40)))
+        if rng.random() < 0.3:
+            words = f'{words} <span style="font-weight:600">{rng.choice(_WORDS)}</span>'
+        paragraphs.append(f"<p>{words}</p>")
+        length += len(paragraphs[-1])
+    return "".join(paragraphs)
+
+def synthetic_config(snippets, profiles, size, seed=1):
+    rng = random.Random(seed)
+    per_profile = max(1, snippets // profiles)
+    data = {"profiles": {}, "active_profile": "Profil 1", "version": 2}
+    for p in range(profiles):
+        data["profiles"][f"Profil {p+1}"] = {
+            "titles":  [f"Titel {i+1}" for i in range(per_profile)],
+            "texts":   [synthetic_snippet(rng, rng.randint(size // 4, size * 2)) for _ in range(per_profile)],
+            "hotkeys": ["" for _ in range(per_profile)]}
+    return data
+
+def _load_probe(mode, path):
+    gc.collect()
+    rss_before = rss_bytes()
+    t0 = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    codec = None if mode == "plain" else qp_store.TextCodec(mode)
+    for vals in data["profiles"].values():
+        vals["texts"] = qp_store.wrap_texts(vals["texts"], codec)
+    load_s = time.perf_counter() - t0
+    gc.collect()
+    rss_after = rss_bytes()
+    rng = random.Random(2)
+    profiles = list(data["profiles"].values())
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        texts = rng.choice(profiles)["texts"]
+        texts[rng.randrange(len(texts))]
+    read_s = time.perf_counter() - t0
+    print(json.dumps({
+        "mode": mode,
+        "file_bytes": os.path.getsize(path),
+        "load_ms": round(load_s * 1000, 1),
+        "rss_delta_mb": round((rss_after - rss_before) / 1048576, 1),
+        "random_read_us": round(read_s * 1e6 / 1000, 1)}))
+
+def bench_storage(args):
+    modes = ["plain", "zlib"] + (["zstd"] if qp_store.zstandard is not None else [])
+    data = synthetic_config(args.snippets, args.profiles, args.size)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            path = os.path.join(tmp, f"config_{mode}.json")
+            out = data
+            if mode != "plain":
+                codec = qp_store.TextCodec(mode)
+                out = {**data, "profiles": {
+                    name: {**vals, "texts": qp_store.wrap_texts(vals["texts"], codec)}
+                    for name, vals in data["profiles"].items()}}
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(out, f, indent=4, default=qp_store.json_default)
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "_load", mode, path],
+                capture_output=True, text=True, check=True)
+            results.append(json.loads(proc.stdout))
+    print(json.dumps({"benchmark": "storage", "snippets": args.snippets, "results": results}, indent=2))
+
+def bench_abbrev(args):
+    """Kosten des Kürzel-Automaten pro Tastendruck über einen synthetischen Tippstrom."""
+    rng = random.Random(3)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    abbrevs = {}
+    while len(abbrevs) < args.abbrevs:
+        abbrevs[";" + "".join(rng.choice(letters) for _ in range(rng.randint(2, 6)))] = len(abbrevs)
+    t0 = time.perf_counter()
+    matcher = qp_abbrev.AbbrevMatcher(qp_abbrev.compile_abbreviations(
+        {a: f"T{i}" for a, i in abbrevs.items()}, [f"T{i}" for i in range(len(abbrevs))])[0])
+    build_ms = (time.perf_counter() - t0) * 1000
+    keys = list(abbrevs)
+    parts = []
+    while sum(len(p) for p in parts) < args.keystrokes:
+        parts.append(rng.choice(keys) if rng.random() < 0.05 else rng.choice(_WORDS))
+    stream = " ".join(parts)[:args.keystrokes]
+    feed = matcher.feed
+    best, matches = None, 0
+    for _ in range(args.repeat):
+        matcher.reset()
+        t0 = time.perf_counter()
+        found = 0
+        for ch in stream:
+            if feed(ch) is not None:
+                found += 1
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+        matches = found
+    print(json.dumps({"benchmark": "abbrev", "abbrevs": len(abbrevs), "states": len(matcher.delta),
+        "keystrokes": len(stream), "matches": matches, "build_ms": round(build_ms, 2),
+        "feed_us": round(best * 1e6 / len(stream), 3)}, indent=2))
+
+def _plain_corpus(args):
+    if args.config:
+        data = qp_transfer.load_config(args.config)
+        return [qp_store.decode_text(t) for vals in data["profiles"].values() for t in vals["texts"]]
+    rng = random.Random(4)
+    corpus = []
+    for n in range(args.snippets):
+        text = synthetic_snippet(rng, rng.randint(args.size // 4, args.size * 2))
+        if n % 4 == 1:
+            text = text.replace("</p><p>", "<br>", 2).replace(" ", "&nbsp; ", 1)
+        elif n % 4 == 2:
+            text = "<ul>" + text.replace("<p>", "<li>").replace("</p>", "</li>\n") + "</ul>"
+        elif n % 4 == 3:
+            text = f"<table><tr><td>{rng.choice(_WORDS)}</td><td></td></tr></table>{text}"
+        corpus.append(text)
+    return corpus
+
+def _best_of(repeat, func, corpus):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in corpus:
+            func(text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6 / max(1, len(corpus))
+
+def bench_plain(args):
+    """
+    html_to_plain gegen QTextDocument.toPlainText: Abweichungen und Kosten pro
+    Snippet. Ohne PyQt5 wird nur html_to_plain gemessen.
+    """
+    corpus = _plain_corpus(args)
+    result = {"benchmark": "plain", "snippets": len(corpus),
+              "py_us": round(_best_of(args.repeat, html_to_plain, corpus), 1)}
+    try:
+        from PyQt5 import QtGui
+    except ImportError:
+        print(json.dumps(result, indent=2))
+        return
+    app = QtGui.QGuiApplication.instance() or QtGui.QGuiApplication(sys.argv[:1])
+    def qt_plain(text):
+        doc = QtGui.QTextDocument()
+        doc.setHtml(text)
+        return doc.toPlainText()
+    # gespeicherte Form: so legt QuickPaste Texte nach dem Bearbeiten ab
+    stored = []
+    for text in corpus:
+        doc = QtGui.QTextDocument()
+        doc.setHtml(text)
+        stored.append(minify_html(doc.toHtml()))
+    mismatches = [t for t in corpus + stored if html_to_plain(t) != qt_plain(t)]
+    result["qt_us"] = round(_best_of(args.repeat, qt_plain, corpus), 1)
+    result["speedup"] = round(result["qt_us"] / max(result["py_us"], 0.001), 1)
+    result["checked"] = len(corpus) + len(stored)
+    result["mismatches"] = len(mismatches)
+    for text in mismatches[:args.show]:
+        print(json.dumps({"html": text, "qt": qt_plain(text), "py": html_to_plain(text)}, ensure_ascii=False))
+    print(json.dumps(result, indent=2))
+    del app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QuickPaste Benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("storage", help="Ladezeit/RSS: Klartext-JSON vs. komprimierte Texte")
+    p.add_argument("--snippets", type=int, default=10000)
+    p.add_argument("--profiles", type=int, default=20)
+    p.add_argument("--size", type=int, default=1500, help="mittlere HTML-Grösse pro Snippet (Zeichen)")
+    p.set_defaults(func=bench_storage)
+    p = sub.add_parser("abbrev", help="Kürzel-Erkennung: Kosten pro Tastendruck")
+    p.add_argument("--abbrevs", type=int, default=500)
+    p.add_argument("--keystrokes", type=int, default=200000)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_abbrev)
+    p = sub.add_parser("plain", help="HTML -> Klartext: Abweichungen und Zeit gegenüber QTextDocument")
+    p.add_argument("--snippets", type=int, default=2000)
+    p.add_argument("--size", type=int, default=600, help="mittlere HTML-Grösse pro Snippet (Zeichen)")
+    p.add_argument("--config", help="Texte aus dieser config.json statt synthetischer Snippets")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--show", type=int, default=5, help="so viele Abweichungen ausgeben")
+    p.set_defaults(func=bench_plain)
+    p = sub.add_parser("_load")
+    p.add_argument("mode")
+    p.add_argument("path")
+    p.set_defaults(func=lambda a: _load_probe(a.mode, a.path))
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
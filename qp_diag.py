@@ -0,0 +1,246 @@
+"""
+Laufzeit-Diagnose für QuickPaste, ohne Qt.
+
+StallWatchdog: der GUI-Thread meldet sich regelmässig per beat() (im Programm
+ein QTimer). Bleibt der Herzschlag länger als threshold aus, schreibt ein
+Hintergrund-Thread die Stacks aller Threads in eine rotierende Diagnosedatei.
+
+LeakTracker: sammelt Objektzählungen je Klasse (im Programm die lebenden
+QObjects) und tracemalloc-Schnappschüsse und meldet Klassen, deren Anzahl
+stetig wächst.
+"""
+import sys, os, gc, time, threading, traceback, tracemalloc, logging, logging.handlers, datetime
+from collections import deque
+
+def rss_bytes():
+    """Resident Set Size des aktuellen Prozesses in Bytes (0 wenn unbekannt)."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return 0
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def trim_memory():
+    """
+    Gibt freigewordenen Speicher ans Betriebssystem zurück (Windows: Working
+    Set leeren, glibc: malloc_trim); True, wenn der Aufruf geklappt hat.
+    """
+    gc.collect()
+    import ctypes
+    try:
+        if sys.platform == "win32":
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            return bool(ctypes.windll.psapi.EmptyWorkingSet(handle))
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return bool(libc.malloc_trim(0))
+    except (OSError, AttributeError):
+        return False
+
+def format_stacks(frames=None, first=None, skip_thread=None):
+    """Stacks aller Threads (sys._current_frames) als Text; first (Standard: Haupt-Thread) steht vorne."""
+    frames = sys._current_frames() if frames is None else frames
+    names = {t.ident: t.name for t in threading.enumerate()}
+    first = threading.main_thread().ident if first is None else first
+    out = []
+    for ident in sorted(frames, key=lambda i: (i != first, names.get(i, ""))):
+        if ident == skip_thread:
+            continue
+        out.append(f'--- Thread "{names.get(ident, "?")}" ({ident})\n')
+        out.extend(traceback.format_stack(frames[ident]))
+    return "".join(out)
+
+def diag_log(path, max_bytes=1 << 20, backups=3):
+    """Logger für die Diagnosedatei (rotiert bei max_bytes, backups alte Dateien); ein Handler pro Pfad."""
+    logger = logging.getLogger("quickpaste.diag")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    path = os.path.abspath(path)
+    if not any(getattr(h, "baseFilename", None) == path for h in logger.handlers):
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+def _stamp():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+class StallWatchdog:
+    """
+    threshold_s: ab dieser Zeit ohne Herzschlag gilt der GUI-Thread als hängend
+    path:        Diagnosedatei, siehe diag_log()
+    Pro Hänger wird einmal ein Stack-Abzug geschrieben; die Dauer steht fest,
+    sobald der nächste Herzschlag kommt, und geht in snapshot() ein.
+    """
+    def __init__(self, path, threshold_s=2.0, clock=time.monotonic):
+        self.threshold_s = max(0.05, threshold_s)
+        self.clock = clock
+        self.logger = diag_log(path)
+        self.gui_thread = threading.get_ident()   # Konstruktor läuft im GUI-Thread
+        self.stats = {"stalls": 0, "stall_ms_total": 0.0, "stall_ms_max": 0.0, "last_stall_ms": 0.0}
+        self._lock = threading.Lock()
+        self._last_beat = clock()
+        self._stalled = False
+        self._stop = threading.Event()
+        self._thread = None
+    def beat(self):
+        """Vom GUI-Thread aufzurufen."""
+        now = self.clock()
+        with self._lock:
+            gap, self._last_beat = now - self._last_beat, now
+            stalled, self._stalled = self._stalled, False
+        if stalled:
+            self._finish(gap)
+    def _finish(self, gap):
+        ms = round(gap * 1000, 1)
+        with self._lock:
+            self.stats["stalls"] += 1
+            self.stats["stall_ms_total"] += ms
+            self.stats["stall_ms_max"] = max(self.stats["stall_ms_max"], ms)
+            self.stats["last_stall_ms"] = ms
+        logging.warning(f"⚠ GUI-Thread hing {ms:.0f} ms (Stacks in der Diagnosedatei)")
+        self.logger.info(f"=== {_stamp()} Hänger beendet nach {ms:.0f} ms\n")
+    def check(self):
+        """Ein Prüfschritt des Watchdog-Threads; True, wenn gerade ein Hänger erkannt wurde."""
+        with self._lock:
+            gap = self.clock() - self._last_beat
+            if self._stalled or gap < self.threshold_s:
+                return False
+            self._stalled = True
+        stacks = format_stacks(first=self.gui_thread, skip_thread=threading.get_ident())
+        self.logger.info(
+            f"=== {_stamp()} GUI-Thread seit {gap * 1000:.0f} ms "
+            f"ohne Herzschlag\n{stacks}")
+        return True
+    def _run(self):
+        interval = min(0.5, self.threshold_s / 4)
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.warning(f"⚠ Watchdog-Prüfung fehlgeschlagen: {e}")
+    def start(self):
+        if self._thread is None:
+            self._last_beat = self.clock()
+            self._thread = threading.Thread(target=self._run, name="qp-watchdog", daemon=True)
+            self._thread.start()
+        return self
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["stall_ms_total"] = round(stats["stall_ms_total"], 1)
+        return stats
+
+class LeakTracker:
+    """
+    sample(counts) nimmt eine Zählung {Klasse: Anzahl} auf (dazu RSS und, wenn
+    tracemalloc läuft, einen Schnappschuss). Verdächtig ist eine Klasse, deren
+    Anzahl über die letzten window Messungen nie sinkt und dabei um mindestens
+    min_growth zunimmt. trace_frames > 0 startet tracemalloc mit so vielen
+    Frames pro Allokation (kostet Speicher und Zeit, nur im Diagnosemodus).
+    """
+    def __init__(self, window=5, min_growth=20, trace_frames=0, max_samples=200, clock=time.time):
+        self.window = max(2, window)
+        self.min_growth = max(1, min_growth)
+        self.clock = clock
+        self.samples = deque(maxlen=max(self.window, max_samples))
+        self.reported = set()
+        self._baseline = self._latest = None
+        if trace_frames > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(trace_frames)
+    def _snapshot(self):
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),))
+    def sample(self, counts):
+        """Nimmt eine Messung auf und liefert die neu verdächtigen Klassen [(klasse, von, bis)]."""
+        self.samples.append((self.clock(), dict(counts), rss_bytes()))
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            if self._baseline is None:
+                self._baseline = snapshot
+            self._latest = snapshot
+        new = [s for s in self.suspects() if s[0] not in self.reported]
+        self.reported.update(cls for cls, _, _ in new)
+        return new
+    def suspects(self):
+        if len(self.samples) < self.window:
+            return []
+        recent = list(self.samples)[-self.window:]
+        found = []
+        for cls in recent[-1][1]:
+            series = [counts.get(cls, 0) for _, counts, _ in recent]
+            if series[-1] - series[0] >= self.min_growth and all(b >= a for a, b in zip(series, series[1:])):
+                found.append((cls, series[0], series[-1]))
+        return sorted(found, key=lambda s: s[1] - s[2])
+    def growth(self, limit=15):
+        """Klassen mit dem grössten Zuwachs seit der ersten Messung [(klasse, von, bis)]."""
+        if not self.samples:
+            return []
+        first, last = self.samples[0][1], self.samples[-1][1]
+        rows = [(cls, first.get(cls, 0), n) for cls, n in last.items() if n != first.get(cls, 0)]
+        return sorted(rows, key=lambda r: r[1] - r[2])[:limit]
+    def memory_growth(self, limit=10):
+        """Zeilen mit dem grössten Speicherzuwachs seit dem ersten tracemalloc-Schnappschuss."""
+        if self._baseline is None or self._latest is self._baseline:
+            return []
+        stats = self._latest.compare_to(self._baseline, "lineno")
+        return [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} "
+                f"{stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d})" for stat in stats[:limit] if stat.size_diff > 0]
+    def summary(self):
+        if not self.samples:
+            return {"samples": 0}
+        (t0, first, rss0), (t1, last, rss1) = self.samples[0], self.samples[-1]
+        return {
+            "samples": len(self.samples),
+            "span_s": round(t1 - t0),
+            "objects": sum(last.values()),
+            "objects_growth": sum(last.values()) - sum(first.values()),
+            "rss_mb": round(rss1 / 1048576, 1),
+            "rss_growth_mb": round((rss1 - rss0) / 1048576, 1),
+            "suspects": len(self.suspects())}
+    def dump(self, top=25):
+        """Textbericht: grösste Klassen, Zuwachs, Verdächtige, Speicherzuwachs nach Quellzeile."""
+        if not self.samples:
+            return "keine Messungen\n"
+        summary = self.summary()
+        lines = [f"=== {_stamp()} Objekt-Diagnose: " + " ".join(f"{k}={v}" for k, v in summary.items())]
+        last = self.samples[-1][1]
+        lines.append("Anzahl je Klasse:")
+        lines += [f"  {n:7d}  {cls}" for cls, n in sorted(last.items(), key=lambda item: -item[1])[:top]]
+        lines.append("Zuwachs seit der ersten Messung:")
+        lines += [f"  {b - a:+7d}  {cls} ({a} -> {b})" for cls, a, b in self.growth(top)] or ["  -"]
+        lines.append(f"Stetig wachsend (letzte {self.window} Messungen):")
+        lines += [f"  {cls} {a} -> {b}" for cls, a, b in self.suspects()] or ["  -"]
+        memory = self.memory_growth()
+        if memory:
+            lines.append("Speicherzuwachs (tracemalloc):")
+            lines += [f"  {line}" for line in memory]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,314 @@
+"""
+Strukturelle Änderungen an einem Profil (titles/texts/hotkeys parallel), ohne Qt.
+Alle Funktionen arbeiten direkt auf den Listen des Profils und halten die drei
+Listen gleich lang.
+
+History speichert Änderungen als Operationen samt Umkehrung statt als Kopie
+aller Profile; Rückgängig kostet so viel wie die Änderung selbst.
+"""
+import time
+from collections import namedtuple
+
+KEYS = ("titles", "texts", "hotkeys")
+HOTKEY_CHARS = "1234567890befhmpqvxz§'^"
+
+def normalize_hotkey(value):
+    """'Ctrl+Shift+1 ' -> 'ctrl+shift+1'; None, wenn es nicht ctrl+shift+[HOTKEY_CHARS] ist."""
+    hotkey = (value or "").strip().lower()
+    parts = hotkey.split("+")
+    if len(parts) != 3 or parts[0] != "ctrl" or parts[1] != "shift" or len(parts[2]) != 1 or parts[2] not in HOTKEY_CHARS:
+        return None
+    return hotkey
+
+def unique_title(title, existing_lower, suffix=""):
+    base = f"{title}{suffix}"
+    candidate, n = base, 2
+    while candidate.strip().lower() in existing_lower:
+        candidate = f"{base} {n}"
+        n += 1
+    existing_lower.add(candidate.strip().lower())
+    return candidate
+
+def get_rows(profile, indices):
+    """[(index, title, text, hotkey)] für die (sortierten) Indizes."""
+    return [(i, profile["titles"][i], profile["texts"][i], profile["hotkeys"][i]) for i in sorted(set(indices))]
+
+def delete_rows(profile, indices):
+    """Löscht die Einträge und liefert sie (aufsteigend) für ein späteres insert_rows."""
+    removed = get_rows(profile, indices)
+    for i, *_ in reversed(removed):
+        for key in KEYS:
+            del profile[key][i]
+    return removed
+
+def insert_rows(profile, rows):
+    """Fügt [(index, title, text, hotkey)] aufsteigend ein; Gegenstück zu delete_rows."""
+    for i, title, text, hotkey in sorted(rows, key=lambda r: r[0]):
+        for key, value in zip(KEYS, (title, text, hotkey)):
+            profile[key].insert(i, value)
+
+def permute(profile, order):
+    """Ordnet die Einträge neu: order[neu] = alt."""
+    for key in KEYS:
+        items = profile[key]
+        if hasattr(items, "reorder"):
+            items.reorder(order)
+        else:
+            items[:] = [items[i] for i in order]
+    return order
+
+def move_rows(profile, indices, offset):
+    """
+    Verschiebt die ausgewählten Einträge gemeinsam um offset Positionen
+    (Reihenfolge untereinander bleibt). Liefert (order, neue Indizes) oder
+    (None, indices), wenn sich nichts ändert.
+    """
+    count = len(profile["titles"])
+    selected = sorted(set(i for i in indices if 0 <= i < count))
+    if not selected or not offset:
+        return None, selected
+    rest = [i for i in range(count) if i not in set(selected)]
+    anchor = max(0, min(len(rest), _insert_pos(rest, selected[0]) + offset))
+    order = rest[:anchor] + selected + rest[anchor:]
+    if order == list(range(count)):
+        return None, selected
+    permute(profile, order)
+    return order, list(range(anchor, anchor + len(selected)))
+
+def _insert_pos(rest, first):
+    return sum(1 for i in rest if i < first)
+
+def move_row(profile, old_index, new_index):
+    """Einzelnes Verschieben (Drag & Drop); liefert die Permutation oder None."""
+    count = len(profile["titles"])
+    if not (0 <= old_index < count and 0 <= new_index < count) or old_index == new_index:
+        return None
+    order = list(range(count))
+    order.insert(new_index, order.pop(old_index))
+    permute(profile, order)
+    return order
+
+def duplicate_rows(profile, indices):
+    """Kopien direkt hinter dem letzten ausgewählten Eintrag, ohne Hotkey. Liefert die neuen Zeilen."""
+    rows = get_rows(profile, indices)
+    if not rows:
+        return []
+    existing = {(t or "").strip().lower() for t in profile["titles"]}
+    pos = rows[-1][0] + 1
+    new_rows = [(pos + n, unique_title(title, existing, " (Kopie)"), text, "")
+                for n, (_, title, text, _) in enumerate(rows)]
+    insert_rows(profile, new_rows)
+    return new_rows
+
+def copy_rows(source, target, indices):
+    """Hängt die Einträge an ein anderes Profil an (Titel eindeutig, belegte Hotkeys frei). Liefert die neuen Zeilen."""
+    existing = {(t or "").strip().lower() for t in target["titles"]}
+    used = {(h or "").strip().lower() for h in target["hotkeys"] if (h or "").strip()}
+    new_rows = []
+    pos = len(target["titles"])
+    for n, (_, title, text, hotkey) in enumerate(get_rows(source, indices)):
+        key = (hotkey or "").strip().lower()
+        if key and key in used:
+            hotkey = ""
+        elif key:
+            used.add(key)
+        new_rows.append((pos + n, unique_title(title, existing), text, hotkey))
+    insert_rows(target, new_rows)
+    return new_rows
+
+def inverse_order(order):
+    inverse = [0] * len(order)
+    for new, old in enumerate(order):
+        inverse[old] = new
+    return inverse
+
+#region history
+
+Op = namedtuple("Op", "kind profile args")
+# insert/delete: args = [(index, title, text, hotkey)]
+# permute:       args = order (order[neu] = alt)
+# set:           args = (index, key, old, new)
+# add_profile/remove_profile: args = (position, profile)
+_INVERSE_KIND = {"insert": "delete", "delete": "insert", "add_profile": "remove_profile", "remove_profile": "add_profile"}
+
+def invert(op):
+    if op.kind == "permute":
+        return op._replace(args=inverse_order(op.args))
+    if op.kind == "set":
+        index, key, old, new = op.args
+        return op._replace(args=(index, key, new, old))
+    return op._replace(kind=_INVERSE_KIND[op.kind])
+
+def apply_op(profiles, op):
+    if op.kind == "add_profile":
+        position, profile = op.args
+        items = list(profiles.items())
+        items.insert(min(position, len(items)), (op.profile, profile))
+        profiles.clear()
+        profiles.update(items)
+        return
+    if op.kind == "remove_profile":
+        del profiles[op.profile]
+        return
+    profile = profiles[op.profile]
+    if op.kind == "insert":
+        insert_rows(profile, op.args)
+    elif op.kind == "delete":
+        for i, *_ in sorted(op.args, key=lambda r: r[0], reverse=True):
+            for key in KEYS:
+                del profile[key][i]
+    elif op.kind == "permute":
+        permute(profile, op.args)
+    elif op.kind == "set":
+        index, key, _, new = op.args
+        profile[key][index] = new
+    else:
+        raise ValueError(f"unbekannte Operation {op.kind!r}")
+
+def _text_size(value):
+    return len(value) if isinstance(value, str) else 16
+
+def op_size(op):
+    """Ungefährer Speicherbedarf einer Operation in Bytes."""
+    if op.kind in ("insert", "delete"):
+        return 64 + sum(_text_size(t) + _text_size(x) + _text_size(h) for _, t, x, h in op.args)
+    if op.kind == "permute":
+        return 64 + 8 * len(op.args)
+    if op.kind == "set":
+        return 64 + _text_size(op.args[2]) + _text_size(op.args[3])
+    profile = op.args[1]
+    texts = profile.get("texts", [])
+    size = texts.compressed_size() if hasattr(texts, "compressed_size") else sum(_text_size(t) for t in texts)
+    return 64 + size + sum(_text_size(v) for key in ("titles", "hotkeys") for v in profile.get(key, []))
+
+class Step:
+    __slots__ = ("label", "ops", "save", "size", "time")
+    def __init__(self, label, save, now):
+        self.label = label
+        self.ops = []
+        self.save = save
+        self.size = 0
+        self.time = now
+    def add(self, op):
+        self.ops.append(op)
+        self.size += op_size(op)
+
+class History:
+    """
+    Undo/Redo-Stapel aus Operationen. begin()/end() fassen mehrere Operationen
+    zu einem Schritt zusammen; record() ohne offenen Schritt legt einen eigenen
+    an. Aufeinanderfolgende Änderungen desselben Feldes innerhalb von
+    coalesce_s werden zu einem Schritt verschmolzen. Ältere Schritte fallen
+    weg, sobald max_bytes oder max_steps überschritten sind.
+    """
+    def __init__(self, max_bytes=2 << 20, max_steps=200, coalesce_s=2.0, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_steps = max_steps
+        self.coalesce_s = coalesce_s
+        self.clock = clock
+        self.undo_stack = []
+        self.redo_stack = []
+        self.saved_depth = 0
+        self._open = None
+        self._depth = 0
+    @property
+    def size(self):
+        return sum(step.size for step in self.undo_stack) + sum(step.size for step in self.redo_stack)
+    @property
+    def dirty(self):
+        return self.saved_depth != len(self.undo_stack)
+    def can_undo(self):
+        return bool(self.undo_stack)
+    def can_redo(self):
+        return bool(self.redo_stack)
+    def begin(self, label="", save=False):
+        if self._depth == 0:
+            self._open = Step(label, save, self.clock())
+        self._depth += 1
+    def end(self, save=None):
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        step, self._open = self._open, None
+        if save is not None:
+            step.save = save
+        if step.ops:
+            self._push(step)
+    def record(self, op):
+        if self._open is not None:
+            self._open.add(op)
+            return
+        now = self.clock()
+        last = self.undo_stack[-1] if self.undo_stack and not self.redo_stack else None
+        if (op.kind == "set" and last is not None and len(last.ops) == 1 and last.ops[0].kind == "set"
+                and last.ops[0].profile == op.profile and last.ops[0].args[:2] == op.args[:2]
+                and now - last.time <= self.coalesce_s and len(self.undo_stack) != self.saved_depth):
+            index, key, old, _ = last.ops[0].args
+            last.ops[0] = op._replace(args=(index, key, old, op.args[3]))
+            last.size = op_size(last.ops[0])
+            last.time = now
+            self._trim()
+            return
+        step = Step("", False, now)
+        step.add(op)
+        self._push(step)
+    def _push(self, step):
+        if self.redo_stack:
+            self.redo_stack.clear()
+            if self.saved_depth is not None and self.saved_depth > len(self.undo_stack):
+                self.saved_depth = None
+        self.undo_stack.append(step)
+        self._trim()
+    def _trim(self):
+        total = self.size
+        while self.undo_stack and (len(self.undo_stack) > self.max_steps or total > self.max_bytes):
+            total -= self.undo_stack.pop(0).size
+            if self.saved_depth is not None:
+                self.saved_depth = self.saved_depth - 1 if self.saved_depth > 0 else None
+        while self.redo_stack and total > self.max_bytes:
+            total -= self.redo_stack.pop(0).size
+    def undo(self, profiles):
+        """Nimmt den letzten Schritt zurück; liefert ihn oder None."""
+        if not self.undo_stack:
+            return None
+        step = self.undo_stack.pop()
+        for op in reversed(step.ops):
+            apply_op(profiles, invert(op))
+        self.redo_stack.append(step)
+        return step
+    def redo(self, profiles):
+        if not self.redo_stack:
+            return None
+        step = self.redo_stack.pop()
+        for op in step.ops:
+            apply_op(profiles, op)
+        self.undo_stack.append(step)
+        return step
+    def rollback(self, profiles):
+        """Zurück zum zuletzt gespeicherten Stand; False, wenn der nicht mehr erreichbar ist."""
+        if self.saved_depth is None or self.saved_depth > len(self.undo_stack) + len(self.redo_stack):
+            return False
+        while len(self.undo_stack) < self.saved_depth:
+            self.redo(profiles)
+        while len(self.undo_stack) > self.saved_depth:
+            self.undo(profiles)
+        self.redo_stack.clear()
+        return True
+    def set_limits(self, max_bytes, max_steps):
+        """Neue Grenzen setzen; überzählige alte Schritte fallen sofort weg."""
+        self.max_bytes = max_bytes
+        self.max_steps = max_steps
+        self._trim()
+    def mark_saved(self):
+        self.saved_depth = len(self.undo_stack)
+    def rename_profiles(self, renames):
+        """Profilnamen in allen gespeicherten Operationen nachziehen ({alt: neu})."""
+        for stack in (self.undo_stack, self.redo_stack):
+            for step in stack:
+                step.ops = [op._replace(profile=renames.get(op.profile, op.profile)) for op in step.ops]
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.saved_depth = 0
+
+#endregion
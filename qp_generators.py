@@ -0,0 +1,223 @@
+"""
+Dynamische Snippet-Inhalte ({{gen:name|arg|...}}) aus Python-Plugins.
+
+Ein Generator ist eine Datei <generator_dir>/<name>.py mit einer Funktion
+generate(*args), die einen Text liefert. Ausgeführt wird in einem warm
+gehaltenen Prozess-Pool mit hartem Timeout; Ergebnisse werden pro
+Argumentsatz mit TTL zwischengespeichert. Ein hängender Worker wird beendet
+und der Pool neu gestartet, das Snippet bekommt dann den Ersatztext.
+Aufrufe gehen erst an den Pool, wenn ein Worker frei ist; der Timeout zählt
+ab da, Wartezeit hinter einem langsamen Generator zählt nicht mit.
+
+    {{gen:ticket|ABC}}                  generators/ticket.py: generate("ABC")
+    {{gen:kunde|4711|default=unbekannt}}
+"""
+import os, sys, time, logging, importlib.util, re
+import multiprocessing
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+GenCall = namedtuple("GenCall", "name args default")
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+MAX_RESULT_CHARS = 100_000
+
+def parse_call(arg):
+    """'name|a|b|default=x' -> GenCall; ValueError bei ungültigem Namen."""
+    parts = [p.strip() for p in (arg or "").split("|")]
+    name, args, default = parts[0], [], ""
+    if not _NAME_RE.match(name):
+        raise ValueError(f"ungültiger Generatorname {name!r}")
+    for part in parts[1:]:
+        if part.startswith("default="):
+            default = part[len("default="):]
+        else:
+            args.append(part)
+    return GenCall(name, tuple(args), default)
+
+#region worker process
+
+_modules = {}
+
+def _load(plugin_dir, name):
+    path = os.path.join(plugin_dir, f"{name}.py")
+    mtime = os.stat(path).st_mtime_ns
+    cached = _modules.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    spec = importlib.util.spec_from_file_location(f"qp_gen_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _modules[path] = (mtime, module)
+    return module
+
+def run_generator(plugin_dir, name, args):
+    """Läuft im Worker-Prozess."""
+    result = _load(plugin_dir, name).generate(*args)
+    text = "" if result is None else str(result)
+    if len(text) > MAX_RESULT_CHARS:
+        raise ValueError(f"Ergebnis zu gross ({len(text)} Zeichen)")
+    return text
+
+def _ping():
+    return os.getpid()
+
+#endregion
+
+def prepare_spawn():
+    """
+    Kinder von 'spawn' importieren das Hauptmodul erneut. QuickPaste.py hat
+    Code auf Modulebene, daher wird den Kindern dieses Modul als Hauptmodul
+    genannt; freeze_support() deckt die PyInstaller-Variante ab.
+    """
+    multiprocessing.freeze_support()
+    main = sys.modules.get("__main__")
+    if main is not None and getattr(main, "__spec__", None) is None and not getattr(sys, "frozen", False):
+        main.__spec__ = importlib.util.find_spec(__name__)
+
+class GeneratorHost:
+    """
+    Verwaltet Pool, Cache und Timeouts. Alle Callbacks laufen über
+    call_soon (threadsafe in den GUI-Thread) bzw. schedule(ms, fn).
+    """
+    def __init__(self, plugin_dir, call_soon, schedule, workers=1, timeout_ms=1500, ttl_s=60, clock=time.monotonic):
+        self.plugin_dir = plugin_dir
+        self.call_soon = call_soon
+        self.schedule = schedule
+        self.workers = max(1, workers)
+        self.timeout_ms = max(50, timeout_ms)
+        self.ttl_s = max(0, ttl_s)
+        self.clock = clock
+        self._cache = {}
+        self._pool = None
+        self._waiting = deque()
+        self._running = {}
+        self._next_token = 0
+        self.stats = {"hits": 0, "runs": 0, "timeouts": 0, "errors": 0, "restarts": 0}
+    def start(self):
+        """Startet den Pool und wärmt die Worker vor (Import/Interpreterstart)."""
+        if self._pool is None:
+            prepare_spawn()
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            for _ in range(self.workers):
+                self._pool.submit(_ping)
+        return self
+    def shutdown(self):
+        self._waiting.clear()
+        self._running.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    def _restart(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            for proc in list((getattr(pool, "_processes", None) or {}).values()):
+                try:
+                    proc.terminate()
+                except Exception:
+                    pass
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.stats["restarts"] += 1
+        self.start()
+    def cached(self, call):
+        key = (call.name, call.args)
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] > self.clock():
+            self.stats["hits"] += 1
+            return entry[0]
+        return None
+    def resolve(self, calls, on_done):
+        """
+        Liefert {GenCall: text} asynchron an on_done. Gecachte Werte werden
+        direkt verwendet; fehlende laufen im Pool, bei Fehler/Timeout gilt default.
+        """
+        values, missing = {}, []
+        for call in calls:
+            value = self.cached(call)
+            if value is None:
+                missing.append(call)
+            else:
+                values[call] = value
+        if not missing:
+            on_done(values)
+            return
+        self.start()
+        remaining = {"count": len(missing)}
+        def settle(call, value):
+            if call in values:
+                return
+            values[call] = value
+            remaining["count"] -= 1
+            if remaining["count"] == 0:
+                on_done(values)
+        self._waiting.extend((call, settle) for call in missing)
+        self._dispatch()
+    def _dispatch(self):
+        """Wartende Aufrufe an freie Worker geben; ab hier läuft ihr Timeout."""
+        while self._waiting and len(self._running) < self.workers:
+            call, settle = self._waiting.popleft()
+            self._next_token += 1
+            token = self._next_token
+            self.stats["runs"] += 1
+            try:
+                future = self._pool.submit(run_generator, self.plugin_dir, call.name, call.args)
+            except Exception as e:
+                # kaputter oder beendeter Pool: Ersatztext, neuer Pool für die übrigen
+                self.stats["errors"] += 1
+                logging.warning(f"⚠ Generator '{call.name}' nicht startbar: {e}")
+                self._restart()
+                settle(call, call.default)
+                continue
+            self._running[token] = (call, settle)
+            future.add_done_callback(lambda f, token=token: self.call_soon(lambda: self._completed(token, f)))
+            self.schedule(self.timeout_ms, lambda token=token: self._expired(token))
+    def _expired(self, token):
+        entry = self._running.pop(token, None)
+        if entry is None:
+            return
+        call, settle = entry
+        self.stats["timeouts"] += 1
+        logging.warning(f"⚠ Generator-Timeout nach {self.timeout_ms} ms: {call.name}")
+        # Übrige laufende Aufrufe sterben mit dem Pool und werden neu gestellt
+        self._waiting.extendleft(reversed(list(self._running.values())))
+        self._running.clear()
+        self._restart()
+        settle(call, call.default)
+        self._dispatch()
+    def _broken(self, call, settle, error):
+        """
+        Ein Worker ist abgestürzt: alle laufenden Aufrufe sind verloren und
+        bekommen ihren Ersatztext (nicht neu gestellt, der Absturz könnte von
+        jedem stammen); Wartende laufen im neuen Pool.
+        """
+        self.stats["errors"] += 1
+        lost = [(call, settle)] + list(self._running.values())
+        logging.warning(f"⚠ Generator-Worker abgestürzt ({error}): {', '.join(c.name for c, _ in lost)}")
+        self._running.clear()
+        self._restart()
+        for lost_call, lost_settle in lost:
+            lost_settle(lost_call, lost_call.default)
+        self._dispatch()
+    def _completed(self, token, future):
+        entry = self._running.pop(token, None)
+        if entry is None or future.cancelled():
+            # schon abgelaufen oder mit dem alten Pool neu gestellt
+            return
+        call, settle = entry
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._broken(call, settle, error)
+            return
+        self._dispatch()
+        if error is not None:
+            self.stats["errors"] += 1
+            logging.warning(f"⚠ Generator '{call.name}' fehlgeschlagen: {error}")
+            settle(call, call.default)
+            return
+        value = future.result()
+        if self.ttl_s:
+            now = self.clock()
+            if len(self._cache) > 1024:
+                self._cache = {k: v for k, v in self._cache.items() if v[1] > now}
+            self._cache[(call.name, call.args)] = (value, now + self.ttl_s)
+        settle(call, value)
@@ -0,0 +1,435 @@
+"""HTML-Hilfsfunktionen für QuickPaste, ohne Qt-Abhängigkeit."""
+import re
+from html.parser import HTMLParser
+from html import escape, unescape
+
+_DROP_TAGS = {"html", "head", "body", "meta", "title", "style", "script", "link"}
+_SKIP_CONTENT = {"head", "title", "style", "script"}
+_VOID_TAGS = {"br", "img", "hr", "meta", "link", "col", "input"}
+_PRE_WRAP_TAGS = {"p", "li"}
+_DEFAULT_DECLS = {
+    "margin-top:0px", "margin-bottom:0px", "margin-left:0px", "margin-right:0px",
+    "text-indent:0px", "-qt-block-indent:0"}
+
+def _clean_style(value):
+    """Entfernt Qt-Standardwerte aus einem style-Attribut; '' wenn nichts übrig bleibt."""
+    kept = []
+    for decl in (value or "").split(";"):
+        prop, sep, val = decl.partition(":")
+        if not sep:
+            continue
+        prop = prop.strip().lower()
+        val = " ".join(val.split())
+        if not prop or not val:
+            continue
+        norm = f"{prop}:{val}"
+        if norm in _DEFAULT_DECLS:
+            continue
+        kept.append(norm)
+    return ";".join(kept)
+
+class _StartTag:
+    __slots__ = ("tag", "attrs", "pre_wrap")
+    def __init__(self, tag, attrs):
+        self.tag = tag
+        self.attrs = attrs
+        self.pre_wrap = False
+    def render(self):
+        attrs = list(self.attrs)
+        if self.pre_wrap:
+            for pos, (name, value) in enumerate(attrs):
+                if name == "style":
+                    attrs[pos] = (name, f"{value};white-space:pre-wrap" if value else "white-space:pre-wrap")
+                    break
+            else:
+                attrs.append(("style", "white-space:pre-wrap"))
+        parts = [self.tag]
+        for name, value in attrs:
+            if value is None:
+                parts.append(name)
+            else:
+                parts.append(f'{name}="{escape(value, quote=True)}"')
+        return "<" + " ".join(parts) + ">"
+
+class _Gap(str):
+    """Whitespace zwischen Blöcken; in Qt-Dokumenten bedeutungslos."""
+
+def _needs_pre_wrap(text):
+    return "  " in text or "\t" in text or "\n" in text or text[:1] == " " or text[-1:] == " "
+
+class _Minifier(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.skip_depth = 0
+        self.qt_doc = False
+        self.block = None
+        self.block_text = []
+        self.open_blocks = 0
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta" and any(n == "name" and v == "qrichtext" for n, v in attrs):
+            self.qt_doc = True
+        if tag in _SKIP_CONTENT and tag not in _VOID_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag in _DROP_TAGS:
+            return
+        cleaned = []
+        for name, value in attrs:
+            if name == "style":
+                value = _clean_style(value)
+                if not value:
+                    continue
+            cleaned.append((name, value))
+        start = _StartTag(tag, cleaned)
+        if tag in _PRE_WRAP_TAGS:
+            self.block = start
+            self.block_text = []
+        if tag not in _VOID_TAGS:
+            self.open_blocks += 1
+        self.out.append(start)
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+    def handle_endtag(self, tag):
+        if tag in _SKIP_CONTENT:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag in _DROP_TAGS or tag in _VOID_TAGS:
+            return
+        self.open_blocks = max(0, self.open_blocks - 1)
+        if tag in _PRE_WRAP_TAGS and self.block is not None:
+            if self.qt_doc and _needs_pre_wrap("".join(self.block_text)):
+                self.block.pre_wrap = True
+            self.block = None
+        self.out.append(f"</{tag}>")
+    def handle_data(self, data):
+        if self.skip_depth or not data:
+            return
+        if not self.open_blocks and not data.strip():
+            self.out.append(_Gap(data))
+            return
+        if self.block is not None:
+            self.block_text.append(data)
+        self.out.append(escape(data, quote=False))
+    def result(self):
+        parts = []
+        for part in self.out:
+            if isinstance(part, _StartTag):
+                parts.append(part.render())
+            elif not (self.qt_doc and isinstance(part, _Gap)):
+                parts.append(part)
+        return "".join(parts)
+
+def minify_html(value):
+    """
+    Kanonische, kompakte Form eines Snippet-Texts: entfernt DOCTYPE, <head>,
+    qrichtext-Meta, Kommentare und Qt-Standardstile, behält semantisches Markup.
+    Whitespace, den Qt über 'p, li { white-space: pre-wrap }' erhält, bleibt per
+    Inline-Stil am jeweiligen Absatz erhalten.
+    """
+    if not value:
+        return ""
+    if "<" not in value and "&" not in value:
+        return value
+    parser = _Minifier()
+    parser.feed(value)
+    parser.close()
+    return parser.result()
+
+#region plain text
+
+# Blockelemente wie in QTextHtmlParser; nach dem Schliessen (ausser div)
+# beginnt folgender Inline-Text einen neuen Absatz.
+_BLOCK_TAGS = {
+    "p", "div", "li", "ul", "ol", "dl", "dt", "dd", "pre", "blockquote", "center", "address",
+    "h1", "h2", "h3", "h4", "h5", "h6", "body", "html", "hr"}
+_CELL_TAGS = {"td", "th", "caption"}
+_PRE_MODES = {"pre", "pre-wrap"}
+_CONTAINER_TAGS = {"tr", "ul", "ol"}   # Whitespace direkt darin ist kein Inhalt
+_COLLAPSE_RE = re.compile(r"[^\S\xa0]+")
+_PRE_NEWLINE_RE = re.compile("[\r\u2028\u2029]")
+
+# Ein Durchlauf über den String statt HTMLParser: Tags mit roher Attributzeichenkette,
+# Kommentare/Doctype werden übersprungen, alles andere ist Text.
+_TOKEN_RE = re.compile(
+    r"<(/?)([a-zA-Z][^\s/>]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>|<!--.*?(?:-->|$)|<[!?][^>]*>?|([^<]+|<)",
+    re.S)
+_WHITE_SPACE_RE = re.compile(r"white-space\s*:\s*([\w-]+)", re.I)
+_COLSPAN_RE = re.compile(r"colspan\s*=\s*[\"']?\s*(\d+)", re.I)
+
+def _white_space(attrs):
+    if "white-space" not in attrs:
+        return None
+    match = _WHITE_SPACE_RE.search(attrs)
+    return match.group(1).lower() if match else None
+
+def _is_qt_empty(attrs):
+    return "-qt-paragraph-type" in attrs and "-qt-paragraph-type:empty" in attrs.replace(" ", "")
+
+class _Table:
+    __slots__ = ("columns", "row_columns", "row_ends", "cells")
+    def __init__(self):
+        self.columns = 0
+        self.row_columns = 0
+        self.row_ends = []
+        self.cells = 0
+
+class _PlainText:
+    """
+    Baut die Absätze so auf wie QTextDocument beim Import: leere Absätze werden
+    vom nächsten Block wiederverwendet, <br> ist ein Zeilenumbruch im Absatz,
+    Tabellenzellen sind eigene Absätze, Whitespace wird je nach white-space
+    zusammengefasst oder erhalten.
+    """
+    def __init__(self):
+        self.parts = []
+        self.open_tags = []            # offene Elemente ...
+        self.modes = []                # ... und der white-space-Modus davor
+        self.mode = "normal"
+        self.skip_depth = 0
+        self.qt_doc = False
+        self.tables = []
+        self.block_empty = True        # aktueller Absatz ohne Inhalt (wiederverwendbar)
+        self.implicit = True           # noch der Anfangsabsatz des Dokuments
+        self.first_block = True        # noch kein zweiter Absatz angelegt
+        self.keep_block = False        # leer, aber eigener Absatz (hr, -qt-paragraph-type:empty)
+        self.block_closed = False      # Block geschlossen, nächster Text braucht neuen Absatz
+        self.line_start = True
+        self.last_space = False
+        self.block_end = False         # letzter Knoten war ein Block (Endtag, hr)
+        self.pending_space = False     # einzelnes Leerzeichen nach block_end; Qt verwirft es, sobald ein weiterer Knoten folgt
+        self.skip_br = False
+        self.strip_newline = False
+    def _new_block(self):
+        self.parts.append("\n")
+        self.block_empty = True
+        self.keep_block = self.implicit = self.first_block = False
+        self.block_closed = self.block_end = False
+        self.line_start = True
+        self.last_space = False
+        self.pending_space = False
+    def _start_block(self):
+        if self.block_empty and not self.keep_block:
+            self.block_closed = self.block_end = self.implicit = False
+            self.line_start = True
+            self.last_space = False
+            self.pending_space = False
+        else:
+            self._new_block()
+    def _content(self):
+        if self.block_closed and (not self.block_empty or self.keep_block):
+            self._new_block()
+        elif self.pending_space and not self.line_start and not self.last_space:
+            self.parts.append(" ")
+        self.block_closed = False
+        self.block_end = False
+        self.pending_space = False
+        self.block_empty = False
+    def feed(self, value):
+        for closing, tag, attrs, data in _TOKEN_RE.findall(value):
+            if data:
+                self.handle_data(unescape(data) if "&" in data else data)
+            elif not tag:
+                continue
+            elif closing:
+                self.handle_endtag(tag.lower())
+            elif attrs.endswith("/"):
+                self.handle_startendtag(tag.lower(), attrs)
+            else:
+                self.handle_starttag(tag.lower(), attrs)
+    def handle_starttag(self, tag, attrs):
+        if tag == "meta" and "qrichtext" in attrs:
+            self.qt_doc = True
+        if tag in _SKIP_CONTENT:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        self.strip_newline = self.block_end = self.pending_space = False
+        if tag == "br":
+            if not self.skip_br:
+                self._line_break()
+            return
+        if tag == "img":
+            self._content()
+            self.parts.append("\ufffc")
+            self.line_start, self.last_space = False, False
+            return
+        if tag == "hr":
+            self._start_block()
+            self.keep_block = self.block_closed = self.block_end = True
+            return
+        if tag == "table" or tag in ("td", "th", "tr") and not self.tables:
+            self._new_block()
+            self.tables.append(_Table())
+            if tag == "table":
+                return
+        if tag == "tr":
+            self._end_row()
+        elif tag in _CELL_TAGS:
+            table = self.tables[-1]
+            if table.cells:
+                self._new_block()
+            table.cells += 1
+            if tag != "caption":
+                colspan = _COLSPAN_RE.search(attrs) if "colspan" in attrs else None
+                table.row_columns += max(1, int(colspan.group(1))) if colspan else 1
+        elif _is_qt_empty(attrs):
+            # leerer Absatz aus Qt: nur der allererste Absatz wird dafür wiederverwendet
+            in_list = self.open_tags and self.open_tags[-1] in ("ul", "ol")
+            if self.implicit or in_list and not self.first_block:
+                self._start_block()
+            else:
+                self._new_block()
+            self.keep_block = self.skip_br = True
+        elif tag in _BLOCK_TAGS:
+            self._start_block()
+        if tag in _VOID_TAGS:
+            return
+        mode = _white_space(attrs)
+        if mode is None:
+            mode = "pre" if tag == "pre" else "pre-wrap" if self.qt_doc and tag in _PRE_WRAP_TAGS else self.mode
+        self.open_tags.append(tag)
+        self.modes.append(self.mode)
+        self.mode = mode
+        self.strip_newline = mode in _PRE_MODES and (tag in _BLOCK_TAGS or tag in _CELL_TAGS)
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+    def _end_row(self):
+        table = self.tables[-1]
+        if table.row_columns:
+            table.columns = max(table.columns, table.row_columns)
+            table.row_ends.append((len(self.parts), table.row_columns))
+            table.row_columns = 0
+    def _end_table(self):
+        self._end_row()
+        table = self.tables.pop()
+        # fehlende Zellen kürzerer Zeilen füllt Qt mit leeren Absätzen auf
+        for pos, columns in reversed(table.row_ends):
+            self.parts[pos:pos] = ["\n"] * (table.columns - columns)
+        # hinter einer Tabelle mit leerer letzter Zelle ist der Folgeabsatz wiederverwendbar
+        last_cell_empty = self.block_empty and not self.keep_block
+        self._new_block()
+        self.keep_block = not last_cell_empty
+    def handle_endtag(self, tag):
+        if tag in _SKIP_CONTENT:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag in _VOID_TAGS:
+            return
+        if tag == "table" and self.tables:
+            self._end_table()
+        if tag not in self.open_tags:
+            return
+        while self.open_tags.pop() != tag:
+            self.modes.pop()
+        self.mode = self.modes.pop()
+        self.strip_newline = self.skip_br = False
+        if tag in _BLOCK_TAGS or tag in _CELL_TAGS or tag in ("tr", "table"):
+            self.block_end = True
+            self.block_closed = self.block_closed or tag != "div"
+    def handle_data(self, data):
+        if self.skip_depth or not data:
+            return
+        if self.open_tags and self.open_tags[-1] in _CONTAINER_TAGS and data.isspace():
+            return
+        self.pending_space = False
+        if self.mode in _PRE_MODES:
+            if self.strip_newline and data[0] in "\r\n":
+                data = data[2:] if data.startswith("\r\n") else data[1:]
+            self.strip_newline = False
+            if not data:
+                return
+            self._content()
+            self.parts.append(_PRE_NEWLINE_RE.sub("\n", data).replace("\xa0", " "))
+            self.line_start, self.last_space = data[-1] in "\r\n", False
+            return
+        self.strip_newline = False
+        if self.mode == "pre-line":
+            for pos, line in enumerate(_PRE_NEWLINE_RE.sub("\n", data).split("\n")):
+                if pos:
+                    self._line_break()
+                self._collapse(line)
+        else:
+            self._collapse(data)
+    def _collapse(self, data):
+        # Normalfall: nur einzelne Leerzeichen, dann ist nichts zusammenzufassen
+        text = data if "  " not in data and data.isprintable() else _COLLAPSE_RE.sub(" ", data)
+        if not text:
+            return
+        core = text.strip(" ")
+        if text[0] == " ":
+            self._space()
+        if core:
+            self._content()
+            self.parts.append(core.replace("\xa0", " ") if "\xa0" in core else core)
+            self.line_start = self.last_space = False
+            if text[-1] == " ":
+                self._space()
+    def _line_break(self):
+        self._content()
+        self.parts.append("\n")
+        self.line_start, self.last_space = True, False
+    def _space(self):
+        if self.block_end:
+            self.pending_space = True
+        elif not self.line_start and not self.last_space:
+            self.parts.append(" ")
+            self.last_space = True
+    def close(self):
+        while self.tables:
+            self._end_table()
+        # Whitespace nach dem letzten Block hängt Qt an diesen an
+        if self.pending_space and not self.block_empty and not self.line_start and not self.last_space:
+            self.parts.append(" ")
+    def result(self):
+        return "".join(self.parts)
+
+def html_to_plain(value):
+    """
+    Klartext eines Snippet-HTMLs wie QTextDocument.toPlainText(), aber ohne Qt:
+    Absätze und <br> als '\\n', &nbsp; als Leerzeichen, Bilder als U+FFFC.
+    """
+    if not value:
+        return ""
+    if "<" not in value and "&" not in value:
+        return _COLLAPSE_RE.sub(" ", value).lstrip(" ").replace("\xa0", " ")
+    parser = _PlainText()
+    parser.feed(value)
+    parser.close()
+    return parser.result()
+
+#endregion
+
+CF_HTML_HEADER_TMPL = (
+    "Version:0.9\r\n"
+    "StartHTML:{start_html:010d}\r\n"
+    "EndHTML:{end_html:010d}\r\n"
+    "StartFragment:{start_frag:010d}\r\n"
+    "EndFragment:{end_frag:010d}\r\n")
+CF_HTML_PREFIX = "<!DOCTYPE html><html><body><!--StartFragment-->".encode("utf-8")
+CF_HTML_SUFFIX = "<!--EndFragment--></body></html>".encode("utf-8")
+_CF_HTML_HEADER_LEN = len(CF_HTML_HEADER_TMPL.format(start_html=0, end_html=0, start_frag=0, end_frag=0))
+
+def cf_html_header(fragment_len):
+    """
+    CF_HTML-Header für ein Fragment mit fragment_len UTF-8-Bytes. Die Offsets
+    sind feste 10-stellige Felder, daher ergibt sich alles aus den Längen.
+    """
+    start_html = _CF_HTML_HEADER_LEN
+    start_frag = start_html + len(CF_HTML_PREFIX)
+    end_frag = start_frag + fragment_len
+    return CF_HTML_HEADER_TMPL.format(
+        start_html=start_html,
+        end_html=end_frag + len(CF_HTML_SUFFIX),
+        start_frag=start_frag,
+        end_frag=end_frag).encode("ascii")
+
+def build_cf_html(fragment):
+    """CF_HTML-Bytes (Header mit korrekten UTF-8-Byte-Offsets + Body) für ein HTML-Fragment."""
+    fragment_bytes = (fragment or "").encode("utf-8")
+    return b"".join((cf_html_header(len(fragment_bytes)), CF_HTML_PREFIX, fragment_bytes, CF_HTML_SUFFIX))
@@ -0,0 +1,319 @@
+"""Tastatur-Eingabe für QuickPaste: Ereignisstrom + austauschbare Backends."""
+import sys, os, re, ctypes, fnmatch, logging, time
+from collections import namedtuple
+
+INPUT_KEYBOARD    = 1
+KEYEVENTF_KEYUP   = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+VK_BACK    = 0x08
+VK_TAB     = 0x09
+VK_RETURN  = 0x0D
+VK_SHIFT   = 0x10
+VK_CONTROL = 0x11
+VK_MENU    = 0x12
+VK_LWIN    = 0x5B
+VK_RWIN    = 0x5C
+VK_INSERT  = 0x2D
+VK_V       = 0x56
+
+KeyEvent = namedtuple("KeyEvent", "vk scan flags")
+TargetInfo = namedtuple("TargetInfo", "hwnd process window_class")
+PasteRule = namedtuple("PasteRule", "process window_class strategy paste_delay_ms release_delay_ms")
+
+STRATEGY_AUTO         = "auto"
+STRATEGY_HTML         = "html"
+STRATEGY_PLAIN        = "plain"
+STRATEGY_SHIFT_INSERT = "shift_insert"
+STRATEGY_TYPE         = "type"
+STRATEGIES = (STRATEGY_AUTO, STRATEGY_HTML, STRATEGY_PLAIN, STRATEGY_SHIFT_INSERT, STRATEGY_TYPE)
+
+_CONTROL_KEYS = {"\n": VK_RETURN, "\t": VK_TAB}
+MODIFIER_KEYS = (VK_CONTROL, VK_SHIFT, VK_MENU, VK_LWIN, VK_RWIN)
+_RICH_TAG_RE = re.compile(r"<(a|b|i|u|s|strong|em|span|font|img|table|ul|ol|sub|sup|pre|code|h[1-6])\b", re.IGNORECASE)
+
+def should_type_directly(html_text, plain_text, max_chars):
+    """Kurze Texte ohne Formatierung (höchstens max_chars Zeichen, 0 = aus) werden getippt statt eingefügt."""
+    if max_chars <= 0 or len(plain_text) > max_chars:
+        return False
+    return not _RICH_TAG_RE.search(html_text or "")
+
+def _char_events(ch):
+    """Down/Up-Ereignisse für ein einzelnes Zeichen (UTF-16, inkl. Surrogatpaare)."""
+    vk = _CONTROL_KEYS.get(ch)
+    if vk is not None:
+        return [KeyEvent(vk, 0, 0), KeyEvent(vk, 0, KEYEVENTF_KEYUP)]
+    raw = ch.encode("utf-16-le")
+    events = []
+    for pos in range(0, len(raw), 2):
+        unit = raw[pos] | (raw[pos + 1] << 8)
+        events.append(KeyEvent(0, unit, KEYEVENTF_UNICODE))
+        events.append(KeyEvent(0, unit, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+    return events
+
+def unicode_events(text):
+    """Kompletter Ereignisstrom für einen Text (CRLF/CR werden zu Enter)."""
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    events = []
+    for ch in text:
+        events.extend(_char_events(ch))
+    return events
+
+def unicode_chunks(text, max_events=64):
+    """
+    Teilt den Ereignisstrom in Blöcke von höchstens max_events Ereignissen.
+    Ein Zeichen wird nie über zwei Blöcke verteilt.
+    """
+    max_events = max(4, int(max_events))
+    text = (text or "").replace("\r\n", "\n").replace("\r", "\n")
+    chunk = []
+    for ch in text:
+        events = _char_events(ch)
+        if chunk and len(chunk) + len(events) > max_events:
+            yield chunk
+            chunk = []
+        chunk.extend(events)
+    if chunk:
+        yield chunk
+
+def key_combo(modifiers, vk):
+    """Ereignisse für eine Tastenkombination, z.B. key_combo((VK_CONTROL,), VK_V)."""
+    events = [KeyEvent(m, 0, 0) for m in modifiers]
+    events.append(KeyEvent(vk, 0, 0))
+    events.append(KeyEvent(vk, 0, KEYEVENTF_KEYUP))
+    events.extend(KeyEvent(m, 0, KEYEVENTF_KEYUP) for m in reversed(modifiers))
+    return events
+
+def modifier_release_events():
+    """Key-Up für alle Modifiertasten (Ctrl/Shift/Alt/Win), falls der Hotkey noch gedrückt ist."""
+    return [KeyEvent(vk, 0, KEYEVENTF_KEYUP) for vk in MODIFIER_KEYS]
+
+def key_taps(vk, count):
+    """count-maliges Drücken einer einzelnen Taste (z.B. Backspace)."""
+    return [KeyEvent(vk, 0, flags) for _ in range(max(0, int(count))) for flags in (0, KEYEVENTF_KEYUP)]
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk",         ctypes.c_uint16),
+        ("wScan",       ctypes.c_uint16),
+        ("dwFlags",     ctypes.c_uint32),
+        ("time",        ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t),]
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx",          ctypes.c_int32),
+        ("dy",          ctypes.c_int32),
+        ("mouseData",   ctypes.c_uint32),
+        ("dwFlags",     ctypes.c_uint32),
+        ("time",        ctypes.c_uint32),
+        ("dwExtraInfo", ctypes.c_size_t),]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_uint32), ("u", _INPUTUNION)]
+
+class SendInputBackend:
+    """Schickt jeden Block als ein einziges SendInput-Array an Windows."""
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+    def send(self, events):
+        count = len(events)
+        if not count:
+            return 0
+        arr = (_INPUT * count)()
+        for slot, ev in zip(arr, events):
+            slot.type = INPUT_KEYBOARD
+            slot.u.ki.wVk = ev.vk
+            slot.u.ki.wScan = ev.scan
+            slot.u.ki.dwFlags = ev.flags
+        sent = self._user32.SendInput(count, arr, ctypes.sizeof(_INPUT))
+        if sent != count:
+            raise OSError(f"SendInput hat nur {sent} von {count} Ereignissen eingespeist")
+        return sent
+
+class RecordingBackend:
+    """Zeichnet die Blöcke nur auf (Linux/Tests)."""
+    def __init__(self):
+        self.batches = []
+    def send(self, events):
+        self.batches.append(list(events))
+        return len(events)
+    @property
+    def events(self):
+        return [ev for batch in self.batches for ev in batch]
+    def clear(self):
+        self.batches.clear()
+
+def default_backend():
+    if sys.platform == "win32":
+        return SendInputBackend()
+    return RecordingBackend()
+
+def _process_name_for_hwnd(user32, hwnd):
+    kernel32 = ctypes.windll.kernel32
+    pid = ctypes.c_ulong(0)
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+    if not handle:
+        return ""
+    try:
+        buf = ctypes.create_unicode_buffer(260)
+        size = ctypes.c_ulong(len(buf))
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buf, ctypes.byref(size)):
+            return ""
+        return os.path.basename(buf.value).lower()
+    finally:
+        kernel32.CloseHandle(handle)
+
+class ForegroundTracker:
+    """
+    Liefert Prozess und Fensterklasse des Vordergrundfensters.
+    Aufgelöst wird nur, wenn sich das Vordergrundfenster geändert hat;
+    sonst kostet ein Aufruf genau ein GetForegroundWindow.
+    """
+    EMPTY = TargetInfo(0, "", "")
+    def __init__(self):
+        self._user32 = ctypes.windll.user32 if sys.platform == "win32" else None
+        self._info = self.EMPTY
+        self.resolutions = 0
+    def current(self):
+        if self._user32 is None:
+            return self._info
+        hwnd = self._user32.GetForegroundWindow() or 0
+        if hwnd == self._info.hwnd:
+            return self._info
+        self._info = self._resolve(hwnd)
+        return self._info
+    def _resolve(self, hwnd):
+        self.resolutions += 1
+        if not hwnd:
+            return self.EMPTY
+        try:
+            cls_buf = ctypes.create_unicode_buffer(256)
+            self._user32.GetClassNameW(hwnd, cls_buf, len(cls_buf))
+            return TargetInfo(hwnd, _process_name_for_hwnd(self._user32, hwnd), cls_buf.value)
+        except Exception as e:
+            logging.warning(f"Vordergrundfenster nicht auflösbar: {e}")
+            return TargetInfo(hwnd, "", "")
+
+def compile_paste_rules(raw_rules, default_paste_delay_ms=200, default_release_delay_ms=50):
+    """Prüft die Regeltabelle aus settings.json und wandelt sie in PasteRule-Tupel um."""
+    rules = []
+    for pos, raw in enumerate(raw_rules or []):
+        if not isinstance(raw, dict):
+            logging.warning(f"⚠ paste_rules[{pos}] ist kein Objekt, ignoriert.")
+            continue
+        process = (raw.get("process") or "").strip().lower()
+        window_class = (raw.get("window_class") or "").strip()
+        strategy = (raw.get("strategy") or STRATEGY_AUTO).strip().lower()
+        if not process and not window_class:
+            logging.warning(f"⚠ paste_rules[{pos}] braucht 'process' oder 'window_class', ignoriert.")
+            continue
+        if strategy not in STRATEGIES:
+            logging.warning(f"⚠ paste_rules[{pos}]: unbekannte Strategie '{strategy}', ignoriert.")
+            continue
+        try:
+            paste_delay = max(0, int(raw.get("paste_delay_ms", default_paste_delay_ms)))
+            release_delay = max(0, int(raw.get("release_delay_ms", default_release_delay_ms)))
+        except (TypeError, ValueError):
+            logging.warning(f"⚠ paste_rules[{pos}]: ungültige Verzögerung, ignoriert.")
+            continue
+        rules.append(PasteRule(process, window_class, strategy, paste_delay, release_delay))
+    return rules
+
+def match_paste_rule(target, rules, default):
+    """Erste passende Regel (Prozessname/Fensterklasse, Wildcards erlaubt) oder default."""
+    for rule in rules:
+        if rule.process and not fnmatch.fnmatchcase(target.process, rule.process):
+            continue
+        if rule.window_class and not fnmatch.fnmatchcase(target.window_class, rule.window_class):
+            continue
+        return rule
+    return default
+
+PasteJob = namedtuple("PasteJob", "key start timeout_ms submitted")
+
+class PasteQueue:
+    """
+    Führt Einfüge-Jobs strikt nacheinander aus. Ein Job ist start(done): er
+    setzt Zwischenablage, sendet Tasten und ruft done(), wenn die Tasten
+    losgelassen sind; erst dann darf der nächste Job die Zwischenablage anfassen.
+    Ist die Schlange leer, startet ein Job sofort (keine Zusatzlatenz).
+
+    max_depth:   mehr wartende Jobs werden abgewiesen (Rückstau)
+    coalesce_ms: gleicher key kurz hintereinander, solange der erste noch wartet -> nur einmal
+    settle_ms:   Pause zwischen zwei Jobs, damit das Zielprogramm das vorige Einfügen verarbeitet
+    schedule(ms, fn) kommt von aussen (im Programm ein QTimer).
+    """
+    def __init__(self, schedule, max_depth=8, coalesce_ms=0, settle_ms=100, clock=time.perf_counter):
+        self.schedule = schedule
+        self.max_depth = max(1, max_depth)
+        self.coalesce_ms = max(0, coalesce_ms)
+        self.settle_ms = max(0, settle_ms)
+        self.clock = clock
+        self.pending = []
+        self.running = None
+        self._token = 0
+        self.stats = {"submitted": 0, "completed": 0, "dropped": 0, "coalesced": 0, "timeouts": 0,
+                      "max_depth": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "last_wait_ms": 0.0}
+    @property
+    def depth(self):
+        return len(self.pending) + (self.running is not None)
+    def submit(self, key, start, timeout_ms=10_000):
+        """Reiht einen Job ein; False, wenn er wegen Rückstau verworfen wurde."""
+        now = self.clock()
+        self.stats["submitted"] += 1
+        if self.coalesce_ms and self.pending:
+            last = self.pending[-1]
+            if last.key == key and (now - last.submitted) * 1000 <= self.coalesce_ms:
+                self.stats["coalesced"] += 1
+                return True
+        if len(self.pending) >= self.max_depth:
+            self.stats["dropped"] += 1
+            logging.warning(f"⚠ Einfüge-Warteschlange voll ({self.max_depth}), '{key}' verworfen")
+            return False
+        self.pending.append(PasteJob(key, start, timeout_ms, now))
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.depth)
+        if self.running is None:
+            self._start_next()
+        return True
+    def _start_next(self):
+        if self.running is not None or not self.pending:
+            return
+        job = self.pending.pop(0)
+        wait_ms = round((self.clock() - job.submitted) * 1000, 1)
+        self.stats["last_wait_ms"] = wait_ms
+        self.stats["wait_ms_total"] += wait_ms
+        self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], wait_ms)
+        self._token += 1
+        token = self._token
+        self.running = job
+        if job.timeout_ms:
+            self.schedule(job.timeout_ms, lambda: self._timed_out(token))
+        try:
+            job.start(lambda: self._done(token))
+        except Exception as e:
+            logging.exception(f"Einfüge-Job '{job.key}' fehlgeschlagen: {e}")
+            self._done(token)
+    def _done(self, token):
+        if token != self._token or self.running is None:
+            return
+        self.running = None
+        self.stats["completed"] += 1
+        if self.pending:
+            self.schedule(self.settle_ms, self._start_next)
+    def _timed_out(self, token):
+        if token == self._token and self.running is not None:
+            self.stats["timeouts"] += 1
+            logging.warning(f"⚠ Einfüge-Job '{self.running.key}' hat nach {self.running.timeout_ms} ms nicht gemeldet, nächster Job startet")
+            self._done(token)
+    def clear(self):
+        """Verwirft alle wartenden Jobs (der laufende läuft zu Ende)."""
+        self.pending.clear()
+    def snapshot(self):
+        done = self.stats["completed"] + (self.running is not None)
+        avg = self.stats["wait_ms_total"] / done if done else 0.0
+        return {**self.stats, "depth": self.depth, "wait_ms_avg": round(avg, 1)}
@@ -0,0 +1,135 @@
+"""
+Einzelinstanz-Sperre und Steuerkanal zur laufenden QuickPaste-Instanz, ohne Qt.
+
+Die laufende Instanz lauscht per QLocalServer auf server_name(); unter Windows
+ist das die Named Pipe \\\\.\\pipe\\<name>, sonst ein Unix-Socket im Temp-Verzeichnis.
+Protokoll: eine UTF-8-Zeile pro Verbindung, Antwort 'ok ...' oder 'error ...'.
+
+    python qp_ipc.py paste "Profil 1/Begrüssung"
+    python qp_ipc.py switch "Profil 2"
+    python qp_ipc.py reload
+    python qp_ipc.py show
+    python qp_ipc.py stats
+    python qp_ipc.py diag
+"""
+import sys, os, re, socket, tempfile, time, getpass
+
+COMMANDS = ("paste", "switch", "reload", "show", "stats", "diag")
+EXIT_OK, EXIT_ERROR, EXIT_NOT_RUNNING = 0, 1, 2
+MAX_LINE = 4096
+
+def server_name():
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "user"
+    return "QuickPaste-" + re.sub(r"[^A-Za-z0-9_.-]", "_", user)
+
+def endpoint_path(name=None):
+    name = name or server_name()
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(os.environ.get("TMPDIR") or tempfile.gettempdir(), name)
+
+def parse_command(line):
+    """'verb argument' -> (verb, argument); ValueError bei ungültiger Zeile."""
+    line = (line or "").strip()
+    verb, _, arg = line.partition(" ")
+    verb = verb.lower()
+    arg = arg.strip()
+    if verb not in COMMANDS:
+        raise ValueError(f"unbekannter Befehl '{verb}'")
+    if verb in ("paste", "switch") and not arg:
+        raise ValueError(f"'{verb}' braucht ein Argument")
+    if verb == "paste":
+        profile, sep, title = arg.partition("/")
+        if not sep or not profile.strip() or not title.strip():
+            raise ValueError("paste erwartet <profil>/<titel>")
+        return verb, (profile.strip(), title.strip())
+    return verb, arg
+
+def acquire_instance_lock(lock_dir):
+    """
+    Systemweite Sperre pro Benutzer. Liefert ein Handle, das bis zum Prozessende
+    gehalten werden muss, oder None wenn bereits eine Instanz läuft.
+    """
+    if sys.platform == "win32":
+        import ctypes
+        ERROR_ALREADY_EXISTS = 183
+        kernel32 = ctypes.windll.kernel32
+        kernel32.CreateMutexW.restype = ctypes.c_void_p
+        handle = kernel32.CreateMutexW(None, False, f"Local\\{server_name()}")
+        if handle and kernel32.GetLastError() == ERROR_ALREADY_EXISTS:
+            kernel32.CloseHandle(ctypes.c_void_p(handle))
+            return None
+        return handle
+    import fcntl
+    f = open(os.path.join(lock_dir, "instance.lock"), "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+def send_command(line, timeout=2.0, name=None):
+    """Schickt eine Befehlszeile an die laufende Instanz und liefert deren Antwortzeile."""
+    payload = (line.strip() + "\n").encode("utf-8")
+    if len(payload) > MAX_LINE:
+        raise ValueError("Befehl zu lang")
+    path = endpoint_path(name)
+    if sys.platform == "win32":
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                pipe = open(path, "r+b", buffering=0)
+                break
+            except FileNotFoundError:
+                raise ConnectionRefusedError("QuickPaste läuft nicht")
+            except OSError:
+                # Pipe existiert, alle Instanzen belegt: kurz warten
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("QuickPaste antwortet nicht")
+                time.sleep(0.01)
+        with pipe:
+            pipe.write(payload)
+            return _read_line(pipe.read)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except FileNotFoundError:
+            raise ConnectionRefusedError("QuickPaste läuft nicht")
+        sock.sendall(payload)
+        return _read_line(sock.recv)
+
+def _read_line(read):
+    buf = b""
+    while b"\n" not in buf and len(buf) < MAX_LINE:
+        chunk = read(512)
+        if not chunk:
+            break
+        buf += chunk
+    return buf.split(b"\n", 1)[0].decode("utf-8", "replace")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__.strip())
+        return EXIT_OK if argv else EXIT_ERROR
+    line = " ".join(argv)
+    try:
+        parse_command(line)
+    except ValueError as e:
+        print(f"error {e}", file=sys.stderr)
+        return EXIT_ERROR
+    try:
+        reply = send_command(line)
+    except OSError as e:
+        print(f"error {e}", file=sys.stderr)
+        return EXIT_NOT_RUNNING
+    print(reply)
+    return EXIT_OK if reply.startswith("ok") else EXIT_ERROR
+
+if __name__ == "__main__":
+    sys.exit(main())
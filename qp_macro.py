@@ -0,0 +1,179 @@
+"""
+Makros: Abfolgen aus Snippets, Tasten und Pausen, ohne Qt-Abhängigkeit.
+
+Profil-Eintrag in config.json:
+    "macros": [{"title": "Formular", "hotkey": "ctrl+shift+f",
+                "steps": [{"snippet": "Name"}, {"key": "tab"}, {"snippet": "Adresse"},
+                          {"wait": 300}, {"key": "enter"}]}]
+"""
+import time, logging
+from collections import namedtuple
+import qp_input
+
+MacroStep = namedtuple("MacroStep", "kind value delay_ms")
+Macro = namedtuple("Macro", "title hotkey steps")
+
+_MODIFIER_KEYS = {"ctrl": qp_input.VK_CONTROL, "shift": qp_input.VK_SHIFT, "alt": 0x12, "win": 0x5B}
+_NAMED_KEYS = {
+    "enter": qp_input.VK_RETURN, "return": qp_input.VK_RETURN, "tab": qp_input.VK_TAB,
+    "backspace": qp_input.VK_BACK, "esc": 0x1B, "escape": 0x1B, "space": 0x20,
+    "pageup": 0x21, "pagedown": 0x22, "end": 0x23, "home": 0x24,
+    "left": 0x25, "up": 0x26, "right": 0x27, "down": 0x28,
+    "insert": qp_input.VK_INSERT, "delete": 0x2E, "del": 0x2E,
+    **{f"f{n}": 0x6F + n for n in range(1, 13)}}
+MAX_WAIT_MS = 60_000
+STEP_ALLOWANCE_MS = 5_000
+
+def parse_key(spec):
+    """'tab', 'ctrl+a', 'shift+f10' -> Liste von KeyEvents; ValueError bei Unbekanntem."""
+    parts = [p.strip().lower() for p in (spec or "").split("+") if p.strip()]
+    if not parts:
+        raise ValueError("leere Taste")
+    *mods, key = parts
+    try:
+        modifiers = tuple(_MODIFIER_KEYS[m] for m in mods)
+    except KeyError as e:
+        raise ValueError(f"unbekannter Modifier {e.args[0]!r}") from None
+    if key in _NAMED_KEYS:
+        vk = _NAMED_KEYS[key]
+    elif len(key) == 1 and ("a" <= key <= "z" or "0" <= key <= "9"):
+        vk = ord(key.upper())
+    else:
+        raise ValueError(f"unbekannte Taste {key!r}")
+    return qp_input.key_combo(modifiers, vk)
+
+def compile_macro(raw, titles):
+    """Prüft ein Makro aus config.json gegen die Titel des Profils; ValueError bei Fehlern."""
+    if not isinstance(raw, dict):
+        raise ValueError("Makro ist kein Objekt")
+    title = (raw.get("title") or "").strip()
+    if not title:
+        raise ValueError("Makro ohne Titel")
+    lookup = {(t or "").strip().lower(): pos for pos, t in enumerate(titles)}
+    steps = []
+    for pos, step in enumerate(raw.get("steps") or []):
+        if not isinstance(step, dict):
+            raise ValueError(f"{title}: Schritt {pos+1} ist kein Objekt")
+        delay = step.get("delay_ms")
+        if delay is not None and (not isinstance(delay, int) or delay < 0):
+            raise ValueError(f"{title}: Schritt {pos+1} hat ungültiges delay_ms")
+        if "snippet" in step:
+            index = lookup.get(str(step["snippet"]).strip().lower())
+            if index is None:
+                raise ValueError(f"{title}: Snippet '{step['snippet']}' nicht gefunden")
+            steps.append(MacroStep("snippet", index, delay))
+        elif "key" in step:
+            steps.append(MacroStep("key", parse_key(step["key"]), delay))
+        elif "wait" in step:
+            wait = step["wait"]
+            if not isinstance(wait, int) or not 0 <= wait <= MAX_WAIT_MS:
+                raise ValueError(f"{title}: Schritt {pos+1} hat ungültige Wartezeit")
+            steps.append(MacroStep("wait", wait, delay))
+        else:
+            raise ValueError(f"{title}: Schritt {pos+1} braucht 'snippet', 'key' oder 'wait'")
+    if not steps:
+        raise ValueError(f"{title}: keine Schritte")
+    return Macro(title, (raw.get("hotkey") or "").strip().lower(), steps)
+
+def macro_timeout_ms(macro, step_gap_ms=20, step_ms=STEP_ALLOWANCE_MS, margin_ms=10_000):
+    """
+    Obergrenze für einen Makro-Job der Einfüge-Warteschlange: alle Pausen und
+    Schrittabstände plus step_ms je Snippet-/Tastenschritt und eine Reserve.
+    """
+    total = margin_ms
+    for step in macro.steps:
+        total += step.value if step.kind == "wait" else step_ms
+        total += step_gap_ms if step.delay_ms is None else step.delay_ms
+    return total
+
+class MacroRunner:
+    """
+    Führt ein Makro nicht-blockierend aus. Zeitsteuerung kommt von aussen
+    (schedule(ms, fn), im Programm ein QTimer), die eigentliche Arbeit vom executor:
+        executor.prepare(step)             -> payload (Klartext/CF_HTML vorbereiten)
+        executor.run(step, payload, done)  -> führt aus, ruft done() wenn fertig
+    Während Schritt N läuft, wird die Nutzlast von Schritt N+1 bereits vorbereitet.
+    on_finished kommt genau einmal: nach dem letzten Schritt, bei einem Fehler
+    oder sofort bei cancel(); ein danach noch gemeldetes done() wird ignoriert.
+    """
+    def __init__(self, macro, executor, schedule, step_gap_ms=20, on_finished=None, clock=time.perf_counter):
+        self.macro = macro
+        self.executor = executor
+        self.schedule = schedule
+        self.step_gap_ms = step_gap_ms
+        self.on_finished = on_finished
+        self.clock = clock
+        self.timings = []
+        self.cancelled = False
+        self.finished = False
+        self._payloads = {}
+        self._current = -1
+        self._started = None
+    def start(self):
+        self._started = self.clock()
+        try:
+            self._payloads[0] = self._prepare(0)
+        except Exception as e:
+            logging.exception(f"Makro '{self.macro.title}': Vorbereitung von Schritt 1 fehlgeschlagen: {e}")
+            self.cancelled = True
+            self._finish()
+            return
+        self._run(0)
+    def cancel(self):
+        """Bricht ab und meldet sofort fertig; ein laufender Schritt wird nicht fortgesetzt."""
+        if not self.finished:
+            self.cancelled = True
+            self._finish()
+    def _prepare(self, pos):
+        step = self.macro.steps[pos]
+        if step.kind == "wait":
+            return None
+        return self.executor.prepare(step)
+    def _run(self, pos):
+        if self.cancelled or pos >= len(self.macro.steps):
+            self._finish()
+            return
+        step = self.macro.steps[pos]
+        self._current = pos
+        t0 = self.clock()
+        step_done = False
+        def done():
+            nonlocal step_done
+            if step_done or self.finished:
+                return
+            step_done = True
+            self.timings.append((pos, step.kind, round((self.clock() - t0) * 1000, 1)))
+            gap = self.step_gap_ms if step.delay_ms is None else step.delay_ms
+            self.schedule(gap, lambda: self._run(pos + 1))
+        try:
+            if pos not in self._payloads:
+                self._payloads[pos] = self._prepare(pos)
+            payload = self._payloads.pop(pos)
+            if step.kind == "wait":
+                self.schedule(step.value, done)
+            else:
+                self.executor.run(step, payload, done)
+        except Exception as e:
+            logging.exception(f"Makro '{self.macro.title}': Schritt {pos+1} fehlgeschlagen: {e}")
+            self.cancelled = True
+            self._finish()
+            return
+        if pos + 1 < len(self.macro.steps) and pos + 1 not in self._payloads:
+            self.schedule(0, lambda: self._prefetch(pos + 1))
+    def _prefetch(self, pos):
+        if self.cancelled or self.finished or pos <= self._current or pos in self._payloads:
+            return
+        try:
+            self._payloads[pos] = self._prepare(pos)
+        except Exception as e:
+            logging.warning(f"Makro '{self.macro.title}': Vorbereitung von Schritt {pos+1} fehlgeschlagen: {e}")
+    def _finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self._payloads.clear()
+        if self.on_finished is not None:
+            self.on_finished(self)
+    @property
+    def total_ms(self):
+        return round((self.clock() - self._started) * 1000, 1) if self._started is not None else 0.0
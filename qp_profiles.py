@@ -0,0 +1,86 @@
+"""
+Profil-Index für den Profilwechsler, ohne Qt.
+
+Der Index hält nur Namen (in Profil-Reihenfolge) samt Suchschlüssel und eine
+Liste der zuletzt benutzten Profile. Wechsel und Tray-Menü brauchen nur die
+Recent-Liste; erst die Suche im Wechsler geht über alle Namen, und auch sie
+liefert höchstens limit Treffer an die Oberfläche.
+
+config.json:
+    "recent_profiles": ["Kunde A", "Kunde B"]
+"""
+import heapq
+
+MAX_RECENT = 20
+
+class ProfileIndex:
+    """
+    sync(names) gleicht die Namensliste ab (günstig, wenn sich nichts geändert
+    hat); touch(name) setzt ein Profil an den Anfang der Recent-Liste. recent
+    wird nur in place geändert und kann so direkt in config.json landen.
+    """
+    def __init__(self, names=(), recent=(), max_recent=MAX_RECENT):
+        self.max_recent = max(1, max_recent)
+        self.recent = []
+        for name in recent or ():
+            if isinstance(name, str) and name not in self.recent:
+                self.recent.append(name)
+        del self.recent[self.max_recent:]
+        self._names = []
+        self._keys = {}
+        self.sync(names)
+    def sync(self, names):
+        names = list(names)
+        if names == self._names:
+            return False
+        self._names = names
+        self._keys = {name: name.casefold() for name in names}
+        return True
+    def __len__(self):
+        return len(self._names)
+    def touch(self, name):
+        if name in self.recent:
+            self.recent.remove(name)
+        self.recent.insert(0, name)
+        del self.recent[self.max_recent:]
+    def rename(self, mapping):
+        """mapping {alt: neu} auf die Recent-Liste übertragen; die Namen kommen mit dem nächsten sync()."""
+        self.recent[:] = [mapping.get(name, name) for name in self.recent]
+    def recent_names(self, existing, limit=None, skip=()):
+        """Zuletzt benutzte Profile, die es in existing (dict/set) noch gibt."""
+        found = [name for name in self.recent if name in existing and name not in skip]
+        return found if limit is None else found[:limit]
+    def search(self, query, limit=50, skip=()):
+        """
+        -> (namen, trefferzahl). Leere Suche: zuletzt benutzte zuerst, dann
+        Profil-Reihenfolge. Sonst müssen alle Wörter der Suche im Namen
+        vorkommen; Namensanfang vor Wortanfang vor beliebiger Stelle,
+        innerhalb davon zuletzt benutzte zuerst.
+        """
+        rank_recent = {name: pos for pos, name in enumerate(self.recent)}
+        words = (query or "").casefold().split()
+        if not words:
+            head = [name for name in self.recent if name in self._keys and name not in skip]
+            total = len(self._names) - sum(1 for name in skip if name in self._keys)
+            if len(head) < limit:
+                chosen = set(head)
+                for name in self._names:
+                    if name not in chosen and name not in skip:
+                        head.append(name)
+                        if len(head) >= limit:
+                            break
+            return head[:limit], total
+        needle = " ".join(words)
+        hits = []
+        for pos, name in enumerate(self._names):
+            key = self._keys[name]
+            if name in skip or not all(word in key for word in words):
+                continue
+            if key.startswith(needle):
+                rank = 0
+            elif any(part.startswith(words[0]) for part in key.split()):
+                rank = 1
+            else:
+                rank = 2
+            hits.append((rank, rank_recent.get(name, self.max_recent), pos, name))
+        return [hit[3] for hit in heapq.nsmallest(limit, hits)], len(hits)
@@ -0,0 +1,598 @@
+"""Speicherformat der Snippet-Texte: optionale Kompression auf Platte und im Speicher."""
+import os, sys, json, zlib, mmap, time, struct, base64, hashlib, logging, tempfile
+from collections import OrderedDict
+from collections.abc import MutableSequence, Sequence
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+from qp_html import minify_html
+
+TOKEN_PREFIX = "\x01"
+BLOB_REF_PREFIX = "\x01b:"
+CONFIG_VERSION = 2
+_TAG_TO_METHOD = {"z": "zlib", "s": "zstd"}
+_METHOD_TO_TAG = {v: k for k, v in _TAG_TO_METHOD.items()}
+
+class LRUCache:
+    """Kleiner LRU-Cache, begrenzt nach Anzahl Einträgen."""
+    def __init__(self, max_items=64):
+        self.max_items = max(1, int(max_items))
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    def get(self, key):
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+    def clear(self):
+        self._items.clear()
+    def __len__(self):
+        return len(self._items)
+
+class TextCodec:
+    """
+    Komprimiert Snippet-Texte zu Blobs (bytes, erstes Byte = Verfahren) und
+    hält zuletzt gelesene Texte dekomprimiert in einem LRU.
+    """
+    def __init__(self, method="zlib", level=6, cache_items=64):
+        if method == "zstd" and zstandard is None:
+            logging.warning("⚠ zstandard nicht installiert, verwende zlib.")
+            method = "zlib"
+        if method not in _METHOD_TO_TAG:
+            raise ValueError(f"Unbekanntes Kompressionsverfahren: {method}")
+        self.method = method
+        self.level = level
+        self.cache = LRUCache(cache_items)
+        self._tag = _METHOD_TO_TAG[method].encode("ascii")
+        if method == "zstd":
+            self._zc = zstandard.ZstdCompressor(level=level)
+            self._zd = zstandard.ZstdDecompressor()
+    def compress(self, text):
+        raw = (text or "").encode("utf-8")
+        if self.method == "zstd":
+            return self._tag + self._zc.compress(raw)
+        return self._tag + zlib.compress(raw, self.level)
+    def decompress(self, blob):
+        text = self.cache.get(blob)
+        if text is None:
+            text = _decompress_blob(blob, getattr(self, "_zd", None))
+            self.cache.put(blob, text)
+        return text
+
+def _decompress_blob(blob, zstd_decompressor=None):
+    method = _TAG_TO_METHOD.get(chr(blob[0]))
+    if method == "zlib":
+        return zlib.decompress(blob[1:]).decode("utf-8")
+    if method == "zstd":
+        if zstd_decompressor is None:
+            if zstandard is None:
+                raise ValueError("Text ist zstd-komprimiert, aber zstandard ist nicht installiert")
+            zstd_decompressor = zstandard.ZstdDecompressor()
+        return zstd_decompressor.decompress(blob[1:]).decode("utf-8")
+    raise ValueError(f"Unbekannter Blob-Typ: {blob[:1]!r}")
+
+def is_token(value):
+    return isinstance(value, str) and value.startswith(TOKEN_PREFIX) and not value.startswith(BLOB_REF_PREFIX)
+
+def blob_to_token(blob):
+    """Blob -> JSON-taugliche Zeichenkette ('\\x01z:' + Base64)."""
+    return f"{TOKEN_PREFIX}{chr(blob[0])}:" + base64.b64encode(blob[1:]).decode("ascii")
+
+def token_to_blob(token):
+    tag = token[1:2]
+    if tag not in _TAG_TO_METHOD or token[2:3] != ":":
+        raise ValueError(f"Ungültiges Text-Token: {token[:8]!r}")
+    return tag.encode("ascii") + base64.b64decode(token[3:])
+
+def decode_text(value):
+    """Gespeicherter Wert (Klartext oder Token) -> Klartext."""
+    if is_token(value):
+        return _decompress_blob(token_to_blob(value))
+    return value or ""
+
+class CompressedTexts(MutableSequence):
+    """
+    Listenartige Sicht auf komprimierte Snippet-Texte. Lesen liefert Klartext
+    (über den LRU des Codecs), Schreiben komprimiert sofort.
+    """
+    __slots__ = ("codec", "_blobs")
+    def __init__(self, codec, blobs=None):
+        self.codec = codec
+        self._blobs = list(blobs or [])
+    @classmethod
+    def from_stored(cls, codec, items):
+        blobs = []
+        for item in items or []:
+            if is_token(item):
+                blob = token_to_blob(item)
+                if chr(blob[0]) != _METHOD_TO_TAG[codec.method]:
+                    blob = codec.compress(_decompress_blob(blob))
+                blobs.append(blob)
+            else:
+                blobs.append(codec.compress(item))
+        return cls(codec, blobs)
+    def __len__(self):
+        return len(self._blobs)
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.codec.decompress(b) for b in self._blobs[index]]
+        return self.codec.decompress(self._blobs[index])
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._blobs[index] = [self.codec.compress(v) for v in value]
+        else:
+            self._blobs[index] = self.codec.compress(value)
+    def __delitem__(self, index):
+        del self._blobs[index]
+    def insert(self, index, value):
+        self._blobs.insert(index, self.codec.compress(value))
+    def reorder(self, order):
+        """Neue Reihenfolge (order[neu] = alt) ohne Entpacken."""
+        self._blobs = [self._blobs[i] for i in order]
+    def __eq__(self, other):
+        if isinstance(other, CompressedTexts):
+            return self._blobs == other._blobs or list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+    def __repr__(self):
+        return f"CompressedTexts({len(self._blobs)} Texte, {self.codec.method})"
+    def copy(self):
+        return CompressedTexts(self.codec, self._blobs)
+    __copy__ = copy
+    def __deepcopy__(self, memo):
+        return self.copy()
+    def compressed_size(self):
+        return sum(len(b) for b in self._blobs)
+    def to_stored(self):
+        return [blob_to_token(b) for b in self._blobs]
+    def blobs(self):
+        return list(self._blobs)
+    def intern_into(self, pool):
+        self._blobs = [pool.intern_blob(b) for b in self._blobs]
+        return self
+
+class LazyTexts(MutableSequence):
+    """
+    Texte eines Profils, die erst beim ersten Lesen oder Schreiben mit wrap
+    (z.B. wrap_texts samt Codec/Pool) in die Speicherform kommen. Bis dahin
+    bleiben die Einträge so liegen, wie sie aus config.json kamen (Klartext
+    oder Token); len(), copy() und to_stored() packen nichts aus.
+    """
+    __slots__ = ("_stored", "_wrap", "_texts")
+    def __init__(self, stored, wrap):
+        self._stored = list(stored or [])
+        self._wrap = wrap
+        self._texts = None
+    @property
+    def materialized(self):
+        return self._texts is not None
+    def texts(self):
+        if self._texts is None:
+            self._texts = self._wrap(self._stored)
+            self._stored = None
+        return self._texts
+    def __len__(self):
+        return len(self._stored) if self._texts is None else len(self._texts)
+    def __getitem__(self, index):
+        return self.texts()[index]
+    def __setitem__(self, index, value):
+        self.texts()[index] = value
+    def __delitem__(self, index):
+        del self.texts()[index]
+    def insert(self, index, value):
+        self.texts().insert(index, value)
+    def reorder(self, order):
+        texts = self.texts()
+        if hasattr(texts, "reorder"):
+            texts.reorder(order)
+        else:
+            texts[:] = [texts[i] for i in order]
+    def __eq__(self, other):
+        if isinstance(other, LazyTexts) and self._texts is None and other._texts is None and self._wrap is other._wrap:
+            return self._stored == other._stored
+        if isinstance(other, LazyTexts):
+            other = other.texts()
+        return self.texts() == other
+    def __repr__(self):
+        state = "geladen" if self._texts is not None else "ungeladen"
+        return f"LazyTexts({len(self)} Texte, {state})"
+    def copy(self):
+        if self._texts is not None:
+            return self._texts.copy()
+        # _stored wird nie verändert (Schreiben lädt zuerst), Kopien dürfen es teilen
+        clone = LazyTexts((), self._wrap)
+        clone._stored = self._stored
+        return clone
+    __copy__ = copy
+    def __deepcopy__(self, memo):
+        return self.copy()
+    def to_stored(self):
+        return list(self._stored) if self._texts is None else _stored_items(self._texts)
+
+class TextPool:
+    """
+    Interniert Snippet-Texte nach Inhalts-Hash: gleiche Texte in mehreren
+    Profilen teilen sich ein Objekt. Strings sind unveränderlich, eine
+    Bearbeitung ersetzt also nur den Eintrag des bearbeiteten Profils
+    (Copy-on-Write). Abgeleitete Daten (Plaintext, Clipboard-Bytes, ...)
+    werden pro Hash nur einmal berechnet.
+    """
+    def __init__(self):
+        self._texts = {}
+        self._blobs = {}
+        self._derived = {}
+    @staticmethod
+    def digest(text):
+        return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+    def intern(self, text):
+        text = text or ""
+        return self._texts.setdefault(self.digest(text), text)
+    def intern_blob(self, blob):
+        return self._blobs.setdefault(blob, blob)
+    def derived(self, text, kind, compute):
+        key = (self.digest(text), kind)
+        try:
+            return self._derived[key]
+        except KeyError:
+            value = self._derived[key] = compute(text)
+            return value
+    def prune(self, live_texts):
+        """Verwirft Texte/abgeleitete Daten, die in keinem Profil mehr vorkommen."""
+        live = {self.digest(t) for t in live_texts}
+        self._texts = {d: t for d, t in self._texts.items() if d in live}
+        self._derived = {k: v for k, v in self._derived.items() if k[0] in live}
+    def prune_blobs(self, live_blobs):
+        live = set(live_blobs)
+        self._blobs = {b: b for b in self._blobs if b in live}
+    def stats(self):
+        return {"texts": len(self._texts), "blobs": len(self._blobs), "derived": len(self._derived)}
+
+def wrap_texts(items, codec=None, pool=None):
+    """Texte eines Profils in die Speicherform bringen (komprimiert oder Klartext)."""
+    if isinstance(items, LazyTexts):
+        items = items.texts()
+    if codec is not None:
+        if isinstance(items, CompressedTexts) and items.codec is codec:
+            texts = items
+        else:
+            texts = CompressedTexts.from_stored(codec, items)
+        return texts.intern_into(pool) if pool is not None else texts
+    texts = [decode_text(item) for item in items or []]
+    if pool is not None:
+        texts = [pool.intern(t) for t in texts]
+    return texts
+
+def _stored_items(texts):
+    if isinstance(texts, (CompressedTexts, LazyTexts)):
+        return texts.to_stored()
+    return list(texts or [])
+
+def migrate_config(loaded):
+    """Einmalige Migration älterer config.json-Stände; True wenn etwas geändert wurde."""
+    version = loaded.get("version", 1)
+    if not isinstance(version, int) or version >= CONFIG_VERSION:
+        return False
+    before = after = 0
+    for vals in loaded["profiles"].values():
+        texts = vals.get("texts", [])
+        before += sum(len(t or "") for t in texts)
+        vals["texts"] = [minify_html(t) for t in texts]
+        after += sum(len(t) for t in vals["texts"])
+    loaded["version"] = CONFIG_VERSION
+    logging.info(f"config.json auf Version {CONFIG_VERSION} migriert (Snippet-HTML {before} → {after} Zeichen)")
+    return True
+
+def normalize_config(loaded):
+    """Ergänzt fehlende Listen, löst Text-Blobs auf und migriert; True wenn migriert wurde."""
+    if not isinstance(loaded.get("profiles"), dict):
+        loaded["profiles"] = {}
+    for prof, vals in loaded["profiles"].items():
+        vals.setdefault("titles", [])
+        vals.setdefault("texts",  [])
+        vals.setdefault("hotkeys", [])
+    unpack_shared_texts(loaded["profiles"], loaded.pop("blobs", None))
+    return migrate_config(loaded)
+
+def validate_config(loaded):
+    """Strenge Prüfung für extern geänderte Dateien; wirft ValueError."""
+    if not isinstance(loaded, dict) or not isinstance(loaded.get("profiles"), dict):
+        raise ValueError("'profiles' fehlt oder ist kein Objekt")
+    for prof, vals in loaded["profiles"].items():
+        if prof == "SDE":
+            raise ValueError("Profilname 'SDE' ist reserviert")
+        if not isinstance(vals, dict):
+            raise ValueError(f"Profil '{prof}' ist kein Objekt")
+        lengths = set()
+        for key in ("titles", "texts", "hotkeys"):
+            items = vals.get(key, [])
+            if not isinstance(items, list) or not all(isinstance(x, str) for x in items):
+                raise ValueError(f"Profil '{prof}': '{key}' ist keine Textliste")
+            lengths.add(len(items))
+        if len(lengths) > 1:
+            raise ValueError(f"Profil '{prof}': titles/texts/hotkeys unterschiedlich lang")
+        if not isinstance(vals.get("macros", []), list):
+            raise ValueError(f"Profil '{prof}': 'macros' ist keine Liste")
+        if not isinstance(vals.get("abbreviations", {}), dict):
+            raise ValueError(f"Profil '{prof}': 'abbreviations' ist kein Objekt")
+
+def config_for_save(data, recent_profiles=()):
+    """
+    Inhalt für config.json: Profile ohne SDE (das kommt aus sde.json bzw. dem
+    Pack und ist dort ggf. nicht serialisierbar), aktives Profil, Recent-Liste.
+    """
+    return {
+        "profiles": {k: v.copy() for k, v in data.get("profiles", {}).items() if k != "SDE"},
+        "active_profile": data.get("active_profile"),
+        "recent_profiles": list(recent_profiles)}
+
+def pack_shared_texts(profiles, min_length=64):
+    """
+    Bereitet Profile für config.json vor: Texte, die mehrfach vorkommen
+    (und nicht winzig sind), landen genau einmal in 'blobs' und werden in den
+    Profilen per '\x01b:<hash>' referenziert. Liefert (profiles, blobs).
+    """
+    stored = {name: _stored_items(vals.get("texts", [])) for name, vals in profiles.items()}
+    counts = {}
+    for items in stored.values():
+        for item in items:
+            if len(item) >= min_length:
+                counts[item] = counts.get(item, 0) + 1
+    refs = {}
+    blobs = {}
+    for item, count in counts.items():
+        if count > 1:
+            digest = TextPool.digest(item)
+            refs[item] = BLOB_REF_PREFIX + digest
+            blobs[digest] = item
+    packed = {}
+    for name, vals in profiles.items():
+        out = dict(vals)
+        out["texts"] = [refs.get(item, item) for item in stored[name]]
+        packed[name] = out
+    return packed, blobs
+
+def unpack_shared_texts(profiles, blobs):
+    """Löst '\x01b:<hash>'-Referenzen wieder auf (in place)."""
+    blobs = blobs if isinstance(blobs, dict) else {}
+    for name, vals in profiles.items():
+        texts = vals.get("texts", [])
+        for pos, item in enumerate(texts):
+            if isinstance(item, str) and item.startswith(BLOB_REF_PREFIX):
+                digest = item[len(BLOB_REF_PREFIX):]
+                if digest not in blobs:
+                    logging.warning(f"⚠ Profil '{name}': Text-Blob {digest} fehlt, Eintrag {pos+1} bleibt leer.")
+                texts[pos] = blobs.get(digest, "")
+    return profiles
+
+def json_default(obj):
+    """default= für json.dump: CompressedTexts/LazyTexts als Token-Liste schreiben."""
+    if isinstance(obj, (CompressedTexts, LazyTexts)):
+        return obj.to_stored()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+SDE_PACK_MAGIC = b"QPSDE\x00\x02\x00"
+SDE_FIELDS = ("titles", "texts", "hotkeys")
+# Magic, Quell-Hash (sha256 von sde.json), Anzahl, reserviert, sha256 von Slots+Stringtabelle
+_PACK_HEADER = struct.Struct("<8s32sII32s")
+_PACK_SLOT = struct.Struct("<II")
+SDE_PACK_MAX_AGE_DAYS = 14
+
+# Eigentümer, denen ein Pack aus einem geteilten Verzeichnis geglaubt wird (neben dem eigenen Konto)
+_TRUSTED_OWNER_SIDS = ("S-1-5-32-544", "S-1-5-18",
+    "S-1-5-80-956008885-3418522649-1831038044-1853292631-2271478464")
+
+def default_sde_pack_dir():
+    """Maschinenweites, von Administratoren befülltes Pack-Verzeichnis (compile-sde)."""
+    return os.path.join(os.environ.get("ProgramData") or tempfile.gettempdir(), "QuickPaste", "sde-packs")
+
+def trusted_owner(path):
+    """True, wenn die Datei dem eigenen Konto oder Administratoren/SYSTEM gehört."""
+    if sys.platform != "win32":
+        return os.stat(path).st_uid in (0, os.getuid())
+    import win32api, win32security, ntsecuritycon
+    owner = win32security.GetFileSecurity(path, win32security.OWNER_SECURITY_INFORMATION).GetSecurityDescriptorOwner()
+    token = win32security.OpenProcessToken(win32api.GetCurrentProcess(), ntsecuritycon.TOKEN_QUERY)
+    own_sid = win32security.GetTokenInformation(token, win32security.TokenUser)[0]
+    return owner == own_sid or win32security.ConvertSidToStringSid(owner) in _TRUSTED_OWNER_SIDS
+
+def sde_source_digest(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+def sde_pack_path(pack_dir, digest):
+    """Pfad des Packs zu einem Quell-Hash; neue Stände bekommen eine neue Datei,
+    damit gemappte alte Packs anderer Sitzungen nie überschrieben werden."""
+    return os.path.join(pack_dir, f"sde-{digest[:16]}.pack")
+
+def compile_sde_pack(sde, digest, path):
+    """
+    Schreibt das SDE-Profil als Binär-Pack: Header, Offset-Tabelle
+    (titles/texts/hotkeys je Eintrag) und eine UTF-8-Stringtabelle.
+    """
+    count = len(sde.get("titles", []))
+    columns = [list(sde.get(field, [])) for field in SDE_FIELDS]
+    table = bytearray()
+    slots = []
+    for i in range(count):
+        for column in columns:
+            raw = (column[i] if i < len(column) else "").encode("utf-8")
+            slots.append(_PACK_SLOT.pack(len(table), len(raw)))
+            table += raw
+    payload = b"".join(slots) + table
+    header = _PACK_HEADER.pack(SDE_PACK_MAGIC, bytes.fromhex(digest), count, 0, hashlib.sha256(payload).digest())
+    dirpath = os.path.dirname(path) or "."
+    os.makedirs(dirpath, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dirpath, prefix=".tmp_", suffix=".pack")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp, path)
+    except Exception:
+        try: os.unlink(tmp)
+        except Exception: pass
+        raise
+
+def remove_stale_sde_packs(pack_dir, keep_path, max_age_days=SDE_PACK_MAX_AGE_DAYS, now=None):
+    """
+    Löscht Packs, die seit max_age_days niemand mehr geöffnet hat (open_sde_pack
+    frischt die mtime auf). Sitzungen mit anderem sde.json-Stand teilen sich das
+    Verzeichnis, ihre Packs bleiben so erhalten; gemappte Dateien lässt Windows
+    ohnehin nicht löschen.
+    """
+    try:
+        names = os.listdir(pack_dir)
+    except OSError:
+        return
+    cutoff = (time.time() if now is None else now) - max_age_days * 86400
+    for name in names:
+        path = os.path.join(pack_dir, name)
+        if not (name.startswith("sde-") and name.endswith(".pack")) or os.path.abspath(path) == os.path.abspath(keep_path):
+            continue
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.unlink(path)
+        except OSError:
+            pass
+
+class SdePack:
+    """
+    Read-only, per mmap eingeblendetes SDE-Pack (Seiten teilt der OS-Page-Cache).
+    Beim Öffnen werden Prüfsumme und alle Slots gegen die Dateigrösse geprüft,
+    damit ein kaputtes Pack hier scheitert und nicht erst beim Zugriff in der UI.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._check(path)
+        except Exception:
+            self._mm.close()
+            raise
+        self.path = path
+    def _check(self, path):
+        if len(self._mm) < _PACK_HEADER.size:
+            raise ValueError(f"Kein SDE-Pack: {path}")
+        magic, digest, count, _, checksum = _PACK_HEADER.unpack_from(self._mm, 0)
+        if magic != SDE_PACK_MAGIC:
+            raise ValueError(f"Kein SDE-Pack: {path}")
+        self.digest = digest.hex()
+        self.count = count
+        self._slots_at = _PACK_HEADER.size
+        self._table_at = self._slots_at + count * len(SDE_FIELDS) * _PACK_SLOT.size
+        if self._table_at > len(self._mm):
+            raise ValueError(f"SDE-Pack abgeschnitten: {path}")
+        table_size = len(self._mm) - self._table_at
+        with memoryview(self._mm) as view, view[self._slots_at:] as payload:
+            if hashlib.sha256(payload).digest() != checksum:
+                raise ValueError(f"SDE-Pack-Prüfsumme falsch: {path}")
+        slots = _PACK_SLOT.iter_unpack(self._mm[self._slots_at:self._table_at])
+        if any(offset + length > table_size for offset, length in slots):
+            raise ValueError(f"SDE-Pack: Eintrag ausserhalb der Stringtabelle: {path}")
+    def string(self, index, field):
+        slot = self._slots_at + (index * len(SDE_FIELDS) + field) * _PACK_SLOT.size
+        offset, length = _PACK_SLOT.unpack_from(self._mm, slot)
+        start = self._table_at + offset
+        return self._mm[start:start + length].decode("utf-8")
+    def as_profile(self):
+        return {field: PackedStrings(self, pos) for pos, field in enumerate(SDE_FIELDS)}
+
+class PackedStrings(Sequence):
+    """Unveränderliche Spalte eines SDE-Packs; dekodiert Einträge erst beim Zugriff."""
+    __slots__ = ("_pack", "_field")
+    def __init__(self, pack, field):
+        self._pack = pack
+        self._field = field
+    def __len__(self):
+        return self._pack.count
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PackedStrings index out of range")
+        return self._pack.string(index, self._field)
+    def __eq__(self, other):
+        if isinstance(other, (list, PackedStrings)):
+            return list(self) == list(other)
+        return NotImplemented
+    def __copy__(self):
+        return self
+    def __deepcopy__(self, memo):
+        return self
+    def __repr__(self):
+        return f"PackedStrings({len(self)} Einträge, {os.path.basename(self._pack.path)})"
+
+def content_refs(items):
+    """
+    Vergleichsschlüssel für eine Profil-Spalte (titles/texts/hotkeys): bleibt
+    gleich, solange sich der Inhalt nicht ändert, ohne Texte zu entpacken.
+    """
+    if isinstance(items, LazyTexts):
+        items = items.texts()
+    if isinstance(items, CompressedTexts):
+        return tuple(items._blobs)
+    if isinstance(items, PackedStrings):
+        return (items._pack, items._field)
+    return tuple(items)
+
+def open_sde_pack(path, digest):
+    """
+    Pack öffnen, wenn vorhanden, zum Quell-Hash passend, unversehrt und von
+    einem vertrauenswürdigen Konto angelegt (trusted_owner); sonst None.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        if not trusted_owner(path):
+            logging.warning(f"⚠ SDE-Pack ignoriert, fremder Eigentümer: {path}")
+            return None
+        pack = SdePack(path)
+    except (OSError, ValueError, struct.error) as e:
+        logging.warning(f"⚠ SDE-Pack unbrauchbar ({path}): {e}")
+        return None
+    if pack.digest != digest:
+        return None
+    try:
+        # mtime = zuletzt benutzt, schützt vor remove_stale_sde_packs
+        os.utime(path)
+    except OSError:
+        pass
+    return pack
+
+def _compile_cli(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="sde.json in ein SDE-Pack übersetzen")
+    parser.add_argument("source", help="Pfad zu sde.json")
+    parser.add_argument("--out-dir", default=None,
+        help=f"Zielverzeichnis (Standard: {default_sde_pack_dir()}, dort liest QuickPaste; als Administrator ausführen)")
+    args = parser.parse_args(argv)
+    with open(args.source, "rb") as f:
+        raw = f.read()
+    sde = json.loads(raw.decode("utf-8"))
+    sde["texts"] = [minify_html(t) for t in sde.get("texts", [])]
+    digest = sde_source_digest(raw)
+    out_dir = args.out_dir or default_sde_pack_dir()
+    path = sde_pack_path(out_dir, digest)
+    compile_sde_pack(sde, digest, path)
+    remove_stale_sde_packs(out_dir, path)
+    print(path)
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["compile-sde"]:
+        _compile_cli(sys.argv[2:])
+    else:
+        print("Verwendung: python qp_store.py compile-sde <sde.json> [--out-dir DIR]")
+        sys.exit(2)
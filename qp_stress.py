@@ -0,0 +1,321 @@
+"""
+Stresstest der echten QuickPaste-Oberfläche ohne Bildschirm (QT_QPA_PLATFORM=offscreen).
+
+Erzeugt eine synthetische Bibliothek in einem Temp-Verzeichnis (als APPDATA),
+ersetzt Zwischenablage, Hotkeys und Tastatureingaben durch Attrappen, lädt
+QuickPaste.py und spielt Aktionen ab: Profilwechsel, Bearbeitungsmodus,
+Mini- und Dark-Mode, Verschieben von Einträgen und Fenstergrössen.
+
+    python qp_stress.py --profiles 10 --snippets 300 --rounds 5
+    python qp_stress.py --profiles 4 --snippets 2000 --size 4000 --out stress.jsonl
+
+Ausgabe ist JSON: Zeit pro Aktion, Verzögerung der Ereignisschleife während
+der Aktion, lebende QObjects und RSS pro Runde, QObject-Zuwachs je Klasse und
+stetig wachsende Klassen (qp_diag.LeakTracker) sowie RSS vor/nach dem
+Abbau im Speichersparmodus samt Aufbauzeit danach. Mit --out wird eine Zeile an
+die Datei angehängt, damit sich Läufe über die Zeit vergleichen lassen.
+"""
+import sys, os, json, time, types, ctypes, random, argparse, tempfile, shutil, importlib, datetime
+import qp_bench
+import qp_diag
+
+ACTIONS = ("switch_profile", "toggle_edit_mode", "drag_move", "toggle_mini_mode", "toggle_dark_mode", "resize")
+_WINDOW_SIZES = ((420, 300), (900, 700), (520, 1000), (1400, 900))
+
+#region fake backends
+
+class _FakeFunction:
+    """WinAPI-Funktion, die nichts tut; restype/argtypes dürfen gesetzt werden."""
+    _RESULTS = {"RegisterHotKey": 1, "UnregisterHotKey": 1, "CreateMutexW": 1}
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+        self.restype = self.argtypes = None
+    def __call__(self, *args):
+        self.calls[self.name] = self.calls.get(self.name, 0) + 1
+        if self.name == "SendInput":
+            return args[0]
+        return self._RESULTS.get(self.name, 0)
+
+class _FakeDll:
+    def __init__(self, calls):
+        self._calls = calls
+        self._functions = {}
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in self._functions:
+            self._functions[name] = _FakeFunction(name, self._calls)
+        return self._functions[name]
+
+class _FakeWinDll:
+    def __init__(self, calls):
+        self._dlls = {}
+        self._calls = calls
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._dlls.setdefault(name, _FakeDll(self._calls))
+
+def _fake_clipboard_modules(clipboard):
+    """win32clipboard/win32con/pyperclip auf ein dict im Speicher umgelenkt."""
+    win32clipboard = types.ModuleType("win32clipboard")
+    formats = {"HTML Format": 49300}
+    win32clipboard.OpenClipboard = lambda *a: None
+    win32clipboard.CloseClipboard = lambda: None
+    win32clipboard.EmptyClipboard = clipboard.clear
+    win32clipboard.SetClipboardText = lambda text, fmt=13: clipboard.__setitem__(fmt, text)
+    win32clipboard.SetClipboardData = lambda fmt, data: clipboard.__setitem__(fmt, data)
+    win32clipboard.GetClipboardData = lambda fmt=13: clipboard.get(fmt, "")
+    win32clipboard.IsClipboardFormatAvailable = lambda fmt: fmt in clipboard
+    win32clipboard.RegisterClipboardFormat = lambda name: formats.setdefault(name, 49300 + len(formats))
+    win32con = types.ModuleType("win32con")
+    win32con.CF_TEXT, win32con.CF_UNICODETEXT = 1, 13
+    pyperclip = types.ModuleType("pyperclip")
+    pyperclip.copy = lambda text: clipboard.__setitem__(13, text)
+    pyperclip.paste = lambda: clipboard.get(13, "")
+    return {"win32clipboard": win32clipboard, "win32con": win32con, "pyperclip": pyperclip}
+
+def install_fakes(clipboard, calls):
+    """
+    Muss vor dem Import von QuickPaste laufen. Ersetzt auch unter Windows
+    ctypes.windll, damit der Test keine echten Hotkeys registriert und keine
+    Tasten an andere Fenster schickt.
+    """
+    sys.modules.update(_fake_clipboard_modules(clipboard))
+    ctypes.windll = _FakeWinDll(calls)
+    if "sip" not in sys.modules:
+        try:
+            import sip
+        except ImportError:
+            from PyQt5 import sip
+            sys.modules["sip"] = sip
+
+#endregion
+
+#region measurement
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class LoopProbe:
+    """
+    Misst, wie spät ein 5-ms-Timer feuert. Blockiert eine Aktion den GUI-Thread,
+    erscheint ihre Dauer hier als Verspätung.
+    """
+    def __init__(self, QtCore, interval_ms=5):
+        self.interval = interval_ms / 1000
+        self.lags = []
+        self.last = time.perf_counter()
+        self.timer = QtCore.QTimer()
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self.timer.start(interval_ms)
+    def _tick(self):
+        now = time.perf_counter()
+        self.lags.append(max(0.0, now - self.last - self.interval) * 1000)
+        self.last = now
+    def take(self):
+        lags, self.lags = self.lags, []
+        return lags
+
+class ModalWatchdog:
+    """Schliesst Dialoge (z. B. 'Ungespeicherte Änderungen'), die den Lauf sonst anhalten würden."""
+    def __init__(self, QtCore, QtWidgets, app):
+        self.QtWidgets = QtWidgets
+        self.app = app
+        self.closed = []
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self._check)
+        self.timer.start(50)
+    def _check(self):
+        widget = self.app.activeModalWidget()
+        if widget is None:
+            return
+        self.closed.append(widget.windowTitle())
+        if isinstance(widget, self.QtWidgets.QMessageBox):
+            button = widget.button(self.QtWidgets.QMessageBox.No) or widget.button(self.QtWidgets.QMessageBox.Ok)
+            if button is not None:
+                button.click()
+                return
+        if isinstance(widget, self.QtWidgets.QDialog):
+            widget.reject()
+        else:
+            widget.close()
+
+#endregion
+
+class StressRun:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.clipboard = {}
+        self.api_calls = {}
+        self.timings = {name: [] for name in ACTIONS}
+        self.action_lags = {name: [] for name in ACTIONS}
+        self.rounds = []
+    def prepare(self, appdata):
+        """Synthetische Bibliothek und Einstellungen in appdata/QuickPaste anlegen."""
+        folder = os.path.join(appdata, "QuickPaste")
+        os.makedirs(folder, exist_ok=True)
+        args = self.args
+        data = qp_bench.synthetic_config(args.profiles * args.snippets, args.profiles, args.size, seed=args.seed)
+        for vals in data["profiles"].values():
+            vals["hotkeys"][:10] = [f"ctrl+shift+{n}" for n in range(min(10, len(vals["hotkeys"])))]
+        with open(os.path.join(folder, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        with open(os.path.join(folder, "settings.json"), "w", encoding="utf-8") as f:
+            # Speichersparmodus aktiv, aber erst am Ende von Hand ausgelöst (measure_low_memory)
+            json.dump({"abbreviations_enabled": False, "sde_pack": False, "low_memory_after_s": 86400}, f)
+        os.environ["APPDATA"] = appdata
+        os.environ["TMPDIR"] = appdata
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    def settle(self):
+        loop = self.QtCore.QEventLoop()
+        self.QtCore.QTimer.singleShot(self.args.settle_ms, loop.quit)
+        loop.exec_()
+    def measure(self, name, func, *args):
+        self.probe.take()
+        t0 = time.perf_counter()
+        func(*args)
+        self.timings[name].append((time.perf_counter() - t0) * 1000)
+        self.settle()
+        self.action_lags[name].append(max(self.probe.take(), default=0.0))
+    def sample(self, label):
+        # versteckte Seiten des Profilansichts-Caches sind gewollt (und begrenzt), zählen also nicht als Zuwachs
+        self.qp.view_prebuild_timer.stop()
+        self.qp.profile_views.clear(keep_current=True)
+        self.app.processEvents()
+        # deleteLater() greift erst in der Ereignisschleife
+        self.app.sendPostedEvents(None, self.QtCore.QEvent.DeferredDelete)
+        counts = self.qp.count_qobjects()
+        self.tracker.sample(counts)
+        self.rounds.append({
+            "round": label,
+            "qobjects": sum(counts.values()),
+            "widgets": len(self.app.allWidgets()),
+            "rss_mb": round(qp_diag.rss_bytes() / 1048576, 1)})
+    def _drag_moves(self):
+        count = len(self.qp.editable_profile()["titles"])
+        if count < 2:
+            return
+        for _ in range(self.args.moves):
+            old, new = self.rng.sample(range(count), 2)
+            self.measure("drag_move", self.qp.move_entry_to, old, new)
+            # zurückschieben, damit beim Verlassen des Bearbeitungsmodus nichts zu speichern ist
+            self.measure("drag_move", self.qp.move_entry_to, new, old)
+    def run_round(self):
+        qp = self.qp
+        names = [name for name in qp.app_state.data["profiles"] if name != "SDE"]
+        for name in self.rng.sample(names, min(len(names), self.args.switches)):
+            self.measure("switch_profile", qp.switch_profile, name)
+        self.measure("toggle_edit_mode", qp.toggle_edit_mode)
+        if qp.app_state.edit_mode:
+            self._drag_moves()
+            self.measure("toggle_edit_mode", qp.toggle_edit_mode)
+        for _ in range(2):
+            self.measure("toggle_mini_mode", qp.toggle_mini_mode)
+        self.measure("toggle_dark_mode", qp.toggle_dark_mode)
+        for width, height in _WINDOW_SIZES:
+            self.measure("resize", qp.win.resize, width, height)
+    def run(self):
+        args = self.args
+        appdata = tempfile.mkdtemp(prefix="qp_stress_")
+        try:
+            self.prepare(appdata)
+            install_fakes(self.clipboard, self.api_calls)
+            from PyQt5 import QtCore, QtWidgets
+            self.QtCore = QtCore
+            self.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+            t0 = time.perf_counter()
+            self.qp = importlib.import_module("QuickPaste")
+            startup_ms = (time.perf_counter() - t0) * 1000
+            self.probe = LoopProbe(QtCore)
+            self.tracker = qp_diag.LeakTracker(window=args.rounds + 1, min_growth=args.leak_min_growth)
+            watchdog = ModalWatchdog(QtCore, QtWidgets, self.app)
+            self.settle()
+            self.sample("start")
+            for n in range(args.rounds):
+                self.run_round()
+                self.sample(n + 1)
+            low_memory = self.measure_low_memory()
+            return {**self.report(startup_ms, watchdog.closed), "low_memory": low_memory}
+        finally:
+            if not args.keep:
+                shutil.rmtree(appdata, ignore_errors=True)
+    def measure_low_memory(self):
+        """Fenster verstecken, Oberfläche abbauen (RSS vorher/nachher), wieder anzeigen (Aufbauzeit)."""
+        qp = self.qp
+        qp.win.hide()
+        self.settle()
+        widgets_before = len(self.app.allWidgets())
+        qp.low_memory.release()
+        widgets_after = len(self.app.allWidgets())
+        qp.show_main_window()
+        self.settle()
+        stats = qp.low_memory.snapshot()
+        return {
+            "rss_before_mb": stats["lowmem_rss_before_mb"],
+            "rss_after_mb": stats["lowmem_rss_after_mb"],
+            "widgets_before": widgets_before,
+            "widgets_after": widgets_after,
+            "rebuild_ms": stats["lowmem_rebuild_ms"]}
+    def report(self, startup_ms, dialogs):
+        actions = {}
+        for name in ACTIONS:
+            times, lags = self.timings[name], self.action_lags[name]
+            if not times:
+                continue
+            actions[name] = {
+                "count": len(times),
+                "mean_ms": round(sum(times) / len(times), 2),
+                "p95_ms": round(_percentile(times, 0.95), 2),
+                "max_ms": round(max(times), 2),
+                "loop_lag_max_ms": round(max(lags), 2)}
+        first, last = self.rounds[0], self.rounds[-1]
+        return {
+            "benchmark": "stress",
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "profiles": self.args.profiles,
+            "snippets_per_profile": self.args.snippets,
+            "size": self.args.size,
+            "rounds": self.args.rounds,
+            "startup_ms": round(startup_ms, 1),
+            "actions": actions,
+            "qobjects_growth": last["qobjects"] - first["qobjects"],
+            "rss_growth_mb": round(last["rss_mb"] - first["rss_mb"], 1),
+            "qobjects_growth_by_class": {cls: b - a for cls, a, b in self.tracker.growth(10)},
+            "leak_suspects": [cls for cls, _, _ in self.tracker.suspects()],
+            "samples": self.rounds,
+            "dialogs_closed": dialogs,
+            "hotkeys_registered": self.api_calls.get("RegisterHotKey", 0)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QuickPaste UI-Stresstest (offscreen)")
+    parser.add_argument("--profiles", type=int, default=10)
+    parser.add_argument("--snippets", type=int, default=200, help="Snippets pro Profil")
+    parser.add_argument("--size", type=int, default=1500, help="mittlere HTML-Grösse pro Snippet (Zeichen)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--switches", type=int, default=4, help="Profilwechsel pro Runde")
+    parser.add_argument("--moves", type=int, default=3, help="Verschiebungen (hin und zurück) pro Runde")
+    parser.add_argument("--settle-ms", type=int, default=30, help="Ereignisschleife nach jeder Aktion so lange laufen lassen")
+    parser.add_argument("--leak-min-growth", type=int, default=20,
+                        help="Klassen, deren Anzahl in jeder Runde wächst und insgesamt um so viel zunimmt, gelten als Leck")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Ergebnis als eine JSON-Zeile an diese Datei anhängen")
+    parser.add_argument("--keep", action="store_true", help="Temp-Verzeichnis nicht löschen")
+    args = parser.parse_args(argv)
+    result = StressRun(args).run()
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    sys.stdout.flush()
+    # QuickPaste hängt Speichern an aboutToQuit; der Test beendet ohne Qt-Abbau
+    os._exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Abgleich mit einer zentralen Snippet-Bibliothek (HTTP oder Dateifreigabe).
+
+Layout der Bibliothek (von 'publish' erzeugt):
+    index.json           {"version": n, "snippets": {id: {profile, title, hotkey, hash}}}
+    snippets/<id>.html   Text des Snippets
+
+Clients laden index.json nur bei geänderter ETag (HTTP 304 bzw. gleiche
+mtime/Grösse auf der Freigabe) und danach nur die Snippets, deren Hash sich
+gegenüber dem zuletzt synchronisierten Stand geändert hat.
+
+    python qp_sync.py publish library.json <ausgabe-verzeichnis>
+    python qp_sync.py serve <ausgabe-verzeichnis> --port 8765
+"""
+import os, sys, json, hashlib, logging, tempfile, argparse, re
+import urllib.request, urllib.error, urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+def text_digest(text):
+    """Gleicher Hash wie qp_store.TextPool.digest."""
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+
+class SyncError(Exception):
+    pass
+
+#region sources
+
+class HttpSource:
+    def __init__(self, url, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+    def fetch_index(self, etag=None):
+        """(index, etag) oder (None, etag) wenn unverändert."""
+        req = urllib.request.Request(f"{self.url}/index.json")
+        if etag:
+            req.add_header("If-None-Match", etag)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8")), resp.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, etag
+            raise SyncError(f"index.json: HTTP {e.code}") from e
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise SyncError(f"index.json nicht erreichbar: {e}") from e
+    def fetch_snippets(self, ids, batch_size=200):
+        bodies = {}
+        ids = list(ids)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            query = urllib.parse.urlencode({"ids": ",".join(chunk)})
+            try:
+                with urllib.request.urlopen(f"{self.url}/snippets?{query}", timeout=self.timeout) as resp:
+                    bodies.update(json.loads(resp.read().decode("utf-8")))
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                raise SyncError(f"Snippets nicht abrufbar: {e}") from e
+        return bodies
+
+class FileSource:
+    def __init__(self, directory):
+        self.directory = directory
+    def fetch_index(self, etag=None):
+        path = os.path.join(self.directory, "index.json")
+        try:
+            st = os.stat(path)
+            current = f"{st.st_mtime_ns}-{st.st_size}"
+            if current == etag:
+                return None, etag
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f), current
+        except (OSError, ValueError) as e:
+            raise SyncError(f"index.json nicht lesbar: {e}") from e
+    def fetch_snippets(self, ids):
+        bodies = {}
+        for snippet_id in ids:
+            if not _ID_RE.match(snippet_id):
+                raise SyncError(f"Ungültige Snippet-ID: {snippet_id!r}")
+            try:
+                with open(os.path.join(self.directory, "snippets", f"{snippet_id}.html"), "r", encoding="utf-8") as f:
+                    bodies[snippet_id] = f.read()
+            except OSError as e:
+                raise SyncError(f"Snippet {snippet_id} nicht lesbar: {e}") from e
+        return bodies
+
+def make_source(location):
+    if location.startswith(("http://", "https://")):
+        return HttpSource(location)
+    return FileSource(location)
+
+#endregion
+
+#region state / fetch / merge
+
+def load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if isinstance(state, dict) and isinstance(state.get("entries"), dict):
+            return state
+    except (FileNotFoundError, ValueError):
+        pass
+    return {"etag": None, "version": None, "entries": {}}
+
+def save_state(state, path):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except Exception:
+        try: os.unlink(tmp)
+        except Exception: pass
+        raise
+
+def validate_index(index):
+    if not isinstance(index, dict) or not isinstance(index.get("snippets"), dict):
+        raise SyncError("index.json: 'snippets' fehlt")
+    for snippet_id, meta in index["snippets"].items():
+        if not _ID_RE.match(snippet_id) or not isinstance(meta, dict):
+            raise SyncError(f"index.json: ungültiger Eintrag {snippet_id!r}")
+        for key in ("profile", "title", "hash"):
+            if not isinstance(meta.get(key), str) or not meta[key]:
+                raise SyncError(f"index.json: {snippet_id} ohne '{key}'")
+        if meta["profile"] == "SDE":
+            raise SyncError("index.json: Profil 'SDE' ist reserviert")
+
+def fetch_updates(source, state):
+    """
+    Netzwerkteil (Worker-Thread): liefert None wenn nichts zu tun ist,
+    sonst {"index", "etag", "bodies"} mit nur den geänderten Snippet-Texten.
+    """
+    index, etag = source.fetch_index(state.get("etag"))
+    if index is None:
+        return None
+    validate_index(index)
+    if index.get("version") is not None and index.get("version") == state.get("version"):
+        return {"index": index, "etag": etag, "bodies": {}}
+    entries = state.get("entries", {})
+    wanted = [sid for sid, meta in index["snippets"].items()
+              if entries.get(sid, {}).get("hash") != meta["hash"]]
+    bodies = source.fetch_snippets(wanted) if wanted else {}
+    for sid in wanted:
+        if sid not in bodies:
+            raise SyncError(f"Snippet {sid} fehlt in der Antwort")
+        if text_digest(bodies[sid]) != index["snippets"][sid]["hash"]:
+            raise SyncError(f"Snippet {sid}: Hash stimmt nicht mit index.json überein")
+    return {"index": index, "etag": etag, "bodies": bodies}
+
+def _find_entry(profile, title):
+    lowered = (title or "").strip().lower()
+    for pos, existing in enumerate(profile.get("titles", [])):
+        if (existing or "").strip().lower() == lowered:
+            return pos
+    return None
+
+def _free_hotkey(profile, hotkey, skip=None):
+    hotkey = (hotkey or "").strip().lower()
+    if not hotkey:
+        return ""
+    used = {(h or "").strip().lower() for pos, h in enumerate(profile.get("hotkeys", [])) if pos != skip}
+    return "" if hotkey in used else hotkey
+
+def merge_updates(profiles, state, update, new_profile=None):
+    """
+    Dreiwege-Abgleich pro Eintrag (GUI-Thread, nur Speicher). Basis ist der
+    zuletzt synchronisierte Hash in state['entries']:
+      - nur entfernt geändert  -> übernehmen
+      - nur lokal geändert     -> lokal behalten
+      - beides geändert        -> lokal behalten, als Konflikt melden
+      - ohne Basis, lokal gleichnamiger Eintrag mit anderem Text
+                               -> lokal behalten, als Konflikt melden
+      - entfernt gelöscht      -> lokal löschen, wenn lokal unverändert
+    Liefert {"changed_profiles": set, "conflicts": [...], "applied": n}.
+    """
+    index = update["index"]
+    bodies = update["bodies"]
+    entries = state.setdefault("entries", {})
+    changed, conflicts, applied = set(), [], 0
+    def make_profile(name):
+        profiles[name] = new_profile() if new_profile else {"titles": [], "texts": [], "hotkeys": []}
+        return profiles[name]
+    for sid, meta in index["snippets"].items():
+        base = entries.get(sid)
+        if base is not None and base.get("hash") == meta["hash"]:
+            continue
+        profile = profiles.get(meta["profile"]) or make_profile(meta["profile"])
+        pos = None
+        if base is not None and base.get("profile") == meta["profile"]:
+            pos = _find_entry(profile, base.get("title"))
+        if pos is None:
+            pos = _find_entry(profile, meta["title"])
+        if pos is not None:
+            local_hash = text_digest(profile["texts"][pos])
+            if base is None and local_hash == meta["hash"]:
+                # gleicher Text schon lokal vorhanden: nur als synchronisiert merken
+                entries[sid] = {"hash": meta["hash"], "profile": meta["profile"], "title": profile["titles"][pos]}
+                continue
+            if local_hash != meta["hash"] and (base is None or local_hash != base.get("hash")):
+                conflicts.append({"id": sid, "profile": meta["profile"], "title": profile["titles"][pos]})
+                entries[sid] = {"hash": meta["hash"], "profile": meta["profile"], "title": profile["titles"][pos]}
+                continue
+        text = bodies[sid]
+        if pos is None:
+            profile["titles"].append(meta["title"])
+            profile["texts"].append(text)
+            profile["hotkeys"].append(_free_hotkey(profile, meta.get("hotkey")))
+        else:
+            profile["texts"][pos] = text
+            if meta["title"] != profile["titles"][pos] and _find_entry(profile, meta["title"]) is None:
+                profile["titles"][pos] = meta["title"]
+            if meta.get("hotkey") is not None:
+                profile["hotkeys"][pos] = _free_hotkey(profile, meta.get("hotkey"), skip=pos)
+        entries[sid] = {"hash": meta["hash"], "profile": meta["profile"], "title": meta["title"]}
+        changed.add(meta["profile"])
+        applied += 1
+    for sid in [sid for sid in entries if sid not in index["snippets"]]:
+        base = entries.pop(sid)
+        profile = profiles.get(base.get("profile"))
+        pos = _find_entry(profile, base.get("title")) if profile else None
+        if pos is None:
+            continue
+        if text_digest(profile["texts"][pos]) != base.get("hash"):
+            conflicts.append({"id": sid, "profile": base.get("profile"), "title": base.get("title")})
+            continue
+        for key in ("titles", "texts", "hotkeys"):
+            del profile[key][pos]
+        changed.add(base.get("profile"))
+        applied += 1
+    state["etag"] = update["etag"]
+    state["version"] = index.get("version")
+    return {"changed_profiles": changed, "conflicts": conflicts, "applied": applied}
+
+#endregion
+
+#region publish / stand-in server
+
+def publish(library_path, out_dir):
+    """Erzeugt index.json + snippets/<id>.html aus einer library.json."""
+    with open(library_path, "r", encoding="utf-8") as f:
+        library = json.load(f)
+    os.makedirs(os.path.join(out_dir, "snippets"), exist_ok=True)
+    index = {"version": library.get("version", 1), "snippets": {}}
+    for item in library.get("snippets", []):
+        sid = item["id"]
+        if not _ID_RE.match(sid):
+            raise SyncError(f"Ungültige Snippet-ID: {sid!r}")
+        text = item.get("text", "")
+        index["snippets"][sid] = {
+            "profile": item["profile"], "title": item["title"],
+            "hotkey": item.get("hotkey", ""), "hash": text_digest(text)}
+        with open(os.path.join(out_dir, "snippets", f"{sid}.html"), "w", encoding="utf-8") as f:
+            f.write(text)
+    validate_index(index)
+    for name in os.listdir(os.path.join(out_dir, "snippets")):
+        if name.endswith(".html") and name[:-5] not in index["snippets"]:
+            os.remove(os.path.join(out_dir, "snippets", name))
+    with open(os.path.join(out_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    return index
+
+def make_handler(directory):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            logging.debug("sync-server: " + fmt, *args)
+        def _send(self, code, body=b"", etag=None, ctype="application/json"):
+            self.send_response(code)
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+        def do_GET(self):
+            parsed = urllib.parse.urlparse(self.path)
+            if parsed.path == "/index.json":
+                try:
+                    with open(os.path.join(directory, "index.json"), "rb") as f:
+                        body = f.read()
+                except OSError:
+                    return self._send(404)
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, etag=etag)
+                return self._send(200, body, etag)
+            if parsed.path == "/snippets":
+                ids = [i for i in urllib.parse.parse_qs(parsed.query).get("ids", [""])[0].split(",") if i]
+                try:
+                    bodies = FileSource(directory).fetch_snippets(ids)
+                except SyncError:
+                    return self._send(404)
+                return self._send(200, json.dumps(bodies).encode("utf-8"))
+            return self._send(404)
+    return Handler
+
+def serve(directory, host="127.0.0.1", port=8765):
+    """Lokaler Stand-in-Server; liefert den (laufenden) ThreadingHTTPServer."""
+    return ThreadingHTTPServer((host, port), make_handler(directory))
+
+#endregion
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QuickPaste Snippet-Bibliothek")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("publish", help="library.json in das Sync-Layout übersetzen")
+    p.add_argument("library")
+    p.add_argument("out_dir")
+    p = sub.add_parser("serve", help="Lokalen Stand-in-Server starten")
+    p.add_argument("directory")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    if args.command == "publish":
+        index = publish(args.library, args.out_dir)
+        print(f"{len(index['snippets'])} Snippets veröffentlicht (Version {index['version']})")
+    else:
+        server = serve(args.directory, args.host, args.port)
+        print(f"Sync-Server auf http://{args.host}:{server.server_port}/ ({args.directory})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Platzhalter in Snippet-Texten, ohne Qt-Abhängigkeit.
+
+    {{date}}  {{date:%d.%m.%Y}}  {{time}}  {{time:%H:%M:%S}}
+    {{user}}  {{clipboard}}  {{counter:ticket}}  {{gen:name|arg}}
+
+Ein Text wird einmal in statische Teile und Felder zerlegt (compile_template).
+Beim Einfügen werden nur noch die Feldwerte kodiert; statische HTML-Bytes und
+die CF_HTML-Offsets stehen bereits fest.
+"""
+import re
+from html import escape
+from collections import namedtuple
+from qp_html import cf_html_header, CF_HTML_PREFIX, CF_HTML_SUFFIX
+
+Field = namedtuple("Field", "kind arg")
+
+KINDS = ("date", "time", "user", "clipboard", "counter", "gen")
+DEFAULT_FORMATS = {"date": "%d.%m.%Y", "time": "%H:%M"}
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(date|time|user|clipboard|counter|gen)(?:\s*:\s*([^{}]*?))?\s*\}\}")
+
+def has_placeholders(text):
+    return bool(text) and "{{" in text and _PLACEHOLDER_RE.search(text) is not None
+
+class Template:
+    """Abwechselnd statische Teile und Felder; parts[0] und parts[-1] sind immer statisch."""
+    __slots__ = ("parts", "fields")
+    def __init__(self, parts):
+        self.parts = tuple(parts)
+        self.fields = tuple(dict.fromkeys(self.parts[1::2]))
+    def render(self, values, html=False):
+        out = list(self.parts)
+        for pos in range(1, len(out), 2):
+            out[pos] = _html_value(values[out[pos]]) if html else values[out[pos]]
+        return "".join(out)
+
+class CfHtmlTemplate:
+    """CF_HTML-Bytes eines HTML-Templates; pro Einfügen werden nur die Feldwerte kodiert."""
+    __slots__ = ("chunks", "static_len", "fields")
+    def __init__(self, template):
+        chunks = list(template.parts)
+        for pos in range(0, len(chunks), 2):
+            chunks[pos] = chunks[pos].encode("utf-8")
+        self.chunks = tuple(chunks)
+        self.static_len = sum(len(c) for c in self.chunks[0::2])
+        self.fields = template.fields
+    def render(self, values):
+        chunks = list(self.chunks)
+        dynamic_len = 0
+        for pos in range(1, len(chunks), 2):
+            encoded = _html_value(values[chunks[pos]]).encode("utf-8")
+            chunks[pos] = encoded
+            dynamic_len += len(encoded)
+        header = cf_html_header(self.static_len + dynamic_len)
+        return b"".join((header, CF_HTML_PREFIX, *chunks, CF_HTML_SUFFIX))
+
+def _html_value(value):
+    return escape(value or "", quote=False).replace("\r\n", "\n").replace("\n", "<br />")
+
+def compile_template(text):
+    """Template für text oder None, wenn der Text keine Platzhalter enthält."""
+    if not has_placeholders(text):
+        return None
+    parts, last = [], 0
+    for match in _PLACEHOLDER_RE.finditer(text):
+        kind, arg = match.group(1), (match.group(2) or "").strip()
+        if kind in DEFAULT_FORMATS and not arg:
+            arg = DEFAULT_FORMATS[kind]
+        if kind == "counter" and not arg:
+            arg = "default"
+        parts.append(text[last:match.start()])
+        parts.append(Field(kind, arg))
+        last = match.end()
+    parts.append(text[last:])
+    return Template(parts)
+
+class CompiledSnippet:
+    """HTML- und Klartext-Template eines Snippets plus vorbereitete CF_HTML-Teile."""
+    __slots__ = ("html", "plain", "cf_html", "fields", "gen_fields")
+    def __init__(self, html_text, plain_text):
+        self.html = compile_template(html_text) or Template([html_text])
+        self.plain = compile_template(plain_text) or Template([plain_text])
+        self.cf_html = CfHtmlTemplate(self.html)
+        self.fields = tuple(dict.fromkeys(self.html.fields + self.plain.fields))
+        self.gen_fields = tuple(f for f in self.fields if f.kind == "gen")
+
+def compile_snippet(html_text, plain_text):
+    """CompiledSnippet oder None, wenn weder HTML noch Klartext Platzhalter enthalten."""
+    if not has_placeholders(html_text) and not has_placeholders(plain_text):
+        return None
+    return CompiledSnippet(html_text, plain_text)
+
+def resolve_fields(fields, now, user="", clipboard=None, next_counter=None, generated=None):
+    """
+    Feldwerte für ein Einfügen. clipboard ist ein Callable (wird nur bei Bedarf
+    gelesen), next_counter(name) liefert den nächsten Zählerstand; jeder Zähler
+    wird pro Einfügen nur einmal erhöht. generated: {Field: Text} für gen-Felder.
+    """
+    values = {}
+    for field in fields:
+        if field.kind in ("date", "time"):
+            try:
+                values[field] = now.strftime(field.arg)
+            except ValueError:
+                values[field] = now.strftime(DEFAULT_FORMATS[field.kind])
+        elif field.kind == "user":
+            values[field] = user
+        elif field.kind == "clipboard":
+            values[field] = clipboard() if clipboard is not None else ""
+        elif field.kind == "counter":
+            values[field] = str(next_counter(field.arg)) if next_counter is not None else ""
+        elif field.kind == "gen":
+            values[field] = (generated or {}).get(field, "")
+    return values
@@ -0,0 +1,448 @@
+"""
+Import/Export von Snippet-Bibliotheken, ohne Qt-Abhängigkeit.
+
+Formate (Spalten bzw. Schlüssel: profile, title, text, hotkey):
+    csv     Kopfzeile Pflicht, 'title' und 'text' Pflicht, UTF-8 (mit/ohne BOM)
+    jsonl   ein JSON-Objekt pro Zeile
+    html    Ordner: <profil>/<titel>.html, Dateien direkt im Ordner gehen ins
+            Zielprofil. Optionale erste Zeile:
+            <!-- quickpaste {"title": "...", "hotkey": "ctrl+shift+1"} -->
+
+Gelesen und geschrieben wird satzweise (konstanter Speicher); übernommen wird
+in Blöcken von batch_size Einträgen. Texte ohne HTML-Markup und ohne
+Zeichenreferenzen (&amp;, &#8364;) werden als Klartext behandelt
+(Zeilenumbrüche -> <br>); der Export schreibt solche Snippets wieder als
+Klartext, damit Export und Re-Import nichts doppelt maskieren.
+
+    python qp_transfer.py import library.csv --profile Team
+    python qp_transfer.py export export.jsonl --profiles Team "Profil 1"
+"""
+import os, sys, re, csv, json, shutil, logging, tempfile, argparse
+from html import escape, unescape
+from collections import namedtuple
+import qp_edit, qp_store
+from qp_html import minify_html
+
+Record = namedtuple("Record", "profile title text hotkey")
+FORMATS = ("csv", "jsonl", "html")
+DUPLICATE_MODES = ("rename", "skip", "replace")
+RESERVED_PROFILE = "SDE"
+MAX_REPORTED_PROBLEMS = 20
+_HTML_RE = re.compile(r"<\s*(?:[A-Za-z][A-Za-z0-9]*|/[A-Za-z]|!--)")
+_ENTITY_RE = re.compile(r"&(?:#[0-9]+|#[xX][0-9A-Fa-f]+|[A-Za-z][A-Za-z0-9]*);")
+_BR_RE = re.compile(r"<br\s*/?>", re.I)
+_HEADER_RE = re.compile(r"^\s*<!--\s*quickpaste\s+(\{.*?\})\s*-->\r?\n?", re.S)
+_FILENAME_BAD_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')
+
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+def detect_format(path):
+    """Format anhand von Ordner/Dateiendung; ValueError, wenn unbekannt."""
+    if os.path.isdir(path):
+        return "html"
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unbekanntes Format für '{path}' (erwartet .csv, .jsonl oder Ordner)")
+
+def text_to_html(text):
+    """Snippet-Text in die gespeicherte Form: HTML wird minimiert, Klartext maskiert."""
+    text = text or ""
+    if _HTML_RE.search(text) or _ENTITY_RE.search(text):
+        return minify_html(text)
+    return escape(text, quote=False).replace("\r\n", "\n").replace("\n", "<br>")
+
+def html_to_text(text):
+    """
+    Umkehrung von text_to_html für den Export: Snippets ohne Markup (ausser
+    <br>) als Klartext, sofern text_to_html daraus wieder dasselbe macht;
+    alles andere bleibt HTML.
+    """
+    text = text or ""
+    if _HTML_RE.search(_BR_RE.sub("", text)):
+        return text
+    plain = unescape(_BR_RE.sub("\n", text))
+    return plain if text_to_html(plain) == text else text
+
+#region readers
+
+def _record(profile, title, text, hotkey, default_profile):
+    return Record((profile or "").strip() or default_profile, (title or "").strip(), text or "", (hotkey or "").strip())
+
+def read_csv(path, default_profile="", problems=None):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+        if "title" not in fields or "text" not in fields:
+            raise ValueError(f"{path}: Kopfzeile braucht die Spalten 'title' und 'text'")
+        col = lambda row, key: row.get(fields[key]) if key in fields else None
+        for row in reader:
+            if None in row and problems is not None:
+                problems.append(f"{path}:{reader.line_num}: überzählige Spalten ignoriert")
+            yield _record(col(row, "profile"), col(row, "title"), col(row, "text"), col(row, "hotkey"), default_profile)
+
+def read_jsonl(path, default_profile="", problems=None):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError("kein Objekt")
+                values = [item.get(k) for k in ("profile", "title", "text", "hotkey")]
+                if not all(v is None or isinstance(v, str) for v in values):
+                    raise ValueError("Werte müssen Texte sein")
+            except ValueError as e:
+                if problems is not None:
+                    problems.append(f"{path}:{line_no}: {e}")
+                continue
+            yield _record(*values, default_profile)
+
+def read_html_file(path, profile):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        text = f.read()
+    meta = {}
+    match = _HEADER_RE.match(text)
+    if match:
+        meta = json.loads(match.group(1))
+        if not isinstance(meta, dict):
+            raise ValueError("Kopfkommentar ist kein Objekt")
+        text = text[match.end():]
+    title = meta.get("title") or os.path.splitext(os.path.basename(path))[0]
+    return _record(profile, title, text, meta.get("hotkey"), profile)
+
+def read_html_folder(path, default_profile="", problems=None):
+    """Dateien direkt im Ordner -> default_profile, Unterordner -> gleichnamiges Profil."""
+    def files(directory):
+        with os.scandir(directory) as entries:
+            return sorted(e.path for e in entries if e.is_file() and e.name.lower().endswith((".html", ".htm")))
+    with os.scandir(path) as entries:
+        folders = sorted((e.name, e.path) for e in entries if e.is_dir())
+    for profile, directory in [(default_profile, path)] + folders:
+        for file_path in files(directory):
+            try:
+                yield read_html_file(file_path, profile)
+            except (OSError, ValueError) as e:
+                if problems is not None:
+                    problems.append(f"{file_path}: {e}")
+
+_READERS = {"csv": read_csv, "jsonl": read_jsonl, "html": read_html_folder}
+
+def read_records(path, fmt=None, default_profile="", problems=None):
+    """Generator über alle Records einer Datei/eines Ordners; fehlerhafte Zeilen landen in problems."""
+    return _READERS[fmt or detect_format(path)](path, default_profile, problems)
+
+#endregion
+
+#region import
+
+class _Target:
+    """Zustand eines Zielprofils während des Imports."""
+    __slots__ = ("profile", "titles", "hotkeys", "pending", "committed")
+    def __init__(self, profile):
+        self.profile = profile
+        self.titles = {(t or "").strip().lower(): i for i, t in enumerate(profile["titles"])}
+        self.hotkeys = {(h or "").strip().lower() for h in profile["hotkeys"] if (h or "").strip()}
+        for macro in profile.get("macros") or []:
+            if isinstance(macro, dict) and (macro.get("hotkey") or "").strip():
+                self.hotkeys.add(macro["hotkey"].strip().lower())
+        self.pending = []
+        self.committed = len(profile["titles"])
+
+class Importer:
+    """
+    Übernimmt Records in die Profile (dict name -> {titles, texts, hotkeys}).
+
+    Titel sind pro Profil eindeutig (Gross/Klein egal); bei Kollision entscheidet
+    on_duplicate: 'rename' hängt eine Nummer an, 'skip' verwirft, 'replace'
+    überschreibt Text und Hotkey. Hotkeys werden wie in register_hotkeys geprüft;
+    ungültige oder im Profil schon belegte werden geleert. Neue Profile legt
+    new_profile(name) an; ohne Funktion oder bei None wird übersprungen.
+    record(op) erhält jede Änderung als qp_edit.Op (für Undo), on_batch(stats)
+    meldet Fortschritt.
+    """
+    def __init__(self, profiles, on_duplicate="rename", batch_size=1000, new_profile=None, record=None, on_batch=None):
+        if on_duplicate not in DUPLICATE_MODES:
+            raise ValueError(f"on_duplicate muss eines von {DUPLICATE_MODES} sein")
+        self.profiles = profiles
+        self.on_duplicate = on_duplicate
+        self.batch_size = max(1, batch_size)
+        self.new_profile = new_profile
+        self.record = record
+        self.on_batch = on_batch
+        self.problems = []
+        self.stats = {"read": 0, "added": 0, "replaced": 0, "renamed": 0, "skipped": 0,
+                      "hotkeys_cleared": 0, "profiles_created": 0}
+        self._targets = {}
+        self._pending = 0
+    def _target(self, name):
+        target = self._targets.get(name)
+        if target is not None:
+            return target
+        if not name or name == RESERVED_PROFILE:
+            return None
+        if name not in self.profiles:
+            profile = self.new_profile(name) if self.new_profile is not None else None
+            if profile is None:
+                return None
+            self.profiles[name] = profile
+            self.stats["profiles_created"] += 1
+            if self.record is not None:
+                self.record(qp_edit.Op("add_profile", name, (len(self.profiles) - 1, self.profiles[name])))
+        target = self._targets[name] = _Target(self.profiles[name])
+        return target
+    def _hotkey(self, target, raw, where, current=""):
+        if not raw:
+            return current
+        hotkey = qp_edit.normalize_hotkey(raw)
+        if hotkey is not None and hotkey == (current or "").strip().lower():
+            return current
+        if hotkey is None or hotkey in target.hotkeys:
+            self.stats["hotkeys_cleared"] += 1
+            reason = "ungültig" if hotkey is None else "bereits belegt"
+            self.problems.append(f"{where}: Hotkey '{raw}' {reason}, Eintrag ohne Hotkey übernommen")
+            return current
+        target.hotkeys.discard((current or "").strip().lower())
+        target.hotkeys.add(hotkey)
+        return hotkey
+    def add(self, rec):
+        self.stats["read"] += 1
+        where = f"{rec.profile or '?'}/{rec.title or '?'}"
+        target = self._target(rec.profile)
+        if target is None:
+            self.stats["skipped"] += 1
+            self.problems.append(f"{where}: Profil fehlt, ist reserviert oder darf nicht angelegt werden")
+            return
+        if not rec.title:
+            self.stats["skipped"] += 1
+            self.problems.append(f"{where}: Eintrag ohne Titel übersprungen")
+            return
+        text = text_to_html(rec.text)
+        key = rec.title.lower()
+        index = target.titles.get(key)
+        if index is not None and self.on_duplicate == "skip":
+            self.stats["skipped"] += 1
+            return
+        if index is not None and self.on_duplicate == "replace":
+            self._replace(target, index, text, rec.hotkey, where)
+            return
+        title = rec.title
+        if index is not None:
+            title, n = f"{rec.title} 2", 3
+            while title.lower() in target.titles:
+                title, n = f"{rec.title} {n}", n + 1
+            self.stats["renamed"] += 1
+        target.titles[title.lower()] = target.committed + len(target.pending)
+        target.pending.append((title, text, self._hotkey(target, rec.hotkey, where)))
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+    def _replace(self, target, index, text, raw_hotkey, where):
+        self.stats["replaced"] += 1
+        if index >= target.committed:
+            title, _, hotkey = target.pending[index - target.committed]
+            target.pending[index - target.committed] = (title, text, self._hotkey(target, raw_hotkey, where, hotkey))
+            return
+        profile = target.profile
+        for key, new in (("texts", text), ("hotkeys", self._hotkey(target, raw_hotkey, where, profile["hotkeys"][index]))):
+            old = profile[key][index]
+            if old != new:
+                profile[key][index] = new
+                if self.record is not None:
+                    self.record(qp_edit.Op("set", self._name(target), (index, key, old, new)))
+    def _name(self, target):
+        return next(name for name, t in self._targets.items() if t is target)
+    def flush(self):
+        """Hängt alle vorgemerkten Einträge an ihre Profile an (ein Block pro Profil)."""
+        for name, target in self._targets.items():
+            if not target.pending:
+                continue
+            profile, start = target.profile, target.committed
+            rows = [(start + n, title, text, hotkey) for n, (title, text, hotkey) in enumerate(target.pending)]
+            profile["titles"].extend(r[1] for r in rows)
+            profile["texts"].extend(r[2] for r in rows)
+            profile["hotkeys"].extend(r[3] for r in rows)
+            if self.record is not None:
+                self.record(qp_edit.Op("insert", name, rows))
+            target.committed += len(rows)
+            self.stats["added"] += len(rows)
+            target.pending = []
+        self._pending = 0
+        if self.on_batch is not None:
+            self.on_batch(self.stats)
+    def run(self, records):
+        for rec in records:
+            self.add(rec)
+        self.flush()
+        return self.stats
+
+def import_records(profiles, records, **options):
+    """Kurzform: Importer(profiles, **options).run(records) -> (stats, problems)."""
+    importer = Importer(profiles, **options)
+    return importer.run(records), importer.problems
+
+#endregion
+
+#region export
+
+def export_records(profiles, names=None):
+    """Records aller (bzw. der genannten) Profile; SDE nur, wenn ausdrücklich genannt."""
+    for name in names if names is not None else [n for n in profiles if n != RESERVED_PROFILE]:
+        vals = profiles[name]
+        for title, text, hotkey in zip(vals.get("titles", []), vals.get("texts", []), vals.get("hotkeys", [])):
+            yield Record(name, title, html_to_text(qp_store.decode_text(text)), hotkey or "")
+
+def _write_atomic(path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            count = write(f)
+        os.replace(tmp, path)
+        return count
+    except BaseException:
+        try: os.unlink(tmp)
+        except OSError: pass
+        raise
+
+def write_csv(path, records):
+    def write(f):
+        writer = csv.writer(f)
+        writer.writerow(Record._fields)
+        count = 0
+        for rec in records:
+            writer.writerow(rec)
+            count += 1
+        return count
+    return _write_atomic(path, write)
+
+def write_jsonl(path, records):
+    def write(f):
+        count = 0
+        for rec in records:
+            f.write(json.dumps(rec._asdict(), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+        return count
+    return _write_atomic(path, write)
+
+def safe_filename(title, used):
+    """Titel -> eindeutiger Dateiname (ohne Endung) für Windows-Dateisysteme."""
+    base = _FILENAME_BAD_RE.sub("_", title).strip(" .")[:80] or "snippet"
+    return qp_edit.unique_title(base, used)
+
+def write_html_folder(path, records):
+    """
+    Ein Unterordner pro Profil, eine .html-Datei pro Snippet. Titel und Hotkey
+    stehen im Kopfkommentar, die laufende Nummer im Dateinamen hält die Reihenfolge.
+    Geschrieben wird in einen temporären Ordner, der erst am Ende umbenannt
+    wird; ein vorhandener Zielordner muss leer sein.
+    """
+    path = os.path.abspath(path)
+    if os.path.isdir(path) and os.listdir(path):
+        raise ValueError(f"Zielordner '{path}' ist nicht leer")
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp_")
+    try:
+        count = _write_html_files(tmp, records)
+        if os.path.isdir(path):
+            os.rmdir(path)
+        os.replace(tmp, path)
+        return count
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+def _write_html_files(path, records):
+    folders, folder_names, count = {}, set(), 0
+    for rec in records:
+        if rec.profile not in folders:
+            folder_name = safe_filename(rec.profile, folder_names)
+            os.makedirs(os.path.join(path, folder_name), exist_ok=True)
+            folders[rec.profile] = (folder_name, set())
+        folder_name, used = folders[rec.profile]
+        name = safe_filename(f"{len(used) + 1:05d} {rec.title}", used)
+        header = json.dumps({"title": rec.title, "hotkey": rec.hotkey}, ensure_ascii=False).replace("--", "-\\u002d")
+        with open(os.path.join(path, folder_name, f"{name}.html"), "w", encoding="utf-8", newline="") as f:
+            f.write(f"<!-- quickpaste {header} -->\n")
+            f.write(rec.text)
+        count += 1
+    return count
+
+_WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "html": write_html_folder}
+
+def write_records(path, records, fmt=None):
+    """Schreibt Records satzweise; liefert die Anzahl."""
+    fmt = fmt or ("html" if not os.path.splitext(path)[1] else detect_format(path))
+    return _WRITERS[fmt](path, records)
+
+#endregion
+
+#region command line
+
+def default_config_path():
+    return os.path.join(os.getenv("APPDATA") or os.path.expanduser("~"), "QuickPaste", "config.json")
+
+def load_config(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    profiles = data.setdefault("profiles", {})
+    for vals in profiles.values():
+        for key in qp_edit.KEYS:
+            vals.setdefault(key, [])
+    qp_store.unpack_shared_texts(profiles, data.pop("blobs", None))
+    return data
+
+def save_config(data, path):
+    """Atomar wie QuickPaste selbst; die laufende Anwendung lädt die Datei über ihren Datei-Watcher neu."""
+    profiles, blobs = qp_store.pack_shared_texts(data.get("profiles", {}))
+    packed = {**data, "profiles": profiles}
+    if blobs:
+        packed["blobs"] = blobs
+    _write_atomic(path, lambda f: json.dump(packed, f, indent=4, ensure_ascii=False))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QuickPaste Snippets importieren/exportieren")
+    parser.add_argument("--config", default=default_config_path())
+    parser.add_argument("--format", choices=FORMATS)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import", help="CSV/JSONL/HTML-Ordner in config.json übernehmen")
+    p.add_argument("source")
+    p.add_argument("--profile", default="Import", help="Zielprofil für Einträge ohne Profilangabe")
+    p.add_argument("--on-duplicate", choices=DUPLICATE_MODES, default="rename")
+    p.add_argument("--batch-size", type=int, default=1000)
+    p.add_argument("--dry-run", action="store_true")
+    p = sub.add_parser("export", help="Profile aus config.json exportieren")
+    p.add_argument("target")
+    p.add_argument("--profiles", nargs="*", help="Nur diese Profile (Standard: alle ausser SDE)")
+    args = parser.parse_args(argv)
+    data = load_config(args.config)
+    if args.command == "export":
+        missing = [n for n in args.profiles or [] if n not in data["profiles"]]
+        if missing:
+            parser.error(f"Profil(e) nicht gefunden: {', '.join(missing)}")
+        count = write_records(args.target, export_records(data["profiles"], args.profiles or None), args.format)
+        print(f"{count} Snippets exportiert nach {args.target}")
+        return 0
+    problems = []
+    importer = Importer(data["profiles"], args.on_duplicate, args.batch_size,
+                        new_profile=lambda name: {key: [] for key in qp_edit.KEYS})
+    stats = importer.run(read_records(args.source, args.format, args.profile, problems))
+    problems += importer.problems
+    for problem in problems[:MAX_REPORTED_PROBLEMS]:
+        logging.warning(f"⚠ {problem}")
+    if len(problems) > MAX_REPORTED_PROBLEMS:
+        logging.warning(f"⚠ ... und {len(problems) - MAX_REPORTED_PROBLEMS} weitere Hinweise")
+    if not args.dry_run:
+        data.setdefault("active_profile", next(iter(data["profiles"]), ""))
+        save_config(data, args.config)
+    print(", ".join(f"{k}={v}" for k, v in stats.items()) + (" (dry run)" if args.dry_run else ""))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+#endregion
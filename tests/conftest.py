@@ -0,0 +1,4 @@
+import os, sys
+
+# Module liegen flach im Repo-Wurzelverzeichnis
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
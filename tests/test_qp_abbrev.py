@@ -0,0 +1,57 @@
+import random
+from qp_abbrev import AbbrevMatcher, compile_abbreviations
+
+def _feed(matcher, text):
+    return [m.abbrev for m in map(matcher.feed, text) if m is not None]
+
+def _naive(abbreviations, text):
+    """Referenz: nach jedem Zeichen alle Kürzel als Suffix prüfen, längstes gültiges zuerst."""
+    found, typed = [], ""
+    for ch in text:
+        typed += ch
+        for abbrev in sorted(abbreviations, key=len, reverse=True):
+            start = len(typed) - len(abbrev)
+            if typed.endswith(abbrev) and (start == 0 or not typed[start - 1].isalnum()):
+                found.append(abbrev)
+                typed = ""
+                break
+    return found
+
+def test_shorter_abbrev_after_blocked_longer_one():
+    # ';c' hat ein 'b' davor, 'c' aber ein ';' -> das kürzere löst aus
+    assert _feed(AbbrevMatcher({";c": 0, "c": 1}), "b;c") == ["c"]
+    assert _feed(AbbrevMatcher({";sig": 0, "sig": 1}), "x;sig") == ["sig"]
+    assert _feed(AbbrevMatcher({";sig": 0, "sig": 1}), "x ;sig") == [";sig"]
+
+def test_output_chain_is_walked_longest_first():
+    matcher = AbbrevMatcher({"x;sig": 0, ";sig": 1, "sig": 2})
+    assert _feed(matcher, "ax;sig") == ["sig"]
+    assert _feed(matcher, "a;sig") == ["sig"]
+    assert _feed(matcher, " x;sig") == ["x;sig"]
+    assert _feed(AbbrevMatcher({"a;sig": 0, ";sig": 1}), "ba;sig") == []
+    assert _feed(AbbrevMatcher({"bc": 0, "c": 1}), "abc") == []
+
+def test_word_boundary():
+    matcher = AbbrevMatcher({"sig": 0})
+    assert _feed(matcher, "design sig") == ["sig"]
+    assert _feed(AbbrevMatcher({"sig": 0}), "xsig") == []
+
+def test_backspace_restores_state():
+    matcher = AbbrevMatcher({";sig": 0})
+    assert _feed(matcher, ";six") == []
+    matcher.backspace()
+    assert _feed(matcher, "g") == [";sig"]
+
+def test_compile_skips_shadowed_abbreviations():
+    result, warnings = compile_abbreviations({";s": "A", ";sig": "B", ";x": "fehlt"}, ["A", "B"])
+    assert result == {";s": 0}
+    assert len(warnings) == 2
+
+def test_fuzz_against_naive_matcher():
+    rng = random.Random(42)
+    alphabet = "ab;c1 "
+    for _ in range(500):
+        abbreviations = {"".join(rng.choice(alphabet.strip()) for _ in range(rng.randint(1, 4))): 0
+                         for _ in range(rng.randint(1, 5))}
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert _feed(AbbrevMatcher(abbreviations), text) == _naive(abbreviations, text), (abbreviations, text)
@@ -0,0 +1,171 @@
+import pytest
+import qp_edit
+import qp_store
+
+def _profile(n=5, texts=None):
+    return {"titles": [f"T{i}" for i in range(n)],
+            "texts": texts if texts is not None else [f"x{i}" for i in range(n)],
+            "hotkeys": [f"ctrl+shift+{i}" for i in range(n)]}
+
+def _titles(profile):
+    return list(profile["titles"])
+
+@pytest.mark.parametrize("value, expected", [
+    ("Ctrl+Shift+1 ", "ctrl+shift+1"),
+    ("ctrl+shift+§", "ctrl+shift+§"),
+    ("ctrl+alt+1", None),
+    ("ctrl+shift+a", None),
+    ("ctrl+shift+12", None),
+    (None, None),
+])
+def test_normalize_hotkey(value, expected):
+    assert qp_edit.normalize_hotkey(value) == expected
+
+def test_delete_and_insert_are_inverse():
+    profile = _profile()
+    removed = qp_edit.delete_rows(profile, [3, 1, 3])
+    assert [r[0] for r in removed] == [1, 3]
+    assert _titles(profile) == ["T0", "T2", "T4"]
+    qp_edit.insert_rows(profile, removed)
+    assert profile == _profile()
+
+@pytest.mark.parametrize("indices, offset, titles, new", [
+    ([1, 2], -1, ["T1", "T2", "T0", "T3", "T4"], [0, 1]),
+    ([1, 3], 1, ["T0", "T2", "T1", "T3", "T4"], [2, 3]),
+    ([0], -1, None, [0]),
+    ([4], 5, None, [4]),
+])
+def test_move_rows_keeps_selection_together(indices, offset, titles, new):
+    profile = _profile()
+    order, moved = qp_edit.move_rows(profile, indices, offset)
+    assert moved == new
+    if titles is None:
+        assert order is None and profile == _profile()
+    else:
+        assert _titles(profile) == titles
+        assert list(profile["texts"]) == [t.replace("T", "x") for t in titles]
+        qp_edit.permute(profile, qp_edit.inverse_order(order))
+        assert profile == _profile()
+
+def test_move_row_and_compressed_texts():
+    codec = qp_store.TextCodec("zlib")
+    profile = _profile(texts=qp_store.wrap_texts([f"x{i}" for i in range(5)], codec))
+    assert qp_edit.move_row(profile, 0, 3) == [1, 2, 3, 0, 4]
+    assert _titles(profile) == ["T1", "T2", "T3", "T0", "T4"]
+    assert list(profile["texts"]) == ["x1", "x2", "x3", "x0", "x4"]
+    assert qp_edit.move_row(profile, 2, 2) is None and qp_edit.move_row(profile, 0, 9) is None
+
+def test_duplicate_rows_inserts_after_selection_without_hotkeys():
+    profile = _profile(3)
+    new_rows = qp_edit.duplicate_rows(profile, [0, 1])
+    assert [r[0] for r in new_rows] == [2, 3]
+    assert _titles(profile) == ["T0", "T1", "T0 (Kopie)", "T1 (Kopie)", "T2"]
+    assert profile["hotkeys"][2:4] == ["", ""]
+    qp_edit.duplicate_rows(profile, [0])
+    assert profile["titles"][1] == "T0 (Kopie) 2"
+
+def test_copy_rows_keeps_titles_unique_and_frees_taken_hotkeys():
+    source = _profile(3)
+    target = {"titles": ["t1"], "texts": ["y"], "hotkeys": ["ctrl+shift+1"]}
+    new_rows = qp_edit.copy_rows(source, target, [1, 2])
+    assert new_rows == [(1, "T1 2", "x1", ""), (2, "T2", "x2", "ctrl+shift+2")]
+    assert _titles(target) == ["t1", "T1 2", "T2"]
+    assert len(target["texts"]) == len(target["hotkeys"]) == 3
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def _profiles():
+    return {"A": _profile(3), "B": _profile(2)}
+
+def _set(history, profiles, index, value, name="A"):
+    op = qp_edit.Op("set", name, (index, "titles", profiles[name]["titles"][index], value))
+    qp_edit.apply_op(profiles, op)
+    history.record(op)
+
+def test_undo_redo_of_a_grouped_step():
+    profiles, history = _profiles(), qp_edit.History()
+    history.begin("Verschieben und löschen")
+    order, _ = qp_edit.move_rows(profiles["A"], [2], -2)
+    history.record(qp_edit.Op("permute", "A", order))
+    history.record(qp_edit.Op("delete", "A", qp_edit.delete_rows(profiles["A"], [1])))
+    history.end()
+    after = {"titles": ["T2", "T1"], "texts": ["x2", "x1"], "hotkeys": ["ctrl+shift+2", "ctrl+shift+1"]}
+    assert profiles["A"] == after
+    assert history.undo(profiles).label == "Verschieben und löschen"
+    assert profiles == _profiles()
+    history.redo(profiles)
+    assert profiles["A"] == after
+    assert history.undo(profiles) is not None and history.undo(profiles) is None
+
+def test_profile_add_and_remove_keep_position():
+    profiles, history = _profiles(), qp_edit.History()
+    op = qp_edit.Op("remove_profile", "A", (0, profiles["A"]))
+    qp_edit.apply_op(profiles, op)
+    history.record(op)
+    assert list(profiles) == ["B"]
+    history.undo(profiles)
+    assert list(profiles) == ["A", "B"] and profiles == _profiles()
+
+def test_field_edits_coalesce_within_the_window():
+    clock = Clock()
+    profiles, history = _profiles(), qp_edit.History(coalesce_s=2.0, clock=clock)
+    for value in ("N", "Ne", "Neu"):
+        _set(history, profiles, 0, value)
+        clock.now += 1
+    clock.now += 5
+    _set(history, profiles, 0, "Später")
+    assert len(history.undo_stack) == 2
+    history.undo(profiles)
+    assert profiles["A"]["titles"][0] == "Neu"
+    history.undo(profiles)
+    assert profiles["A"]["titles"][0] == "T0"
+
+def test_new_edit_clears_redo():
+    profiles, history = _profiles(), qp_edit.History(coalesce_s=0)
+    _set(history, profiles, 0, "a")
+    history.undo(profiles)
+    _set(history, profiles, 1, "b")
+    assert not history.can_redo()
+
+def test_rollback_returns_to_the_saved_state():
+    profiles, history = _profiles(), qp_edit.History(coalesce_s=0)
+    _set(history, profiles, 0, "gespeichert")
+    history.mark_saved()
+    saved = {name: {k: list(v) for k, v in vals.items()} for name, vals in profiles.items()}
+    _set(history, profiles, 1, "x")
+    _set(history, profiles, 0, "y", name="B")
+    assert history.dirty
+    assert history.rollback(profiles) is True
+    assert profiles == saved and not history.dirty and not history.can_redo()
+    history.undo(profiles)
+    assert history.rollback(profiles) is True
+    assert profiles == saved
+
+def test_rollback_fails_once_the_saved_state_is_trimmed():
+    profiles, history = _profiles(), qp_edit.History(max_steps=2, coalesce_s=0)
+    history.mark_saved()
+    for i in range(3):
+        _set(history, profiles, i, f"v{i}")
+    assert len(history.undo_stack) == 2
+    assert history.rollback(profiles) is False
+
+def test_set_limits_trims_oldest_steps():
+    profiles, history = _profiles(), qp_edit.History(coalesce_s=0)
+    for i in range(3):
+        _set(history, profiles, i, f"v{i}")
+    history.set_limits(history.max_bytes, 1)
+    assert len(history.undo_stack) == 1
+    history.undo(profiles)
+    assert profiles["A"]["titles"] == ["v0", "v1", "T2"]
+
+def test_rename_profiles_updates_recorded_ops():
+    profiles, history = _profiles(), qp_edit.History(coalesce_s=0)
+    _set(history, profiles, 0, "neu")
+    profiles["C"] = profiles.pop("A")
+    history.rename_profiles({"A": "C"})
+    history.undo(profiles)
+    assert profiles["C"]["titles"][0] == "T0"
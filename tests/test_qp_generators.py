@@ -0,0 +1,73 @@
+import queue, threading, time
+import pytest
+import qp_generators
+
+class Loop:
+    """Ersatz für den GUI-Thread: call_soon/schedule landen in einer Queue."""
+    def __init__(self):
+        self.queue = queue.Queue()
+    def call_soon(self, fn):
+        self.queue.put(fn)
+    def schedule(self, ms, fn):
+        timer = threading.Timer(ms / 1000, self.queue.put, args=(fn,))
+        timer.daemon = True
+        timer.start()
+    def run_until(self, done, timeout=30):
+        deadline = time.monotonic() + timeout
+        while not done():
+            assert time.monotonic() < deadline, "Zeitüberschreitung im Test"
+            try:
+                self.queue.get(timeout=0.05)()
+            except queue.Empty:
+                pass
+
+@pytest.fixture
+def host(tmp_path):
+    (tmp_path / "fast.py").write_text("def generate(*args):\n    return '-'.join(args) or 'ok'\n")
+    (tmp_path / "slow.py").write_text("import time\ndef generate(*args):\n    time.sleep(30)\n")
+    (tmp_path / "crash.py").write_text("import os\ndef generate(*args):\n    os._exit(3)\n")
+    loop = Loop()
+    host = qp_generators.GeneratorHost(str(tmp_path), loop.call_soon, loop.schedule, workers=1, timeout_ms=2000)
+    host.loop = loop
+    yield host
+    host.shutdown()
+
+def _resolve(host, calls):
+    results = []
+    host.resolve(calls, results.append)
+    host.loop.run_until(lambda: results)
+    return results[0]
+
+def test_parse_call():
+    assert qp_generators.parse_call("kunde|4711|default=unbekannt") == qp_generators.GenCall("kunde", ("4711",), "unbekannt")
+    with pytest.raises(ValueError):
+        qp_generators.parse_call("1x")
+
+def test_result_is_cached(host):
+    call = qp_generators.parse_call("fast|a|b")
+    assert _resolve(host, [call]) == {call: "a-b"}
+    assert _resolve(host, [call]) == {call: "a-b"}
+    assert host.stats["runs"] == 1 and host.stats["hits"] == 1
+
+def test_waiting_calls_are_not_timed_out(host):
+    slow = qp_generators.parse_call("slow|default=zu langsam")
+    fast = qp_generators.parse_call("fast|x")
+    assert _resolve(host, [slow, fast]) == {slow: "zu langsam", fast: "x"}
+    assert host.stats["timeouts"] == 1
+    assert host.stats["restarts"] == 1
+
+def test_crashed_worker_restarts_pool(host):
+    crash = qp_generators.parse_call("crash|default=weg")
+    fast = qp_generators.parse_call("fast|y")
+    assert _resolve(host, [crash, fast]) == {crash: "weg", fast: "y"}
+    assert host.stats["restarts"] == 1
+    # danach laufen Generatoren wieder normal
+    assert _resolve(host, [qp_generators.parse_call("fast|z")]) == {qp_generators.parse_call("fast|z"): "z"}
+
+def test_broken_submit_settles_with_default(host):
+    host.start()
+    host._pool.shutdown(wait=True)
+    call = qp_generators.parse_call("fast|a|default=leer")
+    assert _resolve(host, [call]) == {call: "leer"}
+    other = qp_generators.parse_call("fast|b")
+    assert _resolve(host, [other]) == {other: "b"}
@@ -0,0 +1,65 @@
+import os, types
+import pytest
+import qp_bench
+from qp_html import html_to_plain, minify_html
+
+EDGE_CASES = [
+    "",
+    "nur Text",
+    "<p>a</p><p>b</p>",
+    "a<br>b<br/>c",
+    "<p>Gr&uuml;sse &amp; &lt;Tags&gt; &#8364; &#x41;</p>",
+    "<p>a&nbsp;&nbsp;b   c</p>",
+    "<ul><li>eins</li><li>zwei</li></ul><ol><li>drei</li></ol>",
+    "<table><tr><td>a</td><td>b</td></tr><tr><td></td><td>c</td></tr></table>nach",
+    "<p><b>fett</b> <i>kursiv</i> <a href='x'>link</a></p>",
+    "<html><head><style>p {color: red}</style></head><body><p>Text</p></body></html>",
+    "<div>a</div><div>b</div>",
+    "<h1>Titel</h1><p>Absatz</p>",
+]
+
+@pytest.fixture(scope="module")
+def qt_doc():
+    """QTextDocument-Fabrik; ohne PyQt5 werden die Vergleiche übersprungen."""
+    QtGui = pytest.importorskip("PyQt5.QtGui")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtGui.QGuiApplication.instance() or QtGui.QGuiApplication(["pytest"])
+    def make(text):
+        doc = QtGui.QTextDocument()
+        doc.setHtml(text)
+        return doc
+    yield make
+    del app
+
+def test_matches_qtextdocument_on_bench_corpus(qt_doc):
+    corpus = qp_bench._plain_corpus(types.SimpleNamespace(config=None, snippets=400, size=600))
+    # auch die Form, in der QuickPaste bearbeitete Texte speichert
+    corpus += [minify_html(qt_doc(text).toHtml()) for text in corpus[:100]]
+    mismatches = [text for text in corpus if html_to_plain(text) != qt_doc(text).toPlainText()]
+    assert mismatches == []
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_matches_qtextdocument_on_edge_cases(qt_doc, text):
+    assert html_to_plain(text) == qt_doc(text).toPlainText()
+
+QT_SAVED = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN" "http://www.w3.org/TR/REC-html40/strict.dtd">\n'
+    '<html><head><meta name="qrichtext" content="1" /><style type="text/css">\np, li { white-space: pre-wrap; }\n'
+    '</style></head><body style=" font-family:\'MS Shell Dlg 2\'; font-size:8.25pt; font-weight:400; font-style:normal;">\n'
+    '<p style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;">'
+    'Hallo  <span style=" font-weight:600;">Welt</span></p>\n<!-- Kommentar -->'
+    '<p style=" margin-top:0px; margin-bottom:0px; margin-left:0px; margin-right:0px; -qt-block-indent:0; text-indent:0px;">zweite</p>'
+    '</body></html>')
+
+def test_minify_drops_qt_boilerplate():
+    assert minify_html(QT_SAVED) == '<p style="white-space:pre-wrap">Hallo  <span style="font-weight:600">Welt</span></p><p>zweite</p>'
+
+def test_minify_is_idempotent_and_keeps_plain_text():
+    once = minify_html(QT_SAVED)
+    assert minify_html(once) == once
+    assert minify_html("nur Text") == "nur Text"
+    assert minify_html("") == minify_html(None) == ""
+
+@pytest.mark.parametrize("text", EDGE_CASES + [QT_SAVED])
+def test_minify_keeps_plain_text_content(text):
+    assert html_to_plain(minify_html(text)) == html_to_plain(text)
@@ -0,0 +1,188 @@
+import qp_input
+from qp_input import KeyEvent, KEYEVENTF_KEYUP, KEYEVENTF_UNICODE
+
+def _typed_text(events):
+    """Ereignisstrom zurück in Text (nur Key-Down zählt)."""
+    units = []
+    for ev in events:
+        if ev.flags & KEYEVENTF_KEYUP:
+            continue
+        if ev.flags & KEYEVENTF_UNICODE:
+            units.append(ev.scan.to_bytes(2, "little"))
+        else:
+            units.append({qp_input.VK_RETURN: "\n", qp_input.VK_TAB: "\t"}[ev.vk].encode("utf-16-le"))
+    return b"".join(units).decode("utf-16-le")
+
+def test_unicode_events_down_up_pairs():
+    events = qp_input.unicode_events("aé")
+    assert events == [
+        KeyEvent(0, ord("a"), KEYEVENTF_UNICODE), KeyEvent(0, ord("a"), KEYEVENTF_UNICODE | KEYEVENTF_KEYUP),
+        KeyEvent(0, ord("é"), KEYEVENTF_UNICODE), KeyEvent(0, ord("é"), KEYEVENTF_UNICODE | KEYEVENTF_KEYUP)]
+
+def test_newlines_become_enter():
+    events = qp_input.unicode_events("a\r\nb\rc\td")
+    assert [ev.vk for ev in events if ev.vk] == [qp_input.VK_RETURN] * 4 + [qp_input.VK_TAB] * 2
+    assert _typed_text(events) == "a\nb\nc\td"
+
+def test_chunks_batched_into_backend():
+    text = "Grüsse 😀 aus Bern\n" * 5
+    backend = qp_input.RecordingBackend()
+    for chunk in qp_input.unicode_chunks(text, max_events=16):
+        backend.send(chunk)
+    assert len(backend.batches) > 1
+    assert all(len(batch) <= 16 for batch in backend.batches)
+    assert backend.events == qp_input.unicode_events(text)
+    assert _typed_text(backend.events) == text.replace("\r", "")
+
+def test_chunks_never_split_surrogate_pairs():
+    # 😀 braucht zwei UTF-16-Einheiten = 4 Ereignisse; bei max 6 passt nur eins pro Block
+    chunks = list(qp_input.unicode_chunks("😀😀😀", max_events=6))
+    assert [len(c) for c in chunks] == [4, 4, 4]
+    assert all(_typed_text(c) == "😀" for c in chunks)
+
+def test_chunk_size_has_lower_bound():
+    assert all(len(c) <= 4 for c in qp_input.unicode_chunks("abc", max_events=1))
+
+def test_key_taps():
+    backend = qp_input.RecordingBackend()
+    backend.send(qp_input.key_taps(qp_input.VK_BACK, 3))
+    assert backend.events == [KeyEvent(qp_input.VK_BACK, 0, flags) for flags in (0, KEYEVENTF_KEYUP) * 3]
+    assert qp_input.key_taps(qp_input.VK_BACK, 0) == []
+
+def test_key_combo_releases_in_reverse_order():
+    events = qp_input.key_combo((qp_input.VK_CONTROL, qp_input.VK_SHIFT), qp_input.VK_V)
+    assert [(ev.vk, bool(ev.flags & KEYEVENTF_KEYUP)) for ev in events] == [
+        (qp_input.VK_CONTROL, False), (qp_input.VK_SHIFT, False), (qp_input.VK_V, False),
+        (qp_input.VK_V, True), (qp_input.VK_SHIFT, True), (qp_input.VK_CONTROL, True)]
+
+def test_modifier_release_is_key_up_only():
+    backend = qp_input.RecordingBackend()
+    backend.send(qp_input.modifier_release_events())
+    assert {ev.vk for ev in backend.events} == set(qp_input.MODIFIER_KEYS)
+    assert all(ev.flags == KEYEVENTF_KEYUP for ev in backend.events)
+
+def test_length_threshold():
+    assert qp_input.should_type_directly("abc", "abc", 3)
+    assert not qp_input.should_type_directly("abcd", "abcd", 3)
+    assert not qp_input.should_type_directly("abc", "abc", 0)
+
+def test_rich_text_is_pasted():
+    assert not qp_input.should_type_directly("<b>abc</b>", "abc", 40)
+    assert not qp_input.should_type_directly('<a href="x">abc</a>', "abc", 40)
+    assert qp_input.should_type_directly("<p>abc</p>", "abc", 40)
+
+class Scheduler:
+    """Manuelle Zeitsteuerung für PasteQueue: Uhr und Timer in Millisekunden."""
+    def __init__(self):
+        self.now = 0
+        self.queue = []
+    def clock(self):
+        return self.now / 1000
+    def __call__(self, ms, fn):
+        self.queue.append((self.now + ms, len(self.queue), fn))
+    def run(self, until=None):
+        """Fällige Callbacks bis until (Standard: alle) ausführen; die Uhr steht danach auf until."""
+        while self.queue:
+            self.queue.sort(key=lambda item: item[:2])
+            if until is not None and self.queue[0][0] > until:
+                break
+            self.now, _, fn = self.queue.pop(0)
+            fn()
+        if until is not None:
+            self.now = max(self.now, until)
+
+def _queue(**kwargs):
+    sched = Scheduler()
+    return sched, qp_input.PasteQueue(sched, clock=sched.clock, **kwargs)
+
+def _job(log, name, hold=None):
+    def start(done):
+        log.append(name)
+        if hold is None:
+            done()
+        else:
+            hold.append(done)
+    return start
+
+def test_queue_runs_jobs_in_order_one_at_a_time():
+    sched, queue = _queue(settle_ms=100)
+    log, held = [], []
+    queue.submit("a", _job(log, "a", held))
+    queue.submit("b", _job(log, "b"))
+    queue.submit("c", _job(log, "c"))
+    assert log == ["a"] and queue.depth == 3
+    sched.run(5_000)
+    assert log == ["a"]
+    held.pop()()
+    sched.run(sched.now + 99)
+    assert log == ["a"]
+    sched.run()
+    assert log == ["a", "b", "c"] and queue.depth == 0
+    assert queue.snapshot()["completed"] == 3
+
+def test_done_twice_does_not_start_two_jobs():
+    sched, queue = _queue(settle_ms=0)
+    log, held = [], []
+    queue.submit("a", _job(log, "a", held))
+    queue.submit("b", _job(log, "b", held))
+    done = held.pop()
+    done()
+    done()
+    sched.run(1_000)
+    assert log == ["a", "b"] and queue.stats["completed"] == 1
+
+def test_queue_drops_when_full():
+    sched, queue = _queue(max_depth=2)
+    log, held = [], []
+    assert queue.submit("a", _job(log, "a", held))
+    assert queue.submit("b", _job(log, "b"))
+    assert queue.submit("c", _job(log, "c"))
+    assert not queue.submit("d", _job(log, "d"))
+    assert queue.stats["dropped"] == 1
+
+def test_coalesce_only_while_waiting():
+    sched, queue = _queue(coalesce_ms=300, settle_ms=0)
+    log, held = [], []
+    queue.submit("x", _job(log, "first", held))
+    queue.submit("x", _job(log, "second", held))
+    sched.now += 100
+    assert queue.submit("x", _job(log, "coalesced"))
+    sched.now += 500
+    queue.submit("x", _job(log, "late", held))
+    while held:
+        held.pop()()
+        sched.run(sched.now)
+    assert log == ["first", "second", "late"]
+    assert queue.stats["coalesced"] == 1
+
+def test_job_that_never_reports_times_out():
+    sched, queue = _queue(settle_ms=0)
+    log, held = [], []
+    queue.submit("hangs", _job(log, "hangs", held), timeout_ms=1_000)
+    queue.submit("next", _job(log, "next"))
+    sched.run(999)
+    assert log == ["hangs"]
+    sched.run()
+    assert log == ["hangs", "next"] and queue.stats["timeouts"] == 1
+    held.pop()()
+    assert queue.stats["completed"] == 2
+
+def test_failing_job_does_not_block_the_queue():
+    sched, queue = _queue(settle_ms=0)
+    log = []
+    def broken(done):
+        raise OSError("Zwischenablage belegt")
+    queue.submit("broken", broken)
+    queue.submit("ok", _job(log, "ok"))
+    sched.run()
+    assert log == ["ok"] and queue.depth == 0
+
+def test_wait_time_is_measured():
+    sched, queue = _queue(settle_ms=50)
+    held = []
+    queue.submit("a", _job([], "a", held))
+    queue.submit("b", _job([], "b"))
+    sched.now = 200
+    held.pop()()
+    sched.run()
+    assert queue.stats["last_wait_ms"] == 250.0
@@ -0,0 +1,79 @@
+import socket, sys, threading
+import pytest
+import qp_ipc
+
+@pytest.mark.parametrize("line, expected", [
+    ("show", ("show", "")),
+    ("  RELOAD \n", ("reload", "")),
+    ("switch Profil 2", ("switch", "Profil 2")),
+    ("paste Profil 1 / Begrüssung", ("paste", ("Profil 1", "Begrüssung"))),
+    ("paste A/B/C", ("paste", ("A", "B/C"))),
+])
+def test_parse_command(line, expected):
+    assert qp_ipc.parse_command(line) == expected
+
+@pytest.mark.parametrize("line", ["", "quit", "switch", "paste ", "paste nur-titel", "paste /titel", "paste profil/ "])
+def test_parse_command_rejects(line):
+    with pytest.raises(ValueError):
+        qp_ipc.parse_command(line)
+
+def test_read_line_stops_at_newline_and_limit():
+    chunks = [b"ok a", b"=1\nrest", b"nie gelesen"]
+    assert qp_ipc._read_line(lambda n: chunks.pop(0) if chunks else b"") == "ok a=1"
+    endless = lambda n: b"x" * n
+    assert len(qp_ipc._read_line(endless)) >= qp_ipc.MAX_LINE
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="Unix-Socket")
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Stellvertreter für die laufende Instanz: liest eine Zeile, antwortet 'ok <zeile>'."""
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(qp_ipc.endpoint_path("qp-test"))
+    sock.listen(1)
+    received = []
+    def serve():
+        conn, _ = sock.accept()
+        with conn:
+            line = qp_ipc._read_line(conn.recv)
+            received.append(line)
+            conn.sendall(f"ok {line}\n".encode("utf-8"))
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield received
+    thread.join(2)
+    sock.close()
+
+@posix_only
+def test_send_command_roundtrip(server):
+    assert qp_ipc.send_command("  paste P/Grüsse ", name="qp-test") == "ok paste P/Grüsse"
+    assert server == ["paste P/Grüsse"]
+
+@posix_only
+def test_send_command_without_instance(tmp_path, monkeypatch):
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    with pytest.raises(ConnectionRefusedError):
+        qp_ipc.send_command("show", name="qp-test")
+
+def test_send_command_rejects_long_lines():
+    with pytest.raises(ValueError):
+        qp_ipc.send_command("paste P/" + "x" * qp_ipc.MAX_LINE, name="qp-test")
+
+def test_main_exit_codes(monkeypatch):
+    monkeypatch.setattr(qp_ipc, "send_command", lambda line: "ok" if line == "show" else "error nein")
+    assert qp_ipc.main(["show"]) == qp_ipc.EXIT_OK
+    assert qp_ipc.main(["switch", "X"]) == qp_ipc.EXIT_ERROR
+    assert qp_ipc.main(["frobnicate"]) == qp_ipc.EXIT_ERROR
+    monkeypatch.setattr(qp_ipc, "send_command", lambda line: (_ for _ in ()).throw(ConnectionRefusedError("läuft nicht")))
+    assert qp_ipc.main(["show"]) == qp_ipc.EXIT_NOT_RUNNING
+
+@posix_only
+def test_instance_lock_is_exclusive(tmp_path):
+    first = qp_ipc.acquire_instance_lock(str(tmp_path))
+    assert first is not None
+    assert qp_ipc.acquire_instance_lock(str(tmp_path)) is None
+    first.close()
+    again = qp_ipc.acquire_instance_lock(str(tmp_path))
+    assert again is not None
+    again.close()
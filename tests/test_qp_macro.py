@@ -0,0 +1,113 @@
+import pytest
+import qp_input
+import qp_macro
+
+TITLES = ["Name", "Adresse"]
+
+class Scheduler:
+    """Manuelle Zeitsteuerung: run() arbeitet fällige Callbacks in Zeitreihenfolge ab."""
+    def __init__(self):
+        self.now = 0
+        self.queue = []
+    def __call__(self, ms, fn):
+        self.queue.append((self.now + ms, len(self.queue), fn))
+    def run(self, until=10**9):
+        while self.queue:
+            self.queue.sort(key=lambda item: item[:2])
+            if self.queue[0][0] > until:
+                break
+            self.now, _, fn = self.queue.pop(0)
+            fn()
+
+class Executor:
+    def __init__(self, fail_run=None, fail_prepare=None, hold=False):
+        self.prepared, self.ran, self.pending = [], [], []
+        self.fail_run, self.fail_prepare, self.hold = fail_run, fail_prepare, hold
+    def prepare(self, step):
+        if step.value == self.fail_prepare:
+            raise RuntimeError("prepare kaputt")
+        self.prepared.append(step.value)
+        return ("payload", step.value)
+    def run(self, step, payload, done):
+        if step.value == self.fail_run:
+            raise OSError("SendInput kaputt")
+        self.ran.append(payload)
+        if self.hold:
+            self.pending.append(done)
+        else:
+            done()
+
+def _macro(steps):
+    return qp_macro.compile_macro({"title": "M", "hotkey": "Ctrl+Shift+F", "steps": steps}, TITLES)
+
+def _runner(macro, executor, scheduler, finished):
+    return qp_macro.MacroRunner(macro, executor, scheduler, step_gap_ms=10,
+                                on_finished=finished.append, clock=lambda: scheduler.now / 1000)
+
+def test_parse_key():
+    assert qp_macro.parse_key("tab") == qp_input.key_combo((), qp_input.VK_TAB)
+    assert qp_macro.parse_key("Ctrl+A") == qp_input.key_combo((qp_input.VK_CONTROL,), ord("A"))
+    for bad in ("", "hyper+a", "ctrl+ä"):
+        with pytest.raises(ValueError):
+            qp_macro.parse_key(bad)
+
+def test_compile_macro():
+    macro = _macro([{"snippet": "adresse"}, {"key": "enter", "delay_ms": 0}, {"wait": 300}])
+    assert macro.title == "M" and macro.hotkey == "ctrl+shift+f"
+    assert [(s.kind, s.delay_ms) for s in macro.steps] == [("snippet", None), ("key", 0), ("wait", None)]
+    assert macro.steps[0].value == 1
+
+@pytest.mark.parametrize("steps", [[], [{"snippet": "Fehlt"}], [{"wait": -1}], [{"wait": 10**6}],
+                                   [{"key": "tab", "delay_ms": -5}], [{"tippen": "x"}], ["tab"]])
+def test_compile_macro_rejects(steps):
+    with pytest.raises(ValueError):
+        _macro(steps)
+
+def test_runs_steps_in_order_with_gaps():
+    scheduler, executor, finished = Scheduler(), Executor(), []
+    runner = _runner(_macro([{"snippet": "Name"}, {"wait": 300}, {"snippet": "Adresse", "delay_ms": 50}]),
+                     executor, scheduler, finished)
+    runner.start()
+    scheduler.run()
+    assert [payload[1] for payload in executor.ran] == [0, 1]
+    assert finished == [runner] and not runner.cancelled
+    assert [(pos, kind) for pos, kind, _ in runner.timings] == [(0, "snippet"), (1, "wait"), (2, "snippet")]
+    assert scheduler.now == 10 + 300 + 10 + 50
+
+def test_failing_step_finishes_runner():
+    scheduler, finished = Scheduler(), []
+    runner = _runner(_macro([{"snippet": "Name"}, {"snippet": "Adresse"}]), Executor(fail_run=1), scheduler, finished)
+    runner.start()
+    scheduler.run()
+    assert finished == [runner] and runner.cancelled
+
+def test_failing_first_prepare_finishes_runner():
+    scheduler, finished = Scheduler(), []
+    runner = _runner(_macro([{"snippet": "Name"}]), Executor(fail_prepare=0), scheduler, finished)
+    runner.start()
+    assert finished == [runner] and runner.cancelled
+
+def test_cancel_finishes_at_once_and_ignores_late_done():
+    scheduler, executor, finished = Scheduler(), Executor(hold=True), []
+    runner = _runner(_macro([{"snippet": "Name"}, {"snippet": "Adresse"}]), executor, scheduler, finished)
+    runner.start()
+    runner.cancel()
+    assert finished == [runner] and runner.cancelled
+    executor.pending[0]()
+    scheduler.run()
+    assert len(executor.ran) == 1 and finished == [runner]
+    runner.cancel()
+    assert finished == [runner]
+
+def test_done_twice_runs_next_step_once():
+    scheduler, executor, finished = Scheduler(), Executor(hold=True), []
+    runner = _runner(_macro([{"snippet": "Name"}, {"snippet": "Adresse"}]), executor, scheduler, finished)
+    runner.start()
+    executor.pending[0]()
+    executor.pending[0]()
+    scheduler.run()
+    assert len(executor.ran) == 2
+
+def test_macro_timeout_covers_waits_and_gaps():
+    macro = _macro([{"snippet": "Name"}, {"wait": 3000}, {"key": "tab", "delay_ms": 500}])
+    assert qp_macro.macro_timeout_ms(macro, step_gap_ms=20, step_ms=1000, margin_ms=0) == 1000 + 20 + 3000 + 20 + 1000 + 500
@@ -0,0 +1,59 @@
+import qp_store
+from qp_profiles import ProfileIndex
+
+NAMES = ["Kunde Alpha", "Kunde Beta", "Intern", "Alpha Projekt", "Support Alpha", "SDE"]
+
+def test_recent_list_is_deduplicated_and_capped():
+    index = ProfileIndex(NAMES, recent=["Intern", "Intern", 3, "Kunde Beta"], max_recent=2)
+    assert index.recent == ["Intern", "Kunde Beta"]
+    index.touch("SDE")
+    index.touch("Kunde Beta")
+    assert index.recent == ["Kunde Beta", "SDE"]
+
+def test_recent_names_filters_missing_profiles():
+    index = ProfileIndex(NAMES, recent=["Weg", "Intern", "SDE", "Kunde Beta"])
+    assert index.recent_names(set(NAMES), limit=2, skip={"SDE"}) == ["Intern", "Kunde Beta"]
+
+def test_rename_keeps_recent_list_in_place():
+    index = ProfileIndex(NAMES, recent=["Intern"])
+    recent = index.recent
+    index.rename({"Intern": "Team"})
+    assert recent == ["Team"] and index.recent is recent
+
+def test_sync_reports_changes():
+    index = ProfileIndex(NAMES)
+    assert index.sync(NAMES) is False
+    assert index.sync(NAMES + ["Neu"]) is True and len(index) == len(NAMES) + 1
+
+def test_empty_search_lists_recent_first():
+    index = ProfileIndex(NAMES, recent=["Intern", "SDE"])
+    names, total = index.search("", limit=3, skip={"SDE"})
+    assert names == ["Intern", "Kunde Alpha", "Kunde Beta"]
+    assert total == len(NAMES) - 1
+
+def test_search_ranks_prefix_then_word_start_then_substring():
+    index = ProfileIndex(NAMES + ["Zalpha"], recent=["Support Alpha"])
+    names, total = index.search("alpha")
+    assert names == ["Alpha Projekt", "Support Alpha", "Kunde Alpha", "Zalpha"]
+    assert total == 4
+
+def test_search_needs_all_words_and_respects_limit():
+    index = ProfileIndex([f"Kunde {n}" for n in range(100)] + ["Intern Kunde"])
+    assert index.search("intern KUNDE")[0] == ["Intern Kunde"]
+    names, total = index.search("kunde", limit=5)
+    assert len(names) == 5 and total == 101
+
+def test_lazy_texts_wrap_on_first_use_only():
+    calls = []
+    def wrap(items):
+        calls.append(list(items))
+        return [qp_store.decode_text(item) for item in items]
+    lazy = qp_store.LazyTexts(["a", "b"], wrap)
+    clone = lazy.copy()
+    assert len(lazy) == 2 and lazy.to_stored() == ["a", "b"] and lazy == clone
+    assert calls == [] and not lazy.materialized
+    lazy.insert(0, "z")
+    assert calls == [["a", "b"]] and list(lazy) == ["z", "a", "b"]
+    assert list(clone) == ["a", "b"]
+    lazy.reorder([2, 1, 0])
+    assert lazy.to_stored() == ["b", "a", "z"]
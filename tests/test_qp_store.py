@@ -0,0 +1,200 @@
+import os, json, hashlib
+import pytest
+import qp_store
+
+SDE = {"titles": ["A", "B"], "texts": ["<b>x</b>", "ü"], "hotkeys": ["ctrl+1", ""]}
+
+def _pack(tmp_path, raw):
+    digest = qp_store.sde_source_digest(raw)
+    path = qp_store.sde_pack_path(str(tmp_path), digest)
+    qp_store.compile_sde_pack(SDE, digest, path)
+    return path, digest
+
+def test_sde_pack_roundtrip(tmp_path):
+    path, digest = _pack(tmp_path, b"1")
+    profile = qp_store.open_sde_pack(path, digest).as_profile()
+    assert {field: list(profile[field]) for field in qp_store.SDE_FIELDS} == SDE
+    assert qp_store.open_sde_pack(path, qp_store.sde_source_digest(b"2")) is None
+
+def test_remove_stale_keeps_recent_packs(tmp_path):
+    old, _ = _pack(tmp_path, b"old")
+    recent, _ = _pack(tmp_path, b"recent")
+    keep, _ = _pack(tmp_path, b"keep")
+    now = os.stat(keep).st_mtime
+    os.utime(old, (now - 30 * 86400, now - 30 * 86400))
+    os.utime(recent, (now - 2 * 86400, now - 2 * 86400))
+    qp_store.remove_stale_sde_packs(str(tmp_path), keep, max_age_days=14, now=now)
+    assert os.path.exists(keep) and os.path.exists(recent)
+    assert not os.path.exists(old)
+
+def test_opening_a_pack_marks_it_used(tmp_path):
+    path, digest = _pack(tmp_path, b"used")
+    os.utime(path, (0, 0))
+    qp_store.open_sde_pack(path, digest)
+    keep, _ = _pack(tmp_path, b"keep")
+    qp_store.remove_stale_sde_packs(str(tmp_path), keep)
+    assert os.path.exists(path)
+
+def _corrupt(path, offset, data):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+def test_pack_with_wrong_checksum_is_rejected(tmp_path):
+    path, digest = _pack(tmp_path, b"1")
+    _corrupt(path, os.path.getsize(path) - 1, b"X")
+    assert qp_store.open_sde_pack(path, digest) is None
+
+def test_truncated_pack_is_rejected(tmp_path):
+    path, digest = _pack(tmp_path, b"1")
+    with open(path, "r+b") as f:
+        f.truncate(qp_store._PACK_HEADER.size + 4)
+    assert qp_store.open_sde_pack(path, digest) is None
+
+def test_slot_outside_table_is_rejected(tmp_path):
+    path, digest = _pack(tmp_path, b"1")
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    header = qp_store._PACK_HEADER
+    qp_store._PACK_SLOT.pack_into(data, header.size, 0, 10**6)
+    magic, src, count, reserved, _ = header.unpack_from(data)
+    header.pack_into(data, 0, magic, src, count, reserved, hashlib.sha256(data[header.size:]).digest())
+    with open(path, "wb") as f:
+        f.write(data)
+    assert qp_store.open_sde_pack(path, digest) is None
+
+def test_pack_of_foreign_owner_is_rejected(tmp_path, monkeypatch):
+    path, digest = _pack(tmp_path, b"1")
+    monkeypatch.setattr(qp_store, "trusted_owner", lambda p: False)
+    assert qp_store.open_sde_pack(path, digest) is None
+
+def test_migrate_config_minifies_old_versions():
+    loaded = {"profiles": {"P": {"titles": ["a", "b"], "texts": ["<html><head><style>p {}</style></head><body><p>x</p></body></html>", "plain"], "hotkeys": ["", ""]}}}
+    assert qp_store.migrate_config(loaded) is True
+    assert loaded["version"] == qp_store.CONFIG_VERSION
+    assert loaded["profiles"]["P"]["texts"] == ["<p>x</p>", "plain"]
+
+def test_migrate_config_leaves_current_version_alone():
+    text = "<html><body><p>x</p></body></html>"
+    loaded = {"version": qp_store.CONFIG_VERSION, "profiles": {"P": {"titles": ["a"], "texts": [text], "hotkeys": [""]}}}
+    assert qp_store.migrate_config(loaded) is False
+    assert loaded["profiles"]["P"]["texts"] == [text]
+
+def test_lru_cache_drops_least_recently_used():
+    cache = qp_store.LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+
+def test_codec_roundtrip_and_cache():
+    codec = qp_store.TextCodec("zlib", cache_items=1)
+    blob = codec.compress("<p>Grüsse</p>" * 20)
+    assert blob[:1] == b"z" and len(blob) < len("<p>Grüsse</p>" * 20)
+    assert codec.decompress(blob) == "<p>Grüsse</p>" * 20
+    assert codec.decompress(blob) == "<p>Grüsse</p>" * 20
+    assert codec.cache.hits == 1
+    assert codec.decompress(codec.compress("")) == ""
+
+def test_codec_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        qp_store.TextCodec("lz4")
+
+def test_compressed_texts_behave_like_a_list():
+    codec = qp_store.TextCodec("zlib")
+    texts = qp_store.CompressedTexts.from_stored(codec, ["a", "b"])
+    texts.append("c")
+    texts[0] = "A"
+    texts.reorder([2, 0, 1])
+    assert list(texts) == ["c", "A", "b"] and texts == ["c", "A", "b"]
+    del texts[1]
+    assert texts[:] == ["c", "b"]
+    copy = texts.copy()
+    copy[0] = "x"
+    assert list(texts) == ["c", "b"]
+
+def test_compressed_texts_stored_form_roundtrip():
+    codec = qp_store.TextCodec("zlib")
+    stored = qp_store.CompressedTexts.from_stored(codec, ["eins", "zwei"]).to_stored()
+    assert all(qp_store.is_token(item) for item in stored)
+    assert [qp_store.decode_text(item) for item in stored] == ["eins", "zwei"]
+    assert list(qp_store.CompressedTexts.from_stored(codec, stored)) == ["eins", "zwei"]
+    assert json.loads(json.dumps(qp_store.wrap_texts(stored, codec), default=qp_store.json_default)) == stored
+
+def test_wrap_texts_without_codec_decodes_tokens():
+    stored = qp_store.CompressedTexts.from_stored(qp_store.TextCodec("zlib"), ["x"]).to_stored()
+    assert qp_store.wrap_texts(stored + ["klar", None]) == ["x", "klar", ""]
+
+def test_text_pool_shares_equal_texts():
+    pool = qp_store.TextPool()
+    a = pool.intern("".join(["gleicher ", "Text"]))
+    b = pool.intern("".join(["gleicher ", "Text"]))
+    assert a is b and pool.intern(None) == ""
+    codec = qp_store.TextCodec("zlib")
+    first = qp_store.wrap_texts(["x" * 100], codec, pool)
+    second = qp_store.wrap_texts(["x" * 100], codec, pool)
+    assert first.blobs()[0] is second.blobs()[0]
+
+def test_text_pool_derived_computed_once_and_pruned():
+    pool = qp_store.TextPool()
+    calls = []
+    compute = lambda text: calls.append(text) or text.upper()
+    assert pool.derived("a", "plain", compute) == "A"
+    assert pool.derived("a", "plain", compute) == "A"
+    assert calls == ["a"]
+    pool.intern("a")
+    pool.intern("b")
+    pool.prune(["b"])
+    assert pool.stats() == {"texts": 1, "blobs": 0, "derived": 0}
+
+def test_shared_texts_pack_roundtrip():
+    long_text = "<p>" + "Signatur " * 10 + "</p>"
+    profiles = {
+        "A": {"titles": ["s", "k"], "texts": [long_text, "kurz"], "hotkeys": ["", ""]},
+        "B": {"titles": ["s", "k"], "texts": [long_text, "kurz"], "hotkeys": ["", ""]}}
+    packed, blobs = qp_store.pack_shared_texts(profiles)
+    assert list(blobs.values()) == [long_text]
+    assert packed["A"]["texts"][0].startswith(qp_store.BLOB_REF_PREFIX)
+    assert packed["A"]["texts"][1] == "kurz"
+    assert profiles["A"]["texts"][0] == long_text
+    restored = qp_store.unpack_shared_texts(json.loads(json.dumps(packed)), blobs)
+    assert restored == profiles
+
+def test_unpack_with_missing_blob_leaves_entry_empty():
+    profiles = {"A": {"texts": [qp_store.BLOB_REF_PREFIX + "fehlt", "x"]}}
+    assert qp_store.unpack_shared_texts(profiles, None)["A"]["texts"] == ["", "x"]
+
+def _config(**profile):
+    return {"version": qp_store.CONFIG_VERSION,
+            "profiles": {"P": {"titles": ["a"], "texts": ["x"], "hotkeys": [""], **profile}}}
+
+def test_validate_config_accepts_a_valid_config():
+    qp_store.validate_config(_config(macros=[], abbreviations={";a": "a"}))
+
+@pytest.mark.parametrize("loaded", [
+    [],
+    {"profiles": []},
+    {"profiles": {"SDE": {"titles": [], "texts": [], "hotkeys": []}}},
+    {"profiles": {"P": "kein Objekt"}},
+    _config(texts=["x", "y"]),
+    _config(titles=[1]),
+    _config(hotkeys="ctrl+shift+1"),
+    _config(macros={}),
+    _config(abbreviations=[]),
+])
+def test_validate_config_rejects(loaded):
+    with pytest.raises(ValueError):
+        qp_store.validate_config(loaded)
+
+def test_normalize_config_fills_lists_and_resolves_blobs():
+    long_text = "y" * 80
+    packed, blobs = qp_store.pack_shared_texts({"A": {"texts": [long_text]}, "B": {"texts": [long_text]}})
+    loaded = {"version": qp_store.CONFIG_VERSION, "profiles": packed, "blobs": blobs}
+    assert qp_store.normalize_config(loaded) is False
+    assert "blobs" not in loaded
+    assert loaded["profiles"]["A"] == {"texts": [long_text], "titles": [], "hotkeys": []}
+    broken = {"profiles": None}
+    assert qp_store.normalize_config(broken) is True
+    assert broken["profiles"] == {}
@@ -0,0 +1,105 @@
+import json, threading
+import pytest
+import qp_sync
+from qp_sync import text_digest
+
+def _publish(tmp_path, snippets, version):
+    library = tmp_path / "library.json"
+    library.write_text(json.dumps({"version": version, "snippets": snippets}), encoding="utf-8")
+    return qp_sync.publish(str(library), str(tmp_path / "out"))
+
+@pytest.fixture
+def server(tmp_path):
+    _publish(tmp_path, [
+        {"id": "gruss", "profile": "Team", "title": "Gruss", "text": "<p>Hallo</p>", "hotkey": "ctrl+alt+1"},
+        {"id": "sig", "profile": "Team", "title": "Signatur", "text": "<p>MfG</p>"}], 1)
+    httpd = qp_sync.serve(str(tmp_path / "out"), port=0)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+class CountingSource(qp_sync.HttpSource):
+    def __init__(self, url):
+        super().__init__(url)
+        self.fetched = []
+    def fetch_snippets(self, ids, batch_size=200):
+        self.fetched.append(sorted(ids))
+        return super().fetch_snippets(ids, batch_size)
+
+def test_etag_and_changed_hashes_only(server, tmp_path):
+    source = CountingSource(f"http://127.0.0.1:{server.server_port}")
+    state = {"etag": None, "version": None, "entries": {}}
+    profiles = {}
+    update = qp_sync.fetch_updates(source, state)
+    assert update["etag"]
+    result = qp_sync.merge_updates(profiles, state, update)
+    assert result["applied"] == 2 and not result["conflicts"]
+    assert profiles["Team"]["titles"] == ["Gruss", "Signatur"]
+    # unverändert: 304, kein Snippet-Abruf
+    assert qp_sync.fetch_updates(source, state) is None
+    assert source.fetched == [["gruss", "sig"]]
+    _publish(tmp_path, [
+        {"id": "gruss", "profile": "Team", "title": "Gruss", "text": "<p>Hallo</p>", "hotkey": "ctrl+alt+1"},
+        {"id": "sig", "profile": "Team", "title": "Signatur", "text": "<p>Gruss</p>"}], 2)
+    update = qp_sync.fetch_updates(source, state)
+    assert source.fetched[-1] == ["sig"]
+    assert qp_sync.merge_updates(profiles, state, update)["applied"] == 1
+    assert profiles["Team"]["texts"] == ["<p>Hallo</p>", "<p>Gruss</p>"]
+
+def _update(text, version=2):
+    index = {"version": version, "snippets": {"sig": {"profile": "Team", "title": "Signatur", "hash": text_digest(text)}}}
+    return {"index": index, "etag": f"v{version}", "bodies": {"sig": text}}
+
+def _synced(text):
+    profiles = {"Team": {"titles": ["Signatur"], "texts": [text], "hotkeys": [""]}}
+    state = {"entries": {"sig": {"hash": text_digest(text), "profile": "Team", "title": "Signatur"}}}
+    return profiles, state
+
+def test_merge_remote_change_is_applied():
+    profiles, state = _synced("alt")
+    result = qp_sync.merge_updates(profiles, state, _update("neu"))
+    assert profiles["Team"]["texts"] == ["neu"]
+    assert result["applied"] == 1 and not result["conflicts"]
+
+def test_merge_local_change_is_kept():
+    profiles, state = _synced("alt")
+    profiles["Team"]["texts"][0] = "lokal"
+    result = qp_sync.merge_updates(profiles, state, _update("alt", version=3))
+    assert profiles["Team"]["texts"] == ["lokal"]
+    assert result["applied"] == 0 and not result["conflicts"]
+
+def test_merge_both_changed_is_conflict():
+    profiles, state = _synced("alt")
+    profiles["Team"]["texts"][0] = "lokal"
+    result = qp_sync.merge_updates(profiles, state, _update("neu"))
+    assert profiles["Team"]["texts"] == ["lokal"]
+    assert [c["id"] for c in result["conflicts"]] == ["sig"]
+
+def test_merge_without_base_keeps_local_entry():
+    profiles = {"Team": {"titles": ["Signatur"], "texts": ["eigene"], "hotkeys": [""]}}
+    state = {"entries": {}}
+    result = qp_sync.merge_updates(profiles, state, _update("neu"))
+    assert profiles["Team"]["texts"] == ["eigene"]
+    assert [c["id"] for c in result["conflicts"]] == ["sig"]
+    # gleicher Text ohne Basis: kein Konflikt, nur als synchronisiert vermerkt
+    profiles = {"Team": {"titles": ["Signatur"], "texts": ["neu"], "hotkeys": [""]}}
+    state = {"entries": {}}
+    result = qp_sync.merge_updates(profiles, state, _update("neu"))
+    assert result == {"changed_profiles": set(), "conflicts": [], "applied": 0}
+    assert state["entries"]["sig"]["hash"] == text_digest("neu")
+
+def test_sync_merge_then_save_with_packed_sde(tmp_path):
+    import qp_store
+    sde = {"titles": ["SDE-Titel"], "texts": ["<p>SDE</p>"], "hotkeys": [""]}
+    digest = qp_store.sde_source_digest(b"sde")
+    pack_path = qp_store.sde_pack_path(str(tmp_path), digest)
+    qp_store.compile_sde_pack(sde, digest, pack_path)
+    profiles, state = _synced("alt")
+    profiles["SDE"] = qp_store.open_sde_pack(pack_path, digest).as_profile()
+    assert qp_sync.merge_updates(profiles, state, _update("neu"))["applied"] == 1
+    saved = qp_store.config_for_save({"profiles": profiles, "active_profile": "Team"}, ["Team"])
+    assert list(saved["profiles"]) == ["Team"]
+    stored, _ = qp_store.pack_shared_texts(saved["profiles"])
+    reloaded = json.loads(json.dumps({**saved, "profiles": stored}, default=qp_store.json_default))
+    assert reloaded["profiles"]["Team"]["texts"] == ["neu"]
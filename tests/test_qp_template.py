@@ -0,0 +1,59 @@
+import datetime, re
+import pytest
+from qp_html import build_cf_html
+from qp_template import Field, compile_template, compile_snippet, has_placeholders, resolve_fields
+
+NOW = datetime.datetime(2024, 3, 5, 14, 7, 9)
+
+def _render(text, html=False, **kwargs):
+    template = compile_template(text)
+    return template.render(resolve_fields(template.fields, NOW, **kwargs), html=html)
+
+def test_text_without_placeholders_is_not_compiled():
+    assert compile_template("Hallo {{ unbekannt }} {single}") is None
+    assert not has_placeholders("")
+    assert compile_snippet("<p>x</p>", "x") is None
+
+def test_defaults_and_formats():
+    assert _render("{{date}} {{time}} {{ date : %Y-%m-%d }} {{time:%H:%M:%S}}") == "05.03.2024 14:07 2024-03-05 14:07:09"
+
+def test_fields_are_listed_once():
+    template = compile_template("{{user}}/{{user}}/{{counter}}")
+    assert template.fields == (Field("user", ""), Field("counter", "default"))
+
+def test_clipboard_is_read_only_when_used():
+    reads = []
+    clipboard = lambda: reads.append(1) or "Ablage"
+    assert _render("{{user}}", user="anna", clipboard=clipboard) == "anna"
+    assert reads == []
+    assert _render("[{{clipboard}}]", clipboard=clipboard) == "[Ablage]"
+
+def test_counter_increments_once_per_paste():
+    counts = {}
+    def next_counter(name):
+        counts[name] = counts.get(name, 0) + 1
+        return counts[name]
+    assert _render("{{counter:t}}-{{counter:t}}-{{counter:u}}", next_counter=next_counter) == "1-1-1"
+    assert _render("{{counter:t}}", next_counter=next_counter) == "2"
+
+def test_html_values_are_escaped():
+    assert _render("<p>{{clipboard}}</p>", html=True, clipboard=lambda: "a<b> & c\r\nd") == "<p>a&lt;b&gt; &amp; c<br />d</p>"
+    assert _render("{{clipboard}}", clipboard=lambda: "a<b>") == "a<b>"
+
+def test_gen_fields_take_generated_values():
+    snippet = compile_snippet("<p>{{gen:ticket|x}}</p>", "{{gen:ticket|x}}")
+    field = snippet.gen_fields[0]
+    assert field == Field("gen", "ticket|x")
+    values = resolve_fields(snippet.fields, NOW, generated={field: "T-1"})
+    assert snippet.plain.render(values) == "T-1"
+    assert resolve_fields(snippet.fields, NOW)[field] == ""
+
+@pytest.mark.parametrize("value", ["", "kurz", "Grüsse €\nzweite <Zeile>"])
+def test_cf_html_matches_full_build(value):
+    snippet = compile_snippet("<p>Hallo {{clipboard}} – {{date}}</p>", "Hallo {{clipboard}}")
+    values = resolve_fields(snippet.fields, NOW, clipboard=lambda: value)
+    cf_html = snippet.cf_html.render(values)
+    assert cf_html == build_cf_html(snippet.html.render(values, html=True))
+    offsets = dict(re.findall(rb"(\w+):(\d{10})", cf_html))
+    fragment = cf_html[int(offsets[b"StartFragment"]):int(offsets[b"EndFragment"])]
+    assert fragment.decode("utf-8") == snippet.html.render(values, html=True)
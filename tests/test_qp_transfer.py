@@ -0,0 +1,103 @@
+import os
+import pytest
+import qp_edit
+import qp_transfer
+
+STORED = ["5 &lt; 6 &amp; 7", "Zeile 1<br>Zeile 2", "&lt;b&gt;kein Tag&lt;/b&gt;", "<p><b>fett</b> &amp; mehr</p>",
+          "&amp;amp; doppelt", "Tom \"&amp;\" Jerry", "nur Text"]
+
+def _profiles():
+    return {"Team": {"titles": [f"T{n}" for n in range(len(STORED))], "texts": list(STORED),
+                     "hotkeys": ["ctrl+shift+1"] + [""] * (len(STORED) - 1)}}
+
+@pytest.mark.parametrize("fmt", qp_transfer.FORMATS)
+def test_export_import_round_trip(tmp_path, fmt):
+    target = str(tmp_path / ("export" if fmt == "html" else f"export.{fmt}"))
+    assert qp_transfer.write_records(target, qp_transfer.export_records(_profiles()), fmt) == len(STORED)
+    profiles = {}
+    stats, problems = qp_transfer.import_records(
+        profiles, qp_transfer.read_records(target, fmt), new_profile=lambda name: {"titles": [], "texts": [], "hotkeys": []})
+    assert not problems and stats["added"] == len(STORED)
+    assert profiles == _profiles()
+
+def test_text_to_html():
+    assert qp_transfer.text_to_html("1 < 2\r\nc") == "1 &lt; 2<br>c"
+    # Zeichenreferenzen gelten als HTML und werden nicht nochmals maskiert
+    assert qp_transfer.text_to_html("5 &lt; 6") == "5 &lt; 6"
+    assert qp_transfer.text_to_html("Tom & Jerry") == "Tom &amp; Jerry"
+
+def test_html_folder_export_is_atomic(tmp_path):
+    def records():
+        yield from qp_transfer.export_records(_profiles())
+        raise OSError("Platte voll")
+    target = tmp_path / "export"
+    with pytest.raises(OSError):
+        qp_transfer.write_html_folder(str(target), records())
+    assert not target.exists()
+    assert os.listdir(tmp_path) == []
+
+def test_html_folder_export_refuses_non_empty_target(tmp_path):
+    (tmp_path / "alt.html").write_text("x")
+    with pytest.raises(ValueError):
+        qp_transfer.write_html_folder(str(tmp_path), qp_transfer.export_records(_profiles()))
+
+def _rec(title, text="x", hotkey="", profile="Team"):
+    return qp_transfer.Record(profile, title, text, hotkey)
+
+def _team():
+    return {"Team": {"titles": ["Gruss"], "texts": ["alt"], "hotkeys": ["ctrl+shift+1"],
+                     "macros": [{"title": "M", "hotkey": "ctrl+shift+m", "steps": []}]}}
+
+@pytest.mark.parametrize("mode, titles, texts", [
+    ("rename", ["Gruss", "gruss 2", "Gruss 3"], ["alt", "neu", "neuer"]),
+    ("skip", ["Gruss"], ["alt"]),
+    ("replace", ["Gruss"], ["neuer"]),
+])
+def test_duplicate_titles(mode, titles, texts):
+    profiles = _team()
+    stats, _ = qp_transfer.import_records(profiles, [_rec("gruss", "neu"), _rec("Gruss", "neuer")], on_duplicate=mode)
+    assert profiles["Team"]["titles"] == titles
+    assert profiles["Team"]["texts"] == texts
+    assert len(profiles["Team"]["hotkeys"]) == len(titles)
+
+def test_replace_within_the_same_import_updates_the_pending_row():
+    profiles = _team()
+    stats, _ = qp_transfer.import_records(profiles, [_rec("Neu", "eins"), _rec("neu", "zwei")], on_duplicate="replace")
+    assert profiles["Team"]["titles"] == ["Gruss", "Neu"] and profiles["Team"]["texts"] == ["alt", "zwei"]
+    assert (stats["added"], stats["replaced"]) == (1, 1)
+
+def test_invalid_and_taken_hotkeys_are_cleared():
+    profiles = _team()
+    records = [_rec("A", hotkey="Ctrl+Shift+2"), _rec("B", hotkey="ctrl+shift+2"), _rec("C", hotkey="ctrl+shift+m"),
+               _rec("D", hotkey="alt+1"), _rec("E", hotkey="ctrl+shift+1")]
+    stats, problems = qp_transfer.import_records(profiles, records)
+    assert profiles["Team"]["hotkeys"] == ["ctrl+shift+1", "ctrl+shift+2", "", "", "", ""]
+    assert stats["hotkeys_cleared"] == 4 and len(problems) == 4
+
+def test_replace_keeps_own_hotkey_and_frees_the_old_one():
+    profiles = _team()
+    qp_transfer.import_records(profiles, [_rec("Gruss", "neu", "ctrl+shift+3"), _rec("Andere", hotkey="ctrl+shift+1")],
+                               on_duplicate="replace")
+    assert profiles["Team"]["hotkeys"] == ["ctrl+shift+3", "ctrl+shift+1"]
+
+def test_reserved_missing_and_untitled_records_are_skipped():
+    profiles = _team()
+    records = [_rec("A", profile="SDE"), _rec("B", profile="Neu"), _rec("", profile="Team")]
+    stats, problems = qp_transfer.import_records(profiles, records)
+    assert stats["skipped"] == 3 and len(problems) == 3
+    assert list(profiles) == ["Team"] and profiles["Team"]["titles"] == ["Gruss"]
+
+def test_import_records_undo_ops_in_batches():
+    profiles, ops, batches = _team(), [], []
+    records = [_rec(f"T{n}") for n in range(5)] + [_rec("Gruss", "neu"), _rec("X", profile="Neu")]
+    qp_transfer.import_records(profiles, records, on_duplicate="replace", batch_size=2, record=ops.append,
+                               on_batch=lambda stats: batches.append(stats["added"]),
+                               new_profile=lambda name: {"titles": [], "texts": [], "hotkeys": []})
+    assert batches[-1] == 6 and len(batches) >= 3
+    history = qp_edit.History()
+    history.begin("Import")
+    for op in ops:
+        history.record(op)
+    history.end()
+    history.undo(profiles)
+    assert profiles == _team()